@@ -64,6 +64,12 @@ def get_comfyui_api_prompts_path(self, prompt_name:str) -> str:
         else:
             return os.path.join(dirpath_comfyui_api_prompts, f'{prompt_name}.json')
 
+    def preload_fonts(self, font_sizes=(16, 24, 32, 48), config_keys=('font_path_hansans', 'font_path_hansans_hw')) -> int:
+        # 预加载配置的字体到字体缓存 (思源字体文件大, 解析耗时); 返回加载的字体数量
+        from zwutils_methods import FontCache    # 字体缓存
+        font_paths = [self.get_config(key) for key in config_keys]
+        return FontCache().preload(font_paths, font_sizes)
+
     def compute_font(self, text):
         # 计算字体类型, 全中文 使用 font_path, 否则使用 font_path_roman;
         arrow_pattern = re.compile(
@@ -1,6 +1,35 @@
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from nanoid import generate      # pip install nanoid
 from zwutils_methods import ImgHandle    # 图片基本操作
+from zwutils_methods import FileCacheHandle    # 文件缓存
+
+
+# 转换参数, 作为缓存 key 的一部分; 修改转换方式时更新 version 使旧缓存失效
+CONVERT_PARAMS = {
+    'jpg': {'op': 'jpg', 'version': 1},
+    'svg': {'op': 'svg', 'vtracer': 'default', 'version': 1},
+}
+
+
+def convert_img_to_jpg(img_path, save_path):
+    # 图片转 jpg (进程池任务, 必须是模块级函数)
+    cls_imghandle = ImgHandle()    # 图片基本操作
+    Path(save_path).unlink(missing_ok=True)     # 目标可能是缓存的硬链接, 先删除再写入
+    img_ndarr = cls_imghandle.img_to_ndarray(img_path)
+    if img_ndarr is None:
+        raise ValueError(f'无法读取图片: {img_path}')
+    if not cls_imghandle.ndarray_to_img(img_ndarr, write_path=save_path):
+        raise RuntimeError(f'保存图片失败: {save_path}')
+    return save_path
+
+
+def convert_img_to_svg(img_path, save_path):
+    # 图片转 svg (vtracer, 进程池任务)
+    cls_imghandle = ImgHandle()    # 图片基本操作
+    Path(save_path).unlink(missing_ok=True)     # 目标可能是缓存的硬链接, 先删除再写入
+    cls_imghandle.img_to_svg(source_img_path=img_path, output_path=save_path)
+    return save_path
 
 
 class HandleConvertImg(object):
@@ -8,24 +37,38 @@ class HandleConvertImg(object):
     from handle_cls import HandleConvertImg     # 图片转换操作
     #    self.cls_handle_convert_img = HandleConvertImg()     # 图片转换操作
     """
-    def __init__(self, cls_main_params):
+    def __init__(self, cls_main_params, workers=1, svg_workers=None, use_cache=True, cache_max_bytes=2 * 1024 ** 3):
+        """
+        workers: 转换 jpg 的进程数, 1 单进程顺序转换
+        svg_workers: vtracer 转 svg 的进程数 (CPU 占用高, 单独的进程池), None 为 min(workers, 2)
+        use_cache: 使用转换缓存 (path_tmp_dir/convert_cache), 内容和参数相同的图片不重复转换
+        cache_max_bytes: 转换缓存最大占用空间
+        """
         self.cls_main_params = cls_main_params
         self.path_tmp_dir = cls_main_params.glob_confs.get_config('path_tmp_dir')
         self.cls_imghandle = ImgHandle()    # 图片基本操作
+        self.workers = workers
+        self.svg_workers = svg_workers
+        self.cls_file_cache = None
+        if use_cache:
+            self.cls_file_cache = FileCacheHandle(Path(self.path_tmp_dir) / 'convert_cache', max_bytes=cache_max_bytes)    # 文件缓存
+        self.errors = []    # 转换错误 [{'path', 'step', 'error'}, ...], 每次 main_to_jpg 开始时清空
+        self._content_hashes = {}
 
     def main_to_jpg(self, images_paths=None, dir_path=None, prefix=None, to_svg=False):
-        # 图片转 jpg
+        # 图片转 jpg (路径列表和文件夹两部分的错误都记录在 self.errors)
+        self.errors = []
         out_dirs = []
         out_dir1 = self.handle_convert_images(images_paths=images_paths, out_dir=None, to_svg=to_svg)
-        out_dir2 = self.handle_convert_imgs_in_dir(dir_path=dir_path, prefix=prefix)
+        out_dir2 = self.handle_convert_imgs_in_dir(dir_path=dir_path, prefix=prefix, to_svg=to_svg)
         if out_dir1 is not None:
             out_dirs.append(out_dir1)
         if out_dir2 is not None:
             out_dirs.append(out_dir2)
         return out_dirs
 
-    def handle_convert_images(self, images_paths=None, out_dir=None, to_svg=False):
-        # 根据图片路径批量转换
+    def handle_convert_images(self, images_paths=None, out_dir=None, to_svg=False, workers=None, svg_workers=None):
+        # 根据图片路径批量转换; workers > 1 使用进程池并行转换, 单个文件出错不影响其它文件 (错误追加到 self.errors)
         if not isinstance(images_paths, list):
             return None
         if out_dir is None:
@@ -34,21 +77,109 @@ def handle_convert_images(self, images_paths=None, out_dir=None, to_svg=False):
             write_dir_path = Path(out_dir)
         write_dir_path.mkdir(parents=True, exist_ok=True)
 
+        workers = workers or self.workers or 1
+        svg_workers = svg_workers or self.svg_workers or min(workers, 2)
+
+        # 每张图片的任务: [(step, func, img_path, save_path), ...]
+        jobs = []
         for img_path in images_paths:
-            current_save_path = write_dir_path / f'{Path(img_path).stem}.jpg'
+            img_jobs = []
             if to_svg:    # 保存为 svg
                 current_save_svg_path = write_dir_path / f'{Path(img_path).stem}.svg'
-                self.cls_imghandle.img_to_svg(source_img_path=img_path, output_path=str(current_save_svg_path))
+                img_jobs.append(('svg', convert_img_to_svg, img_path, str(current_save_svg_path)))
+            current_save_path = write_dir_path / f'{Path(img_path).stem}.jpg'
+            img_jobs.append(('jpg', convert_img_to_jpg, img_path, str(current_save_path)))
+            jobs.append(img_jobs)
 
-            img_ndarr = self.cls_imghandle.img_to_ndarray(img_path)
-            self.cls_imghandle.ndarray_to_img(img_ndarr, write_path=str(current_save_path))
+        error_count = len(self.errors)
+        self._content_hashes = {}   # 同一张图片转 jpg 和 svg 只计算一次 hash
+        if workers <= 1:
+            for idx, img_jobs in enumerate(jobs):
+                results = []
+                for step, func, img_path, save_path in img_jobs:
+                    cache_key, cached = self._read_cache(step, img_path, save_path)
+                    if cached:
+                        results.append((step, None, True))
+                        continue
+                    try:
+                        func(img_path, save_path)
+                        self._write_cache(step, cache_key, save_path)
+                        results.append((step, None, False))
+                    except Exception as e:
+                        results.append((step, e, False))
+                self._report_progress(idx, len(jobs), images_paths[idx], results)
+        else:
+            svg_pool = ProcessPoolExecutor(max_workers=svg_workers) if to_svg else None
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as jpg_pool:
+                    futures = []
+                    for img_jobs in jobs:
+                        img_futures = []
+                        for step, func, img_path, save_path in img_jobs:
+                            cache_key, cached = self._read_cache(step, img_path, save_path)
+                            future = None
+                            if not cached:
+                                future = (svg_pool if step == 'svg' else jpg_pool).submit(func, img_path, save_path)
+                            img_futures.append((step, future, cache_key, save_path))
+                        futures.append(img_futures)
+                    # 按输入顺序输出进度
+                    for idx, img_futures in enumerate(futures):
+                        results = []
+                        for step, future, cache_key, save_path in img_futures:
+                            if future is None:
+                                results.append((step, None, True))
+                                continue
+                            try:
+                                future.result()
+                                self._write_cache(step, cache_key, save_path)
+                                results.append((step, None, False))
+                            except Exception as e:
+                                results.append((step, e, False))
+                        self._report_progress(idx, len(jobs), images_paths[idx], results)
+            finally:
+                if svg_pool is not None:
+                    svg_pool.shutdown()
+
+        if len(self.errors) > error_count:
+            print(f'Convert failed: {len(self.errors) - error_count} error(s)')
         return str(write_dir_path)
-    
+
+    def _read_cache(self, step, img_path, save_path):
+        # 读取转换缓存, 返回 (cache_key, 是否命中)
+        if self.cls_file_cache is None:
+            return None, False
+        try:
+            if img_path not in self._content_hashes:
+                self._content_hashes[img_path] = self.cls_file_cache.hash_file(img_path)
+            cache_key = self.cls_file_cache.compute_key(params=CONVERT_PARAMS[step], content_hash=self._content_hashes[img_path])
+        except OSError:
+            return None, False      # 读取失败由转换任务报错
+        return cache_key, self.cls_file_cache.get(cache_key, Path(save_path).suffix, save_path)
+
+    def _write_cache(self, step, cache_key, save_path):
+        # 转换结果写入缓存
+        if self.cls_file_cache is not None and cache_key is not None:
+            self.cls_file_cache.put(cache_key, Path(save_path).suffix, save_path)
+
+    def _report_progress(self, idx, total, img_path, results):
+        # 输出转换进度, 记录错误; results: [(step, error, cached), ...]
+        failed = []
+        for step, error, _ in results:
+            if error is not None:
+                failed.append(step)
+                self.errors.append({'path': img_path, 'step': step, 'error': str(error)})
+        if failed:
+            status = f"failed ({', '.join(failed)})"
+        elif all(cached for _, _, cached in results):
+            status = 'ok (cached)'
+        else:
+            status = 'ok'
+        print(f'[{idx + 1}/{total}] {Path(img_path).name} {status}')
+
     def handle_convert_imgs_in_dir(self, dir_path=None, prefix=None, to_svg=False):
         if not isinstance(dir_path, str) or not Path(dir_path).is_dir():
             return None
-        
-        imgs_paths = self.cls_imghandle.get_imgs_paths_in_dir(folder_path=dir_path, prefix=prefix, to_svg=to_svg)
+
+        imgs_paths = self.cls_imghandle.get_imgs_paths_in_dir(folder_path=dir_path, prefix=prefix)
         out_dir = Path(self.path_tmp_dir) / 'convert_imgs' / Path(dir_path).name
-        return self.handle_convert_images(images_paths=imgs_paths, out_dir=str(out_dir))
-        
\ No newline at end of file
+        return self.handle_convert_images(images_paths=imgs_paths, out_dir=str(out_dir), to_svg=to_svg)
@@ -0,0 +1,70 @@
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+import numpy as np
+import cv2      # pip install opencv-python
+
+project_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_path))
+
+from zwutils_methods import ImgHandle    # 图片基本操作
+
+"""
+alpha 通道辅助方法对比: np.concatenate / cv2.split+merge (旧实现) 与 cv2.cvtColor 写入预分配数组
+统计每次调用的平均耗时和峰值内存 (tracemalloc), 默认使用 4K (3840x2160) 图片
+"""
+
+
+def add_alpha_concatenate(img):
+    # 旧实现: np.concatenate 拼接 alpha 通道
+    alpha_channel = np.full((img.shape[0], img.shape[1], 1), 255, dtype=img.dtype)
+    return np.concatenate((img, alpha_channel), axis=2)
+
+
+def gray_as_alpha_split_merge(bgr_image, gray_image):
+    # 旧实现: cv2.split / cv2.merge
+    b, g, r = cv2.split(bgr_image)
+    return cv2.merge([b, g, r, gray_image])
+
+
+def bench(func, repeat):
+    # 返回 (平均耗时 ms, 峰值内存 MB)
+    func()     # 预热
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / repeat * 1000, peak / 1024 ** 2
+
+
+if __name__ == '__main__':
+    # run: python tools/scripts/bench_alpha_helpers.py [--width 3840 --height 2160]
+    parser = argparse.ArgumentParser(description='alpha 通道辅助方法性能对比')
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--repeat', type=int, default=20, help='重复次数')
+    args = parser.parse_args()
+
+    cls_imghandle = ImgHandle()    # 图片基本操作
+    rng = np.random.default_rng(0)
+    bgr = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    gray = rng.integers(0, 256, (args.height, args.width), dtype=np.uint8)
+    out = np.empty((args.height, args.width, 4), dtype=np.uint8)    # 重复使用的缓冲区
+
+    cases = [
+        ('add_alpha: np.concatenate', lambda: add_alpha_concatenate(bgr)),
+        ('add_alpha: cvtColor', lambda: cls_imghandle.to_bgra(bgr)),
+        ('add_alpha: cvtColor out=', lambda: cls_imghandle.to_bgra(bgr, out=out)),
+        ('gray_as_alpha: split/merge', lambda: gray_as_alpha_split_merge(bgr, gray)),
+        ('gray_as_alpha: cvtColor', lambda: cls_imghandle.apply_gray_as_alpha_cv2(bgr, gray)),
+        ('gray_as_alpha: cvtColor out=', lambda: cls_imghandle.apply_gray_as_alpha_cv2(bgr, gray, out=out)),
+    ]
+    print(f'image: {args.width}x{args.height}, repeat: {args.repeat}')
+    for title, func in cases:
+        ms, peak_mb = bench(func, args.repeat)
+        print(f'  {title:<32} {ms:8.2f} ms  peak {peak_mb:8.2f} MB')
@@ -0,0 +1,66 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+project_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_path))
+
+from zwutils_methods import EncoderPresets    # 视频编码预设
+
+"""
+视频编码预设性能对比: 用 ffmpeg testsrc 生成测试视频, 按每个预设 (以及可选的线程数) 编码, 输出编码 fps 和文件大小
+"""
+
+
+def make_test_clip(output_path, width, height, seconds, fps):
+    # 生成测试视频 (testsrc 图案 + 正弦音频), 无损 (crf 0) 保证解码不是瓶颈
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'testsrc=size={width}x{height}:rate={fps}:duration={seconds}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}',
+        '-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '0', '-c:a', 'aac', '-shortest',
+        output_path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def bench_preset(cls_encoder_presets, src_path, output_path, preset, threads):
+    # 编码一次, 返回 (耗时 秒, 文件大小 MB)
+    overrides = {} if threads is None else {'threads': threads}
+    cmd = ['ffmpeg', *cls_encoder_presets.global_args(preset, **overrides), '-y', '-v', 'error', '-i', src_path,
+           *cls_encoder_presets.video_args(preset, **overrides), '-c:a', 'copy', output_path]
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - start, os.path.getsize(output_path) / 1024 ** 2
+
+
+if __name__ == '__main__':
+    # run: python tools/scripts/bench_encoder_presets.py [--width 1920 --height 1080 --seconds 10 --threads 0 4 8]
+    parser = argparse.ArgumentParser(description='视频编码预设性能对比 (fps)')
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--presets', nargs='*', default=None, help='预设名称, 默认全部')
+    parser.add_argument('--threads', nargs='*', type=int, default=None, help='编码线程数 (0 自动), 默认使用预设的值')
+    args = parser.parse_args()
+
+    cls_encoder_presets = EncoderPresets()    # 视频编码预设
+    presets = args.presets or cls_encoder_presets.names()
+    threads_list = args.threads or [None]
+    frame_count = args.seconds * args.fps
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src_path = os.path.join(tmp_dir, 'testsrc.mp4')
+        make_test_clip(src_path, args.width, args.height, args.seconds, args.fps)
+        print(f'clip: testsrc {args.width}x{args.height}, {args.seconds}s @ {args.fps}fps ({frame_count} frames), cpu: {os.cpu_count()}')
+        for preset in presets:
+            for threads in threads_list:
+                output_path = os.path.join(tmp_dir, f'out_{preset}.mp4')
+                elapsed, size_mb = bench_preset(cls_encoder_presets, src_path, output_path, preset, threads)
+                threads_str = 'preset' if threads is None else str(threads)
+                print(f'  {preset:<20} threads={threads_str:<7} {frame_count / elapsed:8.1f} fps  {elapsed:7.2f} s  {size_mb:7.2f} MB')
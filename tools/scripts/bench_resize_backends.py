@@ -0,0 +1,69 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+
+project_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_path))
+
+from zwutils_methods import ImgHandle, ResizeHandle    # 图片基本操作, 图片缩放
+
+"""
+图片缩放后端性能对比 (opencv / pillow / pyvips)
+默认使用合成的 750x1000 详情图尺寸, 也可以指定图片文件夹
+"""
+
+
+def synthetic_detail_imgs(count, width=750, height=1000, channels=3):
+    # 生成合成的详情图 (渐变 + 噪声, 接近真实图片的频率分布)
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    imgs = []
+    for _ in range(count):
+        noise = rng.normal(0, 25, (height, width, channels)).astype(np.float32)
+        imgs.append(np.clip(gradient + noise, 0, 255).astype(np.uint8))
+    return imgs
+
+
+def bench(imgs, target_size, backend, interpolation, repeat):
+    cls_resize_handle = ResizeHandle()
+    # 预热
+    cls_resize_handle.resize(imgs[0], target_size, interpolation=interpolation, backend=backend)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for img in imgs:
+            cls_resize_handle.resize(img, target_size, interpolation=interpolation, backend=backend)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(imgs)) * 1000
+
+
+if __name__ == '__main__':
+    # run: python tools/scripts/bench_resize_backends.py [--dir 图片文件夹]
+    parser = argparse.ArgumentParser(description='图片缩放后端性能对比')
+    parser.add_argument('--dir', default=None, help='图片文件夹, 默认使用合成的 750x1000 图片')
+    parser.add_argument('--count', type=int, default=10, help='合成图片数量')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    args = parser.parse_args()
+
+    cls_imghandle = ImgHandle()    # 图片基本操作
+    if args.dir is not None:
+        imgs = [cls_imghandle.img_to_ndarray(p) for p in cls_imghandle.get_imgs_paths_in_dir(args.dir)]
+        imgs = [img for img in imgs if img is not None]
+    else:
+        imgs = synthetic_detail_imgs(args.count)
+    if not imgs:
+        print('No images...')
+        sys.exit(1)
+
+    cases = [
+        ('downscale 750x1000 -> 375x500', (375, 500), ('area', 'linear', 'lanczos')),
+        ('upscale 750x1000 -> 1500x2000', (1500, 2000), ('cubic', 'lanczos')),
+    ]
+    print(f'images: {len(imgs)}, repeat: {args.repeat}, backends: {ResizeHandle.available_backends()}')
+    for title, target_size, interpolations in cases:
+        print(f'\n{title}')
+        for backend in ResizeHandle.available_backends():
+            for interpolation in interpolations:
+                ms = bench(imgs, target_size, backend, interpolation, args.repeat)
+                print(f'  {backend:<8} {interpolation:<8} {ms:8.2f} ms/img')
@@ -0,0 +1,58 @@
+import sys
+import time
+import argparse
+from pathlib import Path
+
+project_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_path))
+
+from zwutils_methods import VideoHandle    # 视频基本操作
+from zwutils_methods import MediaProbeHandle    # 音视频元数据
+
+"""
+视频帧数统计方法对比: 容器 nb_frames / -count_packets (不解码) / -count_frames (解码)
+每个视频每种方法统计一次 (不使用缓存), 输出帧数和耗时; 帧数不一致时标记 *
+"""
+
+
+def time_call(func):
+    # 返回 (结果, 耗时 ms)
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench_video(cls_video_handle, video_path):
+    stream = cls_video_handle.cls_media_probe.first_stream(video_path, 'video')
+    if stream is None:
+        print(f'  {Path(video_path).name}: 不是视频文件')
+        return
+    results = [
+        ('nb_frames', (int(stream['nb_frames']) if str(stream.get('nb_frames', '')).isdigit() else None, 0.0)),
+        ('packets', time_call(lambda: cls_video_handle._ffprobe_count_stream(video_path, '-count_packets', 'nb_read_packets'))),
+        ('decode', time_call(lambda: cls_video_handle._ffprobe_count_stream(video_path, '-count_frames', 'nb_read_frames'))),
+    ]
+    exact_count = results[-1][1][0]
+    print(f"  {Path(video_path).name} ({stream.get('width')}x{stream.get('height')})")
+    for method, (frame_count, ms) in results:
+        mark = '*' if frame_count is not None and frame_count != exact_count else ' '
+        print(f'    {method:<10} {str(frame_count):>8}{mark} {ms:10.1f} ms')
+
+
+if __name__ == '__main__':
+    # run: python tools/scripts/bench_video_frame_count.py videos_dir_or_file [...]
+    parser = argparse.ArgumentParser(description='视频帧数统计方法性能对比')
+    parser.add_argument('paths', nargs='+', help='视频文件或文件夹 (如 1080p mp4 素材文件夹)')
+    args = parser.parse_args()
+
+    cls_video_handle = VideoHandle()    # 视频基本操作
+    cls_video_handle.cls_media_probe = MediaProbeHandle(cache_dir=False)    # 不使用已有的磁盘缓存
+    videos_paths = []
+    for path in args.paths:
+        if Path(path).is_dir():
+            videos_paths.extend(cls_video_handle.get_videos_paths_in_dir(path))
+        else:
+            videos_paths.append(path)
+    print(f'videos: {len(videos_paths)}')
+    for video_path in videos_paths:
+        bench_video(cls_video_handle, video_path)
@@ -0,0 +1,82 @@
+import sys
+import argparse
+from pathlib import Path
+import numpy as np
+
+project_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_path))
+
+from zwutils_methods import ImgHandle, ResizeHandle, ImagePipeline    # 图片基本操作, 图片缩放, 图片处理流水线
+
+"""
+图片流水线检查: 每个缩放后端 (默认 opencv / pillow) 下执行流水线, 结果与逐步调用 ImgHandle 的结果一致,
+且缩放/自定义操作返回只读数组时不会因原地修改报错, 不修改输入图片
+"""
+
+
+def make_readonly(img):
+    # 返回只读数组 (模拟 np.asarray(PIL.Image) 等)
+    ret = img.copy()
+    ret.flags.writeable = False
+    return ret
+
+
+def crop_to_ratio(cls_imghandle, img, target_size):
+    x0, y0, x1, y1 = cls_imghandle.compute_ratio_crop_box(img.shape[1], img.shape[0], target_size)
+    return img[y0:y1, x0:x1]
+
+
+def check_backend(backend, img, overlay):
+    ResizeHandle.set_default_policy(backend=backend)
+    cls_imghandle = ImgHandle()    # 图片基本操作
+    src = img.copy()
+    errors = []
+
+    cases = [
+        ('resize -> combine',
+         ImagePipeline().resize((50, 100)).combine(overlay, (5, 5)),
+         lambda: cls_imghandle.combine_ndarray(cls_imghandle.resize_ndarray((50, 100), img), overlay, (5, 5))),
+        ('crop_to_ratio -> resize -> round_corner',
+         ImagePipeline().crop_to_ratio((3, 4)).resize((60, 80)).round_corner(10),
+         lambda: cls_imghandle.add_round_corner(cls_imghandle.resize_ndarray((60, 80), crop_to_ratio(cls_imghandle, img, (3, 4))), corner_radius=10)),
+        ('apply(只读) -> combine',
+         ImagePipeline().apply(make_readonly).combine(overlay, (5, 5)),
+         lambda: cls_imghandle.combine_ndarray(img.copy(), overlay, (5, 5))),
+    ]
+    for title, pipeline, manual in cases:
+        try:
+            ret = pipeline.run(img)
+        except ValueError as e:
+            errors.append(f'{backend}: {title} 执行失败: {e}')
+            continue
+        expected = manual()
+        if ret.shape != expected.shape or not np.array_equal(ret, expected):
+            errors.append(f'{backend}: {title} 结果与逐步调用不一致')
+        else:
+            print(f'  {backend:<8} {title:<42} OK')
+    if not np.array_equal(img, src):
+        errors.append(f'{backend}: 输入图片被修改')
+    return errors
+
+
+if __name__ == '__main__':
+    # run: python tools/scripts/check_image_pipeline.py [--backends opencv pillow]
+    parser = argparse.ArgumentParser(description='图片流水线检查 (各缩放后端)')
+    parser.add_argument('--backends', nargs='*', default=['opencv', 'pillow'])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (200, 160, 3), dtype=np.uint8)
+    overlay = rng.integers(0, 256, (20, 20, 4), dtype=np.uint8)
+
+    default_backend = ResizeHandle.get_default_policy()['backend']
+    errors = []
+    try:
+        for backend in args.backends:
+            errors += check_backend(backend, img, overlay)
+    finally:
+        ResizeHandle.set_default_policy(backend=default_backend)
+    if errors:
+        print('\n'.join(errors))
+        sys.exit(1)
+    print('OK')
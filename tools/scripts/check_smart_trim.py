@@ -0,0 +1,106 @@
+import os
+import sys
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+import numpy as np
+
+project_path = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_path))
+
+from zwutils_methods import VideoHandle    # 视频基本操作
+
+"""
+smart 截取回归检查: 生成测试视频 (testsrc, 每帧画面不同), smart 截取后逐帧解码,
+每个输出帧匹配最接近的原视频帧, 要求帧序号连续 (拼接处没有重复帧/跳帧) 且帧数正确; 复制的中间部分在两个拼接处与原视频逐字节一致 (md5)
+默认两种情况: 带 B 帧 (-bf 3, 关键帧在整秒); 无 B 帧 24fps, GOP 250 (关键帧时间 250/24 秒, 6 位小数表示不精确)
+"""
+
+
+def make_test_clip(output_path, fps, gop, bframes, seconds, size):
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f'testsrc=size={size[0]}x{size[1]}:rate={fps}:duration={seconds}',
+        '-c:v', 'libx264', '-g', str(gop), '-keyint_min', str(gop), '-sc_threshold', '0', '-bf', str(bframes),
+        '-pix_fmt', 'yuv420p', output_path,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+def frame_md5(frame):
+    return hashlib.md5(frame.tobytes()).hexdigest()
+
+
+def match_source_indexes(out_frames, src_frames):
+    # 每个输出帧最接近的原视频帧序号 (隔 4 个像素取样后平均绝对差最小, testsrc 每帧的滚动色条不同)
+    indexes = []
+    src_stack = np.stack([frame[::4, ::4] for frame in src_frames]).astype(np.int16)
+    for frame in out_frames:
+        diffs = np.abs(src_stack - frame[::4, ::4].astype(np.int16)).mean(axis=(1, 2, 3))
+        indexes.append(int(diffs.argmin()))
+    return indexes
+
+
+def check_case(cls_video_handle, tmp_dir, fps, gop, bframes, seconds, start_ms, end_ms) -> list:
+    title = f'fps={fps} gop={gop} bf={bframes} {start_ms}-{end_ms}ms'
+    src_path = os.path.join(tmp_dir, f'src_{fps}_{gop}_{bframes}.mp4')
+    out_path = os.path.join(tmp_dir, f'smart_{fps}_{gop}_{bframes}.mp4')
+    make_test_clip(src_path, fps, gop, bframes, seconds, (320, 240))
+    if not cls_video_handle.trim_media_by_ms(src_path, out_path, start_ms, end_ms, mode='smart'):
+        return [f'{title}: smart 截取失败']
+
+    plan = cls_video_handle.compute_smart_trim_plan(src_path, start_ms, end_ms)
+    src_frames = list(cls_video_handle.iter_frames(src_path, copy=True))
+    out_frames = list(cls_video_handle.iter_frames(out_path, copy=True))
+    indexes = match_source_indexes(out_frames, src_frames)
+
+    errors = []
+    # 应输出的原视频帧: 显示时间在 [start, end) 之间
+    expected = [i for i in range(len(src_frames)) if start_ms * fps <= i * 1000 < end_ms * fps]
+    if len(out_frames) != len(expected):
+        errors.append(f'{title}: 帧数 {len(out_frames)}, 应为 {len(expected)}')
+    if indexes and expected and indexes[0] != expected[0]:
+        errors.append(f'{title}: 第一帧为原视频帧 {indexes[0]}, 应为 {expected[0]}')
+    for i, (a, b) in enumerate(zip(indexes, indexes[1:])):
+        if b - a != 1:
+            errors.append(f'{title}: 输出帧 {i} -> {i + 1}: 原视频帧 {a} -> {b} (重复帧或跳帧)')
+
+    # 复制的中间部分: 两个拼接处的帧与原视频逐字节一致
+    if plan['middle'] is None:
+        errors.append(f'{title}: 没有复制的中间部分, 检查不到拼接处')
+    else:
+        first_key, last_key = plan['middle']
+        for seam, src_index in (('head|middle', round(first_key * fps)), ('middle|tail', round(last_key * fps) - 1)):
+            if src_index not in indexes:
+                errors.append(f'{title}: {seam}: 原视频帧 {src_index} 不在输出中')
+                continue
+            out_index = indexes.index(src_index)
+            same = frame_md5(out_frames[out_index]) == frame_md5(src_frames[src_index])
+            print(f'  {title} {seam}: 输出帧 {out_index} = 原视频帧 {src_index}, md5 {"一致" if same else "不一致"}')
+            if not same:
+                errors.append(f'{title}: {seam}: 复制的帧 {src_index} md5 不一致')
+
+    print(f'  {title} plan: {plan["head"]} | {plan["middle"]} | {plan["tail"]}, 输出帧数: {len(out_frames)}')
+    return errors
+
+
+if __name__ == '__main__':
+    # run: python tools/scripts/check_smart_trim.py [--case 25,25,3,10,1300,6700 --case 24,250,0,30,4000,25000]
+    parser = argparse.ArgumentParser(description='smart 截取拼接处帧检查')
+    parser.add_argument('--case', action='append', default=None,
+                        help='fps,gop,bframes,seconds,start_ms,end_ms (可以多次指定)')
+    args = parser.parse_args()
+    cases = args.case or ['25,25,3,10,1300,6700', '24,250,0,30,4000,25000']
+
+    cls_video_handle = VideoHandle()    # 视频基本操作
+    errors = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case in cases:
+            fps, gop, bframes, seconds, start_ms, end_ms = (int(value) for value in case.split(','))
+            errors += check_case(cls_video_handle, tmp_dir, fps, gop, bframes, seconds, start_ms, end_ms)
+    if errors:
+        print('\n'.join(errors))
+        sys.exit(1)
+    print('OK')
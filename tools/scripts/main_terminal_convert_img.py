@@ -1,17 +1,28 @@
+import argparse
 from main_params import cls_main_params      # 操作的文件夹,统一入口; 修改 main_terminal_params.py 的参数.
 from handle_cls import HandleConvertImg     # 图片转换操作
 
 
 if __name__ == '__main__':
-    # run: python tools/scripts/main_terminal_convert_img.py
+    # run: python tools/scripts/main_terminal_convert_img.py [图片路径 ...] [--workers 8] [--svg-workers 2] [--no-cache]
     # 图片转换为 .jpg
+    parser = argparse.ArgumentParser(description='图片转换为 .jpg')
+    parser.add_argument('images', nargs='*', help='图片路径, 不指定使用脚本中的 images_paths')
+    parser.add_argument('--workers', type=int, default=1, help='并行转换的进程数 (默认 1, 顺序转换)')
+    parser.add_argument('--svg-workers', type=int, default=None, help='转 svg 的进程数 (默认 min(workers, 2))')
+    parser.add_argument('--no-cache', action='store_true', help='不使用转换缓存, 全部重新转换')
+    args = parser.parse_args()
 
     # ------ 修改参数 ------
     images_paths = [
         '/Users/senmalay/v_programs/dev/github_projects/barley_ai_blog/data/logo_white.png',
     ]
+    if args.images:
+        images_paths = args.images
 
-    cls_handle_convert_img = HandleConvertImg(cls_main_params)     # 图片转换操作
+    cls_handle_convert_img = HandleConvertImg(cls_main_params, workers=args.workers, svg_workers=args.svg_workers, use_cache=not args.no_cache)     # 图片转换操作
     results = cls_handle_convert_img.main_to_jpg(images_paths, to_svg=True)
 
     print('Converted imgs dirs:', results)
+    if cls_handle_convert_img.errors:
+        print('Errors:', cls_handle_convert_img.errors)
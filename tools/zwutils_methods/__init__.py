@@ -18,3 +18,19 @@
 from .video_handle import VideoHandle
 from .goods_set_path import GoodsSetPath
 from .img_exif_handle import ImgExifHandle
+from .resize_handle import ResizeHandle
+from .file_cache_handle import FileCacheHandle
+from .font_cache import FontCache
+from .text_layout import TextLayout
+from .img_canvas import ImgCanvas
+from .table_renderer import TableRenderer
+from .image_pipeline import ImagePipeline
+from .dir_scan_handle import DirScanHandle
+from .goods_index import GoodsIndex
+from .media_probe_handle import MediaProbeHandle
+from .audio_library_index import AudioLibraryIndex
+from .video_job import VideoJob
+from .ffmpeg_async_executor import FfmpegAsyncExecutor
+from .encoder_presets import EncoderPresets
+from .video_frame_stream import VideoFrameReader
+from .video_frame_stream import VideoFrameWriter
@@ -0,0 +1,109 @@
+import os
+import bisect
+import random
+import threading
+from .dir_scan_handle import DirScanHandle    # 目录扫描
+from .media_probe_handle import MediaProbeHandle    # 音视频元数据
+
+
+class AudioLibraryIndex(object):
+    """
+    音频库索引: 音频时长只读取一次, 按时长排序; 选择时长 >= N 毫秒的音频 = 二分查找 + 均匀随机选择
+    refresh 增量更新 (目录扫描按目录 mtime 缓存, 只读取新增或改变的音频时长)
+    from zwutils_methods import AudioLibraryIndex    # 音频库索引
+    # self.cls_audio_library = AudioLibraryIndex(audios_dir_path)    # 音频库索引
+    """
+    def __init__(self, audios_dir_path, extensions=None, cls_media_probe=None):
+        """
+        audios_dir_path: 音频文件夹 (包含子文件夹)
+        extensions: 音频后缀 (不区分大小写), None 使用 DirScanHandle.AUDIO_EXTENSIONS
+        """
+        self.audios_dir_path = audios_dir_path
+        self.extensions = tuple(e.lower() for e in (extensions or DirScanHandle.AUDIO_EXTENSIONS))
+        self.cls_dir_scan = DirScanHandle()    # 目录扫描
+        self.cls_media_probe = cls_media_probe or MediaProbeHandle()    # 音视频元数据
+        self.tracks = {}        # 音频路径 -> (size, mtime, 时长毫秒)
+        self.durations = []     # 按时长排序
+        self.paths = []         # 与 durations 对应的音频路径
+        self._lock = threading.Lock()
+
+    def refresh(self) -> dict:
+        """
+        增量刷新索引
+
+        返回:
+            dict: {'added': 新增或改变的音频数, 'removed': 删除的音频数, 'tracks': 有效音频数}
+        """
+        with self._lock:
+            found = {}
+            self._walk(self.audios_dir_path, found)
+            added = 0
+            changed = False
+            for audio_path, (size, mtime) in found.items():
+                track = self.tracks.get(audio_path)
+                if track is not None and track[0] == size and track[1] == mtime:
+                    continue
+                duration_ms = self.cls_media_probe.get_duration_ms(audio_path)
+                self.tracks[audio_path] = (size, mtime, duration_ms)
+                added += 1
+                changed = True
+            removed = [audio_path for audio_path in self.tracks if audio_path not in found]
+            for audio_path in removed:
+                del self.tracks[audio_path]
+                changed = True
+            if changed:
+                self._rebuild()
+            return {'added': added, 'removed': len(removed), 'tracks': len(self.paths)}
+
+    def _walk(self, root_path, found):
+        # 遍历音频文件夹 (栈, 不递归); 同 os.walk 不进入软链接的文件夹, 并按 (st_dev, st_ino) 跳过已遍历的文件夹, 避免循环
+        stack = [root_path]
+        visited = set()
+        while stack:
+            dir_path = stack.pop()
+            try:
+                entries = self.cls_dir_scan.scan(dir_path)
+                stat = os.stat(dir_path)
+            except FileNotFoundError:
+                if dir_path == root_path:
+                    raise
+                continue    # 遍历过程中被删除的子文件夹
+            if (stat.st_dev, stat.st_ino) in visited:
+                continue
+            visited.add((stat.st_dev, stat.st_ino))
+            for entry in entries:
+                entry_path = os.path.join(dir_path, entry['name'])
+                if entry['kind'] == 'dir':
+                    if not os.path.islink(entry_path):
+                        stack.append(entry_path)
+                elif entry['ext'] in self.extensions:
+                    found[entry_path] = (entry['size'], entry['mtime'])
+
+    def _rebuild(self):
+        # 按时长重新排序 (读取时长失败的音频不参与选择)
+        valid_tracks = sorted(
+            (duration_ms, audio_path) for audio_path, (_, _, duration_ms) in self.tracks.items() if duration_ms is not None
+        )
+        self.durations = [duration_ms for duration_ms, _ in valid_tracks]
+        self.paths = [audio_path for _, audio_path in valid_tracks]
+
+    def select(self, min_duration_ms, rng=None) -> str | None:
+        """
+        随机选择一个时长 >= min_duration_ms 的音频
+
+        参数:
+            rng: random.Random, None 使用 random 模块
+
+        返回:
+            str: 音频路径; 没有符合条件的音频返回 None
+        """
+        with self._lock:
+            idx = bisect.bisect_left(self.durations, min_duration_ms)
+            if idx >= len(self.paths):
+                return None
+            return self.paths[(rng or random).randrange(idx, len(self.paths))]
+
+    def count_at_least(self, min_duration_ms) -> int:
+        # 时长 >= min_duration_ms 的音频数量
+        with self._lock:
+            return len(self.durations) - bisect.bisect_left(self.durations, min_duration_ms)
@@ -0,0 +1,152 @@
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+
+class DirScanHandle(object):
+    """
+    目录扫描 (os.scandir, 一次遍历得到类型/大小/修改时间), 结果按目录 mtime 缓存:
+    目录内新增/删除/重命名文件时目录 mtime 改变, 缓存失效重新扫描; 文件内容原地修改不会使缓存失效
+    index_dir 不为 None 时, 每个目录的索引保存为 index_dir 下的一个 json 文件 (跨进程复用)
+    from zwutils_methods import DirScanHandle    # 目录扫描
+    # self.cls_dir_scan = DirScanHandle()    # 目录扫描
+    """
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+    VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.flv', '.wmv', '.webm', '.mpg', '.mpeg', '.m4v')
+    AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma')
+    EXCEL_EXTENSIONS = ('.xls', '.xlsx', '.xlsm')
+
+    _lock = threading.Lock()
+    _cache = {}     # 目录绝对路径 -> (目录 mtime_ns, entries)
+
+    def __init__(self, index_dir=None):
+        self.index_dir = None
+        if index_dir is not None:
+            self.index_dir = Path(index_dir)
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+
+    def compute_kind(self, ext:str, is_dir=False) -> str:
+        # 文件类型: dir / image / video / audio / excel / other
+        if is_dir:
+            return 'dir'
+        if ext in self.IMAGE_EXTENSIONS:
+            return 'image'
+        if ext in self.VIDEO_EXTENSIONS:
+            return 'video'
+        if ext in self.AUDIO_EXTENSIONS:
+            return 'audio'
+        if ext in self.EXCEL_EXTENSIONS:
+            return 'excel'
+        return 'other'
+
+    def scan(self, folder_path) -> list:
+        """
+        扫描目录 (不递归)
+
+        返回:
+            list: [{'name', 'path', 'kind', 'ext', 'size', 'mtime'}, ...] 按文件名排序; ext 为小写后缀, path 为绝对路径
+                  (缓存共享的列表, 不要修改)
+        """
+        if not os.path.isdir(folder_path):
+            raise FileNotFoundError(f"The specified folder does not exist. ({folder_path})")
+        folder_path = os.path.abspath(folder_path)
+        dir_mtime = os.stat(folder_path).st_mtime_ns
+
+        with self._lock:
+            cached = self._cache.get(folder_path)
+        if cached is not None and cached[0] == dir_mtime:
+            return cached[1]
+
+        entries = self._read_index(folder_path, dir_mtime)
+        if entries is None:
+            entries = self._scandir(folder_path)
+            self._write_index(folder_path, dir_mtime, entries)
+        with self._lock:
+            self._cache[folder_path] = (dir_mtime, entries)
+        return entries
+
+    def _scandir(self, folder_path) -> list:
+        entries = []
+        with os.scandir(folder_path) as it:
+            for dir_entry in it:
+                try:
+                    is_dir = dir_entry.is_dir()
+                    stat = dir_entry.stat()
+                except OSError:     # 扫描过程中被删除, 或失效的软链接
+                    continue
+                ext = '' if is_dir else os.path.splitext(dir_entry.name)[1].lower()
+                entries.append({
+                    'name': dir_entry.name,
+                    'path': dir_entry.path,
+                    'kind': self.compute_kind(ext, is_dir=is_dir),
+                    'ext': ext,
+                    'size': 0 if is_dir else stat.st_size,
+                    'mtime': stat.st_mtime,
+                })
+        entries.sort(key=lambda entry: entry['name'])
+        return entries
+
+    def list_paths(self, folder_path, kinds=None, extensions=None, prefix=None, include_dirs=False) -> list:
+        """
+        列出目录内的路径 (已排序, 路径为 os.path.join(folder_path, 文件名))
+
+        参数:
+            kinds: 文件类型 tuple, 如 ('image', ), None 不限制
+            extensions: 后缀 tuple (小写, 带点), None 不限制
+            prefix: 文件名前缀 (str 或 tuple), None 不限制
+            include_dirs: 是否包含子目录
+        """
+        paths = []
+        for entry in self.scan(folder_path):
+            if entry['kind'] == 'dir' and not include_dirs:
+                continue
+            if kinds is not None and entry['kind'] not in kinds:
+                continue
+            if extensions is not None and entry['ext'] not in extensions:
+                continue
+            if prefix is not None and not entry['name'].startswith(prefix):
+                continue
+            paths.append(os.path.join(folder_path, entry['name']))
+        return paths
+
+    def index_path(self, folder_path) -> Path:
+        # 目录索引文件路径 (按目录绝对路径 hash 命名)
+        key = hashlib.sha1(folder_path.encode('utf-8')).hexdigest()
+        return self.index_dir / f'{key}.json'
+
+    def _read_index(self, folder_path, dir_mtime):
+        # 读取保存的索引, 目录 mtime 不一致时返回 None
+        if self.index_dir is None:
+            return None
+        index_path = self.index_path(folder_path)
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('path') != folder_path or data.get('dir_mtime') != dir_mtime:
+            return None
+        return data.get('entries')
+
+    def _write_index(self, folder_path, dir_mtime, entries):
+        if self.index_dir is None:
+            return
+        index_path = self.index_path(folder_path)
+        tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'path': folder_path, 'dir_mtime': dir_mtime, 'entries': entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f'Error write dir index failed: {e}')
+
+    @classmethod
+    def invalidate(cls, folder_path=None):
+        # 清除进程内缓存; folder_path 为 None 时清除全部
+        with cls._lock:
+            if folder_path is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(os.path.abspath(folder_path), None)
@@ -0,0 +1,120 @@
+import os
+import copy
+import threading
+
+
+class EncoderPresets(object):
+    """
+    视频编码预设 (进程内共享): 按名称统一管理编码器, preset, crf, 像素格式, x264 参数和线程数;
+    VideoHandle / VideoJob 的所有编码路径都通过预设生成编码参数, 不再各自写死 (或使用 ffmpeg 默认值)
+    只使用软件编码 (libx264), 不依赖硬件; threads 为 0 时 ffmpeg 自动选择 (约 1.5 倍核数)
+    并发运行多个 ffmpeg 时 (FfmpegAsyncExecutor), 可以用 set_threads 限制每个进程的线程数, 避免线程过多互相抢占
+    from zwutils_methods import EncoderPresets    # 视频编码预设
+    # self.cls_encoder_presets = EncoderPresets()    # 视频编码预设
+    # cmd += self.cls_encoder_presets.video_args('marketplace-upload')
+    """
+    DEFAULT_PRESET = 'marketplace-upload'
+
+    _lock = threading.Lock()
+    _presets = {
+        # 存档: 高质量, 编码慢 (同原 scale_video 的 libx264 slow crf 18)
+        'archive': {
+            'codec': 'libx264', 'preset': 'slow', 'crf': 18, 'pix_fmt': None, 'profile': None, 'tune': None,
+            'x264_params': None, 'threads': 0, 'filter_threads': None, 'movflags': None,
+        },
+        # 电商平台上传: 兼容性好 (yuv420p / high profile), moov 前置便于在线播放
+        'marketplace-upload': {
+            'codec': 'libx264', 'preset': 'medium', 'crf': 20, 'pix_fmt': 'yuv420p', 'profile': 'high', 'tune': None,
+            'x264_params': None, 'threads': 0, 'filter_threads': None, 'movflags': '+faststart',
+        },
+        # 预览: 编码快, 体积小, 解码快
+        'preview': {
+            'codec': 'libx264', 'preset': 'veryfast', 'crf': 28, 'pix_fmt': 'yuv420p', 'profile': 'main', 'tune': 'fastdecode',
+            'x264_params': 'ref=1:bframes=0', 'threads': 0, 'filter_threads': None, 'movflags': '+faststart',
+        },
+    }
+    _threads = None     # 全局线程数设置 (threads, filter_threads), None 使用各预设的值
+
+    def names(self) -> list:
+        # 所有预设名称
+        with self._lock:
+            return list(self._presets)
+
+    def get(self, name=None, **overrides) -> dict:
+        """
+        获取预设参数 (副本)
+
+        参数:
+            name: 预设名称, None 使用 DEFAULT_PRESET; 也可以直接传入参数 dict
+            overrides: 覆盖预设中的参数, 如 crf=23, threads=4
+        """
+        if isinstance(name, dict):
+            params = copy.deepcopy(name)
+        else:
+            name = name or self.DEFAULT_PRESET
+            with self._lock:
+                if name not in self._presets:
+                    raise ValueError(f"Unknown encoder preset '{name}', available: {list(self._presets)}")
+                params = copy.deepcopy(self._presets[name])
+                if self._threads is not None:
+                    params['threads'], params['filter_threads'] = self._threads
+        params.update(overrides)
+        return params
+
+    @classmethod
+    def register(cls, name, base=None, **params):
+        # 注册 (或覆盖) 预设; base: 继承的预设名称
+        with cls._lock:
+            preset = copy.deepcopy(cls._presets[base]) if base is not None else {}
+            preset.update(params)
+            preset.setdefault('codec', 'libx264')
+            cls._presets[name] = preset
+
+    @classmethod
+    def set_threads(cls, threads=None, filter_threads=None, concurrency=None):
+        """
+        设置所有预设的线程数
+
+        参数:
+            threads: 编码线程数, 0 为自动
+            filter_threads: 滤镜线程数, None 使用 ffmpeg 默认
+            concurrency: 同时运行的 ffmpeg 进程数; threads 为 None 时按 CPU 核数 / concurrency 计算
+        """
+        if threads is None and concurrency:
+            threads = max(1, (os.cpu_count() or 1) // concurrency)
+        with cls._lock:
+            cls._threads = None if threads is None and filter_threads is None else (threads or 0, filter_threads)
+
+    def video_args(self, name=None, **overrides) -> list:
+        # 视频编码参数 (输出选项), 如 ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18', '-threads', '0']
+        params = self.get(name, **overrides)
+        args = ['-c:v', params['codec']]
+        if params.get('preset'):
+            args += ['-preset', params['preset']]
+        if params.get('crf') is not None:
+            args += ['-crf', str(params['crf'])]
+        if params.get('tune'):
+            args += ['-tune', params['tune']]
+        if params.get('profile'):
+            args += ['-profile:v', params['profile']]
+        if params.get('pix_fmt'):
+            args += ['-pix_fmt', params['pix_fmt']]
+        if params.get('x264_params'):
+            args += ['-x264-params', params['x264_params']]
+        if params.get('threads') is not None:
+            args += ['-threads', str(params['threads'])]
+        if params.get('movflags'):
+            args += ['-movflags', params['movflags']]
+        return args
+
+    def global_args(self, name=None, **overrides) -> list:
+        # 全局选项 (放在 ffmpeg 后面, 所有 -i 之前): 滤镜线程数
+        params = self.get(name, **overrides)
+        if not params.get('filter_threads'):
+            return []
+        filter_threads = str(params['filter_threads'])
+        return ['-filter_threads', filter_threads, '-filter_complex_threads', filter_threads]
+
+    def apply_global_args(self, cmd, name=None, **overrides) -> list:
+        # 在 ffmpeg 程序名后插入全局选项
+        return list(cmd[:1]) + self.global_args(name, **overrides) + list(cmd[1:])
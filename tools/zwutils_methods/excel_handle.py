@@ -4,6 +4,7 @@
 from openpyxl import load_workbook, Workbook
 import pandas as pd
 # pip install pandas openpyxl
+from .dir_scan_handle import DirScanHandle    # 目录扫描
 
 
 class ZwExcelHandler(object):
@@ -13,6 +14,7 @@ class ZwExcelHandler(object):
     """
     def __init__(self, filename=None):
         self.filename = filename
+        self.cls_dir_scan = DirScanHandle()    # 目录扫描
 
     def column_letter_to_number(self, letter: str) -> int:
         """
@@ -367,8 +369,11 @@ def read_excel_files(self, folder_path, sheet_name=0, combine=True):
         返回:
             list 或 DataFrame: 如果 combine=False，返回数据框列表；如果 combine=True，返回一个合并后的数据框。
         """
-        # 获取文件夹内所有 Excel 文件
-        excel_files = [f for f in os.listdir(folder_path) if f.endswith(('.xls', '.xlsx'))]
+        # 获取文件夹内所有 Excel 文件 (跳过 Excel 打开时生成的 ~$ 临时文件)
+        excel_files = [
+            Path(f).name for f in self.cls_dir_scan.list_paths(folder_path, extensions=('.xls', '.xlsx'))
+            if not Path(f).name.startswith('~$')
+        ]
 
         if not excel_files:
             print("No Excel files found in the specified folder.")
@@ -0,0 +1,184 @@
+import os
+import time
+import asyncio
+
+
+class FfmpegAsyncExecutor(object):
+    """
+    ffmpeg 异步执行器 (asyncio.create_subprocess_exec): 限制同时运行的进程数, 每个任务可以设置超时;
+    解析 ffmpeg -progress 输出, 多个任务同时报告进度 (on_progress 回调, 或读取 self.progress)
+    from zwutils_methods import FfmpegAsyncExecutor    # ffmpeg 异步执行器
+    # self.cls_ffmpeg_executor = FfmpegAsyncExecutor(max_concurrency=4, on_progress=FfmpegAsyncExecutor.print_progress)
+    # results = self.cls_ffmpeg_executor.run_batch([cmd1, cmd2, video_job3])    # 同步调用
+    # result = await self.cls_ffmpeg_executor.run(cmd, job_id='a.mp4', duration_ms=15000)    # 异步调用
+    """
+    STDERR_KEEP_BYTES = 16 * 1024   # 每个任务保留的 stderr 末尾字节数 (错误信息)
+
+    def __init__(self, max_concurrency=None, timeout=None, on_progress=None):
+        """
+        max_concurrency: 同时运行的 ffmpeg 进程数, None 为 CPU 核数的一半 (ffmpeg 编码本身是多线程)
+        timeout: 默认每个任务的超时秒数, None 不限制
+        on_progress: 进度回调 on_progress(job_id, progress: dict), progress 见 parse_progress_block
+        """
+        self.max_concurrency = max_concurrency or max(1, (os.cpu_count() or 2) // 2)
+        self.timeout = timeout
+        self.on_progress = on_progress
+        self.progress = {}      # job_id -> 最近一次进度
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 信号量绑定事件循环, 每个事件循环 (如每次 run_batch) 重新创建
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def add_progress_args(self, cmd) -> list:
+        # 在 ffmpeg 程序名后加入 -progress pipe:1 -nostats (进度输出到 stdout)
+        cmd = list(cmd)
+        if '-progress' in cmd:
+            return cmd
+        return cmd[:1] + ['-progress', 'pipe:1', '-nostats'] + cmd[1:]
+
+    def parse_progress_block(self, block, duration_ms=None) -> dict:
+        """
+        解析一段 -progress 输出 (key=value, 以 progress=continue/end 结束)
+
+        返回:
+            dict: {'frame', 'fps', 'speed', 'out_time_ms', 'percent', 'progress'}; 无法得到的值为 None
+        """
+        # ffmpeg 的 out_time_ms 实际单位是微秒, 优先使用 out_time_us
+        out_time_us = block.get('out_time_us', block.get('out_time_ms'))
+        out_time_ms = None
+        if out_time_us is not None and out_time_us.lstrip('-').isdigit():
+            out_time_ms = max(int(out_time_us) // 1000, 0)
+        percent = None
+        if duration_ms and out_time_ms is not None:
+            percent = min(out_time_ms / duration_ms * 100, 100.0)
+        if block.get('progress') == 'end':
+            percent = 100.0
+        speed = block.get('speed', '').rstrip('x')
+        return {
+            'frame': int(block['frame']) if block.get('frame', '').isdigit() else None,
+            'fps': self._to_float(block.get('fps')),
+            'speed': self._to_float(speed),
+            'out_time_ms': out_time_ms,
+            'percent': percent,
+            'progress': block.get('progress'),
+        }
+
+    def _to_float(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    async def _read_progress(self, stream, job_id, duration_ms):
+        block = {}
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            key, sep, value = line.decode('utf-8', errors='replace').strip().partition('=')
+            if not sep:
+                continue
+            block[key] = value
+            if key == 'progress':
+                progress = self.parse_progress_block(block, duration_ms)
+                self.progress[job_id] = progress
+                if self.on_progress is not None:
+                    self.on_progress(job_id, progress)
+                block = {}
+
+    async def _read_stderr(self, stream) -> bytes:
+        # 只保留末尾部分, 避免长任务占用大量内存
+        tail = b''
+        while True:
+            chunk = await stream.read(4096)
+            if not chunk:
+                break
+            tail = (tail + chunk)[-self.STDERR_KEEP_BYTES:]
+        return tail
+
+    async def run(self, cmd, job_id=None, duration_ms=None, timeout=None) -> dict:
+        """
+        异步执行一个 ffmpeg 命令 (受并发数限制)
+
+        参数:
+            cmd: ffmpeg 命令 list, 或有 build_command 方法的对象 (如 VideoJob)
+            job_id: 任务标识 (进度回调和结果中使用), None 使用最后一个参数 (输出路径)
+            duration_ms: 输出时长 (毫秒), 用于计算进度百分比, None 不计算
+            timeout: 超时秒数, None 使用执行器默认值; 超时后结束进程
+
+        返回:
+            dict: {'job_id', 'ok', 'returncode', 'timed_out', 'elapsed', 'stderr'}
+        """
+        if hasattr(cmd, 'build_command'):
+            cmd = cmd.build_command()
+        cmd = self.add_progress_args(cmd)
+        job_id = job_id if job_id is not None else cmd[-1]
+        timeout = timeout if timeout is not None else self.timeout
+        result = {'job_id': job_id, 'ok': False, 'returncode': None, 'timed_out': False, 'elapsed': 0.0, 'stderr': ''}
+
+        async with self._get_semaphore():
+            start = time.perf_counter()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError:
+                raise FileNotFoundError(f"FFmpeg executable '{cmd[0]}' not found")
+
+            stderr_task = asyncio.ensure_future(self._read_stderr(process.stderr))
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(self._read_progress(process.stdout, job_id, duration_ms), process.wait()), timeout
+                )
+            except asyncio.TimeoutError:
+                result['timed_out'] = True
+                process.kill()
+                await process.wait()
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+            finally:
+                stderr = await stderr_task
+
+            result['elapsed'] = time.perf_counter() - start
+            result['returncode'] = process.returncode
+            result['ok'] = process.returncode == 0 and not result['timed_out']
+            result['stderr'] = stderr.decode('utf-8', errors='replace').strip()
+        if result['timed_out']:
+            print(f'Error ffmpeg 超时 ({timeout}s): {job_id}')
+        elif not result['ok']:
+            print(f"Error ffmpeg 执行失败: {job_id}\n{result['stderr'][-1000:]}")
+        return result
+
+    async def run_many(self, jobs) -> list:
+        """
+        异步执行多个任务 (最多 max_concurrency 个同时运行), 结果顺序与 jobs 一致
+
+        参数:
+            jobs: list, 每项为 ffmpeg 命令 list / VideoJob / dict {'cmd', 'job_id', 'duration_ms', 'timeout'}
+        """
+        tasks = []
+        for job in jobs:
+            if isinstance(job, dict):
+                tasks.append(self.run(job['cmd'], job.get('job_id'), job.get('duration_ms'), job.get('timeout')))
+            else:
+                tasks.append(self.run(job))
+        return await asyncio.gather(*tasks)
+
+    def run_batch(self, jobs) -> list:
+        # 同步执行多个任务 (不能在已运行的事件循环中调用, 此时使用 await run_many)
+        return asyncio.run(self.run_many(jobs))
+
+    @staticmethod
+    def print_progress(job_id, progress):
+        # 默认的进度回调: 每个任务一行
+        percent = '--' if progress['percent'] is None else f"{progress['percent']:5.1f}%"
+        speed = '--' if progress['speed'] is None else f"{progress['speed']:.2f}x"
+        print(f"[{os.path.basename(str(job_id))}] {percent} frame={progress['frame']} speed={speed} {progress['progress']}")
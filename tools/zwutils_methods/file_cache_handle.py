@@ -0,0 +1,155 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+
+
+class FileCacheHandle(object):
+    """
+    按内容寻址的文件缓存: key = 输入文件内容 hash + 转换参数; 命中时复制到目标路径 (支持的文件系统上共享数据块)
+    缓存总大小超过 max_bytes 时按最近使用时间(LRU)删除到 max_bytes * low_water (留出余量, 避免每次 put 都重新扫描)
+    缓存文件为只读; link=True 时命中改为硬链接 (更快, 但目标文件与缓存是同一个文件, 不能原地修改目标文件, 需先删除再写入)
+    from zwutils_methods import FileCacheHandle    # 文件缓存
+    # self.cls_file_cache = FileCacheHandle(cache_dir)    # 文件缓存
+    """
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3, low_water=0.9, link=False):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.low_water = low_water
+        self.link = link
+        self._lock = threading.Lock()
+        self._total_bytes = sum(size for _, size, _ in self.scan_entries())    # 缓存总大小, put 时累加, 超出时才重新扫描
+
+    def compute_key(self, file_path=None, params:dict=None, content_hash:str=None) -> str:
+        # 计算缓存 key: sha256(文件内容 hash + 参数); 已计算过文件 hash 时传入 content_hash
+        if content_hash is None:
+            content_hash = self.hash_file(file_path)
+        params_str = json.dumps(params or {}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(f'{content_hash}:{params_str}'.encode('utf-8')).hexdigest()
+
+    def hash_file(self, file_path, chunk_size=1024 * 1024) -> str:
+        # 文件内容 sha256
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    def entry_path(self, key, suffix) -> Path:
+        # 缓存文件路径, 按 key 前两位分目录
+        return self.cache_dir / key[:2] / f'{key}{suffix}'
+
+    def get(self, key, suffix, dest_path) -> bool:
+        """
+        读取缓存到 dest_path
+        返回: 是否命中
+        """
+        entry = self.entry_path(key, suffix)
+        if not entry.is_file():
+            return False
+        try:
+            if self.link:
+                self.link_or_copy(entry, dest_path)
+            else:
+                self.copy_file(entry, dest_path)
+            os.utime(entry)     # 更新最近使用时间 (LRU)
+            return True
+        except OSError as e:
+            print(f'Error read cache failed: {e}')
+            return False
+
+    def put(self, key, suffix, src_path) -> bool:
+        # 保存文件到缓存 (复制, 缓存文件设为只读), 然后按大小淘汰
+        entry = self.entry_path(key, suffix)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_entry = entry.with_name(f'{entry.name}.{os.getpid()}.tmp')
+        try:
+            self.copy_file(src_path, tmp_entry)
+            os.chmod(tmp_entry, 0o444)
+            size = tmp_entry.stat().st_size
+            try:
+                old_size = entry.stat().st_size     # 覆盖已有的缓存文件
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp_entry, entry)
+        except OSError as e:
+            print(f'Error write cache failed: {e}')
+            if tmp_entry.exists():
+                tmp_entry.unlink()
+            return False
+        with self._lock:
+            self._total_bytes += size - old_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+        return True
+
+    def scan_entries(self) -> list:
+        # 扫描所有缓存文件: [(最近使用时间, 大小, 路径), ...]
+        entries = []
+        for sub_dir in os.scandir(self.cache_dir):
+            if not sub_dir.is_dir():
+                continue
+            for entry in os.scandir(sub_dir.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        # 缓存超过 max_bytes 时, 删除最久未使用的文件直到 max_bytes * low_water (重新扫描, 同时校正累计的总大小)
+        with self._lock:
+            entries = self.scan_entries()
+            total_bytes = sum(size for _, size, _ in entries)
+            if total_bytes > self.max_bytes:
+                target_bytes = self.max_bytes * self.low_water
+                entries.sort()
+                for _, size, path in entries:
+                    try:
+                        os.remove(path)
+                        total_bytes -= size
+                    except FileNotFoundError:
+                        pass
+                    if total_bytes <= target_bytes:
+                        break
+            self._total_bytes = total_bytes
+
+    def clear(self):
+        # 清空缓存
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._total_bytes = 0
+
+    def copy_file(self, src_path, dest_path):
+        # 复制文件 (不复制权限, 目标可写); Linux 上用 copy_file_range, btrfs/xfs 等文件系统上共享数据块 (reflink), 否则在内核内复制
+        dest_path = Path(dest_path)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        if dest_path.exists() or dest_path.is_symlink():
+            dest_path.unlink()      # 目标可能是硬链接, 先删除再写入
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(src_path, 'rb') as fsrc, open(dest_path, 'wb') as fdst:
+                    while os.copy_file_range(fsrc.fileno(), fdst.fileno(), 64 * 1024 ** 2):
+                        pass
+                return
+            except OSError:
+                pass    # 文件系统不支持, 普通复制
+        shutil.copyfile(src_path, dest_path)
+
+    def link_or_copy(self, src_path, dest_path):
+        # 硬链接到目标路径, 跨磁盘等不能硬链接时复制
+        dest_path = Path(dest_path)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        if dest_path.exists() or dest_path.is_symlink():
+            dest_path.unlink()
+        try:
+            os.link(src_path, dest_path)
+        except OSError:
+            self.copy_file(src_path, dest_path)
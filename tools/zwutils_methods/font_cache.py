@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from PIL import ImageFont     # pip install pillow
+
+
+class FontCache(object):
+    """
+    进程内共享的字体缓存 (LRU), 避免每次绘制文字都重新解析字体文件
+    key: (font_path, font_size, variation, index)
+    from zwutils_methods import FontCache    # 字体缓存
+    # self.cls_font_cache = FontCache()    # 字体缓存
+    """
+    max_size = 64       # 最多缓存的字体对象数量
+
+    _lock = threading.Lock()
+    _fonts = OrderedDict()
+    _stats = {'hits': 0, 'misses': 0}
+
+    def get_font(self, font_path, font_size, variation=None, index=0) -> ImageFont.FreeTypeFont:
+        """
+        获取字体对象
+
+        参数:
+            font_path: 字体文件路径
+            font_size: 字体大小
+            variation: 可变字体样式; str/bytes 按名称设置 (如 b'Bold'), list/tuple 按轴设置 (如 [700]); None 使用默认样式
+            index: ttc 字体集合中的字体序号
+
+        返回:
+            ImageFont.FreeTypeFont (共享对象, 不要修改其样式)
+        """
+        if isinstance(variation, list):
+            variation = tuple(variation)
+        key = (str(font_path), font_size, variation, index)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self._stats['hits'] += 1
+                return font
+
+            self._stats['misses'] += 1
+            font = ImageFont.truetype(str(font_path), font_size, index=index)
+            if variation is not None:
+                if isinstance(variation, (str, bytes)):
+                    font.set_variation_by_name(variation)
+                else:
+                    font.set_variation_by_axes(list(variation))
+            self._fonts[key] = font
+            while len(self._fonts) > self.max_size:
+                self._fonts.popitem(last=False)
+            return font
+
+    def preload(self, font_paths, font_sizes, variation=None) -> int:
+        """
+        预加载字体, 不存在的字体文件跳过
+        返回: 加载的字体数量
+        """
+        count = 0
+        for font_path in font_paths:
+            if font_path is None or not Path(font_path).is_file():
+                print(f'Font not found, skip preload: {font_path}')
+                continue
+            for font_size in font_sizes:
+                self.get_font(font_path, font_size, variation=variation)
+                count += 1
+        return count
+
+    def stats(self) -> dict:
+        # 缓存命中统计
+        with self._lock:
+            hits, misses = self._stats['hits'], self._stats['misses']
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': hits / (hits + misses) if hits + misses > 0 else 0.0,
+                'size': len(self._fonts),
+                'max_size': self.max_size,
+            }
+
+    @classmethod
+    def set_max_size(cls, max_size:int):
+        # 设置缓存数量上限
+        with cls._lock:
+            cls.max_size = max_size
+            while len(cls._fonts) > cls.max_size:
+                cls._fonts.popitem(last=False)
+
+    @classmethod
+    def clear(cls):
+        # 清空缓存和统计
+        with cls._lock:
+            cls._fonts.clear()
+            cls._stats['hits'] = 0
+            cls._stats['misses'] = 0
@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import threading
+from pathlib import Path
+from .dir_scan_handle import DirScanHandle    # 目录扫描
+
+
+class GoodsIndex(object):
+    """
+    商品目录索引: 遍历一次年份目录 (如 y2025/...), 记录每个商品文件夹 details 中图片的前缀映射,
+    按前缀 (d_N / d_NN, 如 d_8, d_91) 直接查找图片, 不需要每次扫描 details 文件夹
+    刷新时只重新扫描 mtime 改变的目录; 索引可以保存为 json 文件, 启动时直接加载
+    from zwutils_methods import GoodsIndex    # 商品目录索引
+    # self.cls_goods_index = GoodsIndex(year_dir_path, index_path)    # 商品目录索引
+    """
+    VERSION = 1
+    _prefix_pattern = re.compile(r'^d_(\d+)')
+    _key_pattern = re.compile(r'^d_\d{1,2}$')
+
+    def __init__(self, root_dir, index_path=None, max_depth=3):
+        """
+        root_dir: 年份目录 (商品文件夹在 max_depth 层以内, 包含 details 子文件夹)
+        index_path: 索引 json 文件路径, None 不保存
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.index_path = index_path
+        self.max_depth = max_depth
+        self.dirs = {}      # 目录路径 -> {'mtime': mtime_ns, 'subdirs': [子目录名, ...]}
+        self.goods = {}     # 商品文件夹路径 -> {'details_mtime', 'images': [图片名, ...], 'prefixes': {前缀: [图片名, ...]}}
+        self._lock = threading.RLock()
+
+    def check_goods_dir_name(self, goods_dir_name:str) -> bool:
+        # 商品文件夹名规则同 GoodsSetPath.check_goods_dir (不是 _resized 或 _ 结尾)
+        return not goods_dir_name.endswith('_resized') and not goods_dir_name.endswith('_')
+
+    def compute_prefix_keys(self, img_name:str) -> list:
+        # 图片名的前缀 key: d_812_xxx.png -> ['d_8', 'd_81']
+        matched = self._prefix_pattern.match(img_name)
+        if matched is None:
+            return []
+        digits = matched.group(1)
+        return [f'd_{digits[:n]}' for n in (1, 2) if len(digits) >= n]
+
+    def refresh(self) -> dict:
+        """
+        刷新索引: mtime 没有改变的目录不重新扫描, 删除已不存在的商品文件夹
+
+        返回:
+            dict: {'scanned_dirs': 重新扫描的目录数, 'scanned_goods': 重新扫描的商品数, 'removed_goods': 删除的商品数, 'goods': 商品总数}
+        """
+        with self._lock:
+            stats = {'scanned_dirs': 0, 'scanned_goods': 0, 'removed_goods': 0}
+            visited_dirs, found_goods = set(), set()
+            self._walk(self.root_dir, 0, visited_dirs, found_goods, stats)
+            for dir_path in [p for p in self.dirs if p not in visited_dirs]:
+                del self.dirs[dir_path]
+            for goods_path in [p for p in self.goods if p not in found_goods]:
+                del self.goods[goods_path]
+                stats['removed_goods'] += 1
+            stats['goods'] = len(self.goods)
+            return stats
+
+    def _walk(self, dir_path, depth, visited_dirs, found_goods, stats):
+        try:
+            mtime = os.stat(dir_path).st_mtime_ns
+        except OSError:
+            return
+        visited_dirs.add(dir_path)
+        node = self.dirs.get(dir_path)
+        if node is None or node['mtime'] != mtime:
+            with os.scandir(dir_path) as it:
+                subdirs = sorted(entry.name for entry in it if entry.is_dir())
+            node = {'mtime': mtime, 'subdirs': subdirs}
+            self.dirs[dir_path] = node
+            stats['scanned_dirs'] += 1
+
+        if 'details' in node['subdirs'] and self.check_goods_dir_name(os.path.basename(dir_path)):
+            if self._refresh_goods(dir_path):
+                stats['scanned_goods'] += 1
+            found_goods.add(dir_path)
+            return
+        if depth >= self.max_depth:
+            return
+        for name in node['subdirs']:
+            self._walk(os.path.join(dir_path, name), depth + 1, visited_dirs, found_goods, stats)
+
+    def _refresh_goods(self, goods_path) -> bool:
+        # 刷新一个商品文件夹的 details 图片; 返回是否重新扫描
+        details_path = os.path.join(goods_path, 'details')
+        try:
+            details_mtime = os.stat(details_path).st_mtime_ns
+        except OSError:
+            self.goods.pop(goods_path, None)
+            return False
+        goods = self.goods.get(goods_path)
+        if goods is not None and goods['details_mtime'] == details_mtime:
+            return False
+
+        images = []
+        with os.scandir(details_path) as it:
+            for entry in it:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in DirScanHandle.IMAGE_EXTENSIONS:
+                    images.append(entry.name)
+        images.sort()
+        prefixes = {}
+        for img_name in images:
+            for key in self.compute_prefix_keys(img_name):
+                prefixes.setdefault(key, []).append(img_name)
+        self.goods[goods_path] = {'details_mtime': details_mtime, 'images': images, 'prefixes': prefixes}
+        return True
+
+    def lookup(self, goods_path, prefix, validate=True) -> list:
+        """
+        查找商品 details 中指定前缀的图片路径 (已排序)
+
+        参数:
+            goods_path: 商品文件夹路径
+            prefix: 前缀 str 或 tuple; d_N / d_NN 形式直接查表, 其它前缀逐个匹配
+            validate: True 时检查 details 的 mtime, 改变则重新扫描该商品 (一次 stat)
+
+        返回:
+            list: 图片路径
+
+        异常:
+            FileNotFoundError: details 文件夹不存在 (与不使用索引时 DirScanHandle.scan 一致)
+        """
+        goods_path = os.path.abspath(goods_path)
+        details_path = os.path.join(goods_path, 'details')
+        with self._lock:
+            if validate or goods_path not in self.goods:
+                self._refresh_goods(goods_path)
+            goods = self.goods.get(goods_path)
+            if goods is None:
+                raise FileNotFoundError(f"The specified folder does not exist. ({details_path})")
+            prefixes = (prefix, ) if isinstance(prefix, str) else tuple(prefix)
+            if all(self._key_pattern.match(p) for p in prefixes):
+                names = set()
+                for p in prefixes:
+                    names.update(goods['prefixes'].get(p, ()))
+                img_names = [name for name in goods['images'] if name in names]
+            else:
+                img_names = [name for name in goods['images'] if name.startswith(prefixes)]
+        return [os.path.join(details_path, name) for name in img_names]
+
+    def find_goods_dirs(self, dir_prefix=None, date_prefix=None) -> list:
+        # 按商品文件夹名 {dir_prefix}_{date_prefix}_{version}_{series} 筛选商品文件夹路径 (已排序)
+        ret_paths = []
+        with self._lock:
+            for goods_path in self.goods:
+                name_splited = os.path.basename(goods_path).split('_')
+                if dir_prefix is not None and name_splited[0] != dir_prefix:
+                    continue
+                if date_prefix is not None and (len(name_splited) < 2 or name_splited[1] != date_prefix):
+                    continue
+                ret_paths.append(goods_path)
+        return sorted(ret_paths)
+
+    def save(self, index_path=None) -> bool:
+        # 保存索引到 json 文件
+        index_path = index_path or self.index_path
+        if index_path is None:
+            return False
+        index_path = Path(index_path)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = index_path.with_name(f'{index_path.name}.{os.getpid()}.tmp')
+        with self._lock:
+            data = {'version': self.VERSION, 'root_dir': self.root_dir, 'dirs': self.dirs, 'goods': self.goods}
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, index_path)
+            except OSError as e:
+                print(f'Error save goods index failed: {e}')
+                return False
+        return True
+
+    def load(self, index_path=None) -> bool:
+        # 从 json 文件加载索引 (版本或根目录不一致时不加载); 加载后调用 refresh 更新改变的目录
+        index_path = index_path or self.index_path
+        if index_path is None or not os.path.isfile(index_path):
+            return False
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f'Error load goods index failed: {e}')
+            return False
+        if data.get('version') != self.VERSION or data.get('root_dir') != self.root_dir:
+            return False
+        with self._lock:
+            self.dirs = data.get('dirs', {})
+            self.goods = data.get('goods', {})
+        return True
+
+    def load_or_build(self) -> dict:
+        # 加载索引 (如果有) + 增量刷新 + 保存; 返回 refresh 的统计
+        self.load()
+        stats = self.refresh()
+        if stats['scanned_dirs'] or stats['scanned_goods'] or stats['removed_goods']:
+            self.save()
+        return stats
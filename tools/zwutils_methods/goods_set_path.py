@@ -1,9 +1,9 @@
-import os
 import datetime
 import pytz     # pip install pytz
 import shutil
 from pathlib import Path
 from typing import Tuple
+from .dir_scan_handle import DirScanHandle    # 目录扫描
 
 
 class GoodsSetPath(object):
@@ -13,8 +13,20 @@ class GoodsSetPath(object):
 
     # 商品文件夹按日放到同一个文夹内 (新的文件归类) version: 1.0
     """
-    def __init__(self):
-        pass
+    def __init__(self, goods_index=None):
+        self.cls_dir_scan = DirScanHandle()    # 目录扫描
+        self.cls_goods_index = goods_index    # 商品目录索引 (GoodsIndex), None 每次扫描 details 文件夹
+
+    def set_goods_index(self, goods_index):
+        # 设置商品目录索引 (GoodsIndex), 查找 details 图片时直接查表
+        self.cls_goods_index = goods_index
+
+    def get_details_imgs_paths(self, goods_path, prefix) -> list:
+        # 商品 details 文件夹中指定前缀的图片路径 (已排序); 有商品目录索引时查表
+        if self.cls_goods_index is not None:
+            return self.cls_goods_index.lookup(goods_path, prefix)
+        details_dir_path = str(Path(goods_path) / 'details')
+        return self.get_imgs_paths_in_dir(folder_path=details_dir_path, prefix=prefix)
 
     def today_year_month_day(self):
         """
@@ -99,7 +111,6 @@ def compute_detail_img_path(self, detail_img_name, goods_dir_path) -> str:
     def compute_goods_object_bg_imgs_path(self, goods_path, object_img_name=None, bg_img_name=None):
         # 计算商品和背景图片的路径
         # object_img_name, bg_img_name 可以带后缀，也可不带后缀
-        details_dir_path = str(Path(goods_path) / 'details')
         object_img_name_stem, bg_img_name_stem = None, None
         if object_img_name is not None:
             object_img_name_stem = Path(object_img_name).stem
@@ -108,7 +119,7 @@ def compute_goods_object_bg_imgs_path(self, goods_path, object_img_name=None, bg
 
         object_img_path, bg_img_path = None, None
 
-        all_details_imgs = self.get_imgs_paths_in_dir(folder_path=details_dir_path, prefix=('d_91', 'd_92', ))
+        all_details_imgs = self.get_details_imgs_paths(goods_path, prefix=('d_91', 'd_92', ))
         for d_path in all_details_imgs:
             d_path_stem = Path(d_path).stem
             if object_img_name_stem is not None:
@@ -133,8 +144,7 @@ def compute_goods_gimp_base_imgs_paths(self, goods_path, base_imgs_names = None)
         # 计算基础图片的路径 
         # base_imgs_names==None 全部 d_8 开头的图片路径; 否则d_8开头的路径筛选包含 base_imgs_names 的图片 
         ret_imgs_paths = []
-        details_dir_path = str(Path(goods_path) / 'details')
-        all_d8_imgs = self.get_imgs_paths_in_dir(folder_path=details_dir_path, prefix=('d_8', ))
+        all_d8_imgs = self.get_details_imgs_paths(goods_path, prefix=('d_8', ))
         if base_imgs_names is not None:
             ret_imgs_paths = [img_path for img_path in all_d8_imgs if Path(img_path).name in base_imgs_names or Path(img_path).stem in base_imgs_names]
             return ret_imgs_paths
@@ -143,33 +153,8 @@ def compute_goods_gimp_base_imgs_paths(self, goods_path, base_imgs_names = None)
 
     def get_imgs_paths_in_dir(self, folder_path, prefix=None):
         '''
-        获取指定目录下的所有图片路径
+        获取指定目录下的所有图片路径 (已排序; 目录扫描结果按目录 mtime 缓存)
         :param dir_path: 图片所在的目录
         :return: list
         '''
-        # 检查文件夹是否存在且是一个目录
-        if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-            raise FileNotFoundError(f"The specified folder does not exist. ({folder_path})")
-        
-        image_paths = []
-        
-        # 遍历文件夹中的每一个文件和子目录
-        for filename in os.listdir(folder_path):
-            if prefix is not None and not filename.startswith(prefix):
-                continue
-
-            file_path = os.path.join(folder_path, filename)
-            
-            # 确保处理的是文件而不是子目录
-            if os.path.isfile(file_path):
-                ext = os.path.splitext(filename)[1].lower()  # 获取扩展名并转为小写
-                
-                # 检查是否是JPG或PNG格式
-                if ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                    image_paths.append(file_path)
-        
-        # 对路径列表进行排序
-        image_paths.sort()
-        
-        return image_paths
-
+        return self.cls_dir_scan.list_paths(folder_path, kinds=('image', ), prefix=prefix)
@@ -0,0 +1,252 @@
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .img_handle import ImgHandle    # 图片基本操作
+
+
+def run_pipeline_job(ops, img_path, save_path):
+    # 流水线处理单张图片 (进程池任务, 必须是模块级函数)
+    ret = ImagePipeline(ops).run(img_path, output_path=save_path)
+    if ret is None:
+        raise RuntimeError(f'处理图片失败: {img_path}')
+    return save_path
+
+
+class ImagePipeline(object):
+    """
+    图片处理流水线 (延迟执行): 先记录操作, run 时才读取图片并执行
+    相邻的几何操作合并执行: 裁剪只记录区域 (不复制), 裁剪+缩放合并为一次对区域视图的缩放, 连续缩放只执行最后一次;
+    遇到像素操作 (合成/圆角/渐变等) 时才生成数组, 最后只生成一次结果
+    每个操作返回新的流水线, 可以复用公共的前半部分
+    from zwutils_methods import ImagePipeline    # 图片处理流水线
+    # pipeline = ImagePipeline().crop_to_ratio((750, 1000)).resize((750, 1000)).round_corner(20)
+    # img = pipeline.run(img_path, output_path)    # 单张图片
+    # pipeline.run_dir(dir_path, output_dir, workers=4)    # 整个文件夹, 多进程
+    """
+    GEOMETRY_OPS = ('crop', 'crop_center', 'crop_to_ratio', 'resize', 'resize_by_width', 'resize_by_height', 'fit')
+
+    def __init__(self, ops=None):
+        self.ops = list(ops or [])      # [(操作名, 参数 dict), ...]
+        self.cls_imghandle = ImgHandle()    # 图片基本操作
+        self.errors = []    # 最近一次 run_dir 的错误 [{'path', 'error'}, ...]
+
+    def __repr__(self):
+        return f"ImagePipeline({' -> '.join(name for name, _ in self.ops)})"
+
+    def _add(self, name, **params):
+        return ImagePipeline(self.ops + [(name, params)])
+
+    # ---------- 几何操作 (合并执行) ----------
+    def crop(self, x, y, width, height):
+        # 裁剪指定区域 (超出图片的部分忽略)
+        return self._add('crop', x=x, y=y, width=width, height=height)
+
+    def crop_center(self, width, height):
+        # 居中裁剪, 同 ImgHandle.crop_ndarray
+        return self._add('crop_center', width=width, height=height)
+
+    def crop_to_ratio(self, target_size):
+        # 按目标比例居中裁剪, 同 ImgHandle.crop_img_with_target_ratio; target_size: (width, height)
+        return self._add('crop_to_ratio', target_size=tuple(target_size))
+
+    def resize(self, target_size, interpolation=None):
+        # 缩放到 target_size: (width, height)
+        return self._add('resize', target_size=tuple(target_size), interpolation=interpolation)
+
+    def resize_by_width(self, target_width, interpolation=None):
+        # 按宽度等比缩放, 同 ImgHandle.resize_ndarray_by_width
+        return self._add('resize_by_width', target_width=target_width, interpolation=interpolation)
+
+    def resize_by_height(self, target_height, interpolation=None):
+        # 按高度等比缩放, 同 ImgHandle.resize_ndarray_by_height
+        return self._add('resize_by_height', target_height=target_height, interpolation=interpolation)
+
+    def fit(self, target_width, target_height, mode='fit', interpolation=None):
+        # 缩放到目标范围内, 同 ImgHandle.resize_ndarray_within_bounds; fill 模式先按比例裁剪再缩放 (只缩放需要的区域)
+        return self._add('fit', target_width=target_width, target_height=target_height, mode=mode, interpolation=interpolation)
+
+    # ---------- 像素操作 ----------
+    def combine(self, overlay, position=(0, 0), mode='threshold', alpha_threshold=50):
+        # 合成图片, 同 ImgHandle.combine_ndarray; overlay: 图片路径或 ndarray
+        return self._add('combine', overlay=overlay, position=tuple(position), mode=mode, alpha_threshold=alpha_threshold)
+
+    def round_corner(self, corner_radius=None):
+        # 圆角, 同 ImgHandle.add_round_corner
+        return self._add('round_corner', corner_radius=corner_radius)
+
+    def cover_gradient(self, cover_color, direction='vertical'):
+        # 渐变遮盖颜色, 同 ImgHandle.overlay_gradient_color
+        return self._add('cover_gradient', cover_color=tuple(cover_color), direction=direction)
+
+    def glass(self, radius=5, seed=None):
+        # 毛玻璃效果, 同 ImgHandle.apply_glass_effect
+        return self._add('glass', radius=radius, seed=seed)
+
+    def add_alpha(self):
+        # 增加 alpha 通道
+        return self._add('add_alpha')
+
+    def apply(self, func, **kwargs):
+        # 自定义操作 func(img, **kwargs) -> img; run_dir 多进程时 func 必须是模块级函数
+        return self._add('apply', func=func, kwargs=kwargs)
+
+    # ---------- 执行 ----------
+    def run(self, src, output_path=None) -> np.ndarray | None:
+        """
+        执行流水线
+
+        参数:
+            src: 图片路径或 ndarray (不会被修改)
+            output_path: 保存路径, None 不保存
+
+        返回:
+            np.ndarray: 处理后的图片; 读取/保存失败返回 None
+        """
+        if isinstance(src, np.ndarray):
+            img = src
+        else:
+            img = self.cls_imghandle.img_to_ndarray(str(src))
+            if img is None:
+                return None
+
+        # 几何状态: 原图上的区域 (x0, y0, x1, y1) + 待执行的缩放尺寸
+        roi = [0, 0, img.shape[1], img.shape[0]]
+        pending_size, pending_interpolation = None, None
+        owned = False   # img 是否是流水线生成的数组 (可以原地修改)
+
+        def current_size():
+            return pending_size if pending_size is not None else (roi[2] - roi[0], roi[3] - roi[1])
+
+        def flush():
+            # 执行待执行的几何操作: 区域视图 + 一次缩放
+            nonlocal img, roi, pending_size, pending_interpolation, owned
+            view = img[roi[1]:roi[3], roi[0]:roi[2]]
+            if pending_size is not None:
+                img = self.cls_imghandle.resize_ndarray(pending_size, view, interpolation=pending_interpolation)
+                owned = img.flags.writeable    # 缩放后端返回只读数组时, 像素操作前复制
+            elif view.shape[:2] != img.shape[:2]:
+                img = view
+            roi = [0, 0, img.shape[1], img.shape[0]]
+            pending_size, pending_interpolation = None, None
+
+        def crop_box(x, y, width, height):
+            # 在当前尺寸上裁剪; 有待执行的缩放时先执行缩放
+            nonlocal roi
+            if pending_size is not None:
+                flush()
+            x0 = min(max(roi[0] + x, roi[0]), roi[2])
+            y0 = min(max(roi[1] + y, roi[1]), roi[3])
+            roi = [x0, y0, min(x0 + width, roi[2]), min(y0 + height, roi[3])]
+
+        for name, params in self.ops:
+            if name in self.GEOMETRY_OPS:
+                width, height = current_size()
+                if name == 'crop':
+                    crop_box(params['x'], params['y'], params['width'], params['height'])
+                elif name == 'crop_center':
+                    crop_width, crop_height = min(params['width'], width), min(params['height'], height)
+                    crop_box((width - crop_width) // 2, (height - crop_height) // 2, crop_width, crop_height)
+                elif name == 'crop_to_ratio':
+                    x0, y0, x1, y1 = self.cls_imghandle.compute_ratio_crop_box(width, height, params['target_size'])
+                    crop_box(x0, y0, x1 - x0, y1 - y0)
+                elif name == 'fit' and params['mode'] == 'fill':
+                    target_size = (params['target_width'], params['target_height'])
+                    x0, y0, x1, y1 = self.cls_imghandle.compute_ratio_crop_box(width, height, target_size)
+                    crop_box(x0, y0, x1 - x0, y1 - y0)
+                    pending_size, pending_interpolation = target_size, params['interpolation']
+                else:
+                    pending_size = self.compute_resize_size(name, params, width, height)
+                    pending_interpolation = params['interpolation']
+                continue
+
+            flush()
+            if not owned:
+                img = img.copy()
+                owned = True
+            img = self.apply_pixel_op(name, params, img)
+            owned = img.flags.writeable
+
+        flush()
+        if not owned:
+            img = img.copy()
+
+        if output_path is not None and not self.cls_imghandle.ndarray_to_img(img, write_path=str(output_path)):
+            print(f'Error save image failed: {output_path}')
+            return None
+        return img
+
+    def compute_resize_size(self, name, params, width, height) -> tuple:
+        # 缩放操作的目标尺寸 (与 ImgHandle 对应方法的计算方式一致)
+        if name == 'resize':
+            return params['target_size']
+        if name == 'resize_by_width':
+            return (params['target_width'], int(height / width * float(params['target_width'])))
+        if name == 'resize_by_height':
+            return (int(round(width / height * params['target_height'])), int(params['target_height']))
+        # fit
+        scale = min(params['target_width'] / width, params['target_height'] / height)
+        return (int(width * scale), int(height * scale))
+
+    def apply_pixel_op(self, name, params, img) -> np.ndarray:
+        # 执行像素操作, img 可以原地修改
+        if name == 'combine':
+            overlay = params['overlay']
+            if not isinstance(overlay, np.ndarray):
+                overlay = self.cls_imghandle.img_to_ndarray(str(overlay))
+                if overlay is None:
+                    raise FileNotFoundError(f"Failed to load image from {params['overlay']}")
+            return self.cls_imghandle.composite_ndarray(
+                img, overlay, params['position'], mode=params['mode'], alpha_threshold=params['alpha_threshold'], inplace=True
+            )
+        if name == 'round_corner':
+            return self.cls_imghandle.add_round_corner(img, corner_radius=params['corner_radius'])
+        if name == 'cover_gradient':
+            out = img if img.ndim == 3 and img.shape[2] == 4 else None
+            return self.cls_imghandle.overlay_gradient_color(img, params['cover_color'], direction=params['direction'], out=out)
+        if name == 'glass':
+            return self.cls_imghandle.apply_glass_effect(img, radius=params['radius'], seed=params['seed'])
+        if name == 'add_alpha':
+            return self.cls_imghandle.to_bgra(img)
+        if name == 'apply':
+            return params['func'](img, **params['kwargs'])
+        raise ValueError(f'未知的操作: {name}')
+
+    def run_dir(self, dir_path, output_dir, workers=1, prefix=None, suffix=None) -> list:
+        """
+        对文件夹中的所有图片执行流水线
+
+        参数:
+            dir_path: 图片文件夹
+            output_dir: 输出文件夹
+            workers: 进程数, 1 单进程顺序处理
+            prefix: 图片名称前缀
+            suffix: 输出文件后缀 (如 '.png'), None 与原图相同
+
+        返回:
+            list: 成功保存的图片路径; 错误记录在 self.errors
+        """
+        imgs_paths = self.cls_imghandle.get_imgs_paths_in_dir(dir_path, prefix=prefix)
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        jobs = [(img_path, str(output_dir / f'{Path(img_path).stem}{suffix or Path(img_path).suffix}')) for img_path in imgs_paths]
+
+        self.errors = []
+        saved_paths = []
+        if workers <= 1:
+            for img_path, save_path in jobs:
+                try:
+                    saved_paths.append(run_pipeline_job(self.ops, img_path, save_path))
+                except Exception as e:
+                    print(f'Error {img_path}: {e}')
+                    self.errors.append({'path': img_path, 'error': str(e)})
+            return saved_paths
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(img_path, pool.submit(run_pipeline_job, self.ops, img_path, save_path)) for img_path, save_path in jobs]
+            for img_path, future in futures:    # 按输入顺序收集结果
+                try:
+                    saved_paths.append(future.result())
+                except Exception as e:
+                    print(f'Error {img_path}: {e}')
+                    self.errors.append({'path': img_path, 'error': str(e)})
+        return saved_paths
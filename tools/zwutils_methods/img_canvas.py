@@ -0,0 +1,155 @@
+import re
+import cv2      # pip install opencv-python
+import numpy as np
+from PIL import Image, ImageDraw
+from .font_cache import FontCache    # 字体缓存
+from .text_layout import TextLayout    # 文字排版
+
+
+class ImgCanvas(object):
+    """
+    图片绘制会话: cv2 图像只转换一次为 PIL, 多次绘制文字/粘贴图片/矩形后, commit() 一次转换回 cv2
+    颜色参数统一为 BGR / BGRA (与 cv2 一致)
+    from zwutils_methods import ImgCanvas    # 图片绘制会话
+    # canvas = ImgCanvas(img_ndarray)    # 图片绘制会话
+    # canvas.text_wrap(...); canvas.paste(...); img_ndarray = canvas.commit()
+    # with ImgCanvas(img_ndarray) as canvas:    # 正常退出 with 时自动 commit, 结果为 canvas.result
+    #     canvas.text_wrap(...)
+    # img_ndarray = canvas.result
+    """
+    _cn_pattern = re.compile(r"([^一-鿿]+|[一-鿿]+)")
+
+    def __init__(self, cv2_ndarray:np.ndarray):
+        self.cls_font_cache = FontCache()    # 字体缓存
+        self.cls_text_layout = TextLayout()    # 文字排版
+        self.height, self.width = cv2_ndarray.shape[:2]
+        if cv2_ndarray.ndim == 3 and cv2_ndarray.shape[2] == 4:  # BGRA format, with alpha channel
+            self.pil_img = Image.fromarray(cv2.cvtColor(cv2_ndarray, cv2.COLOR_BGRA2RGBA))
+        else:  # BGR format, without alpha channel
+            self.pil_img = Image.fromarray(cv2.cvtColor(cv2_ndarray, cv2.COLOR_BGR2RGB))
+        self.draw = ImageDraw.Draw(self.pil_img)
+        self.result = None      # with 正常退出时 commit() 的结果
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # 正常退出时 commit; 有异常时不转换, 异常继续抛出
+        if exc_type is None:
+            self.result = self.commit()
+        return False
+
+    def commit(self) -> np.ndarray:
+        # 转换回 cv2 格式 (BGR 或 BGRA)
+        if self.pil_img.mode == 'RGBA':
+            return cv2.cvtColor(np.asarray(self.pil_img), cv2.COLOR_RGBA2BGRA)
+        return cv2.cvtColor(np.asarray(self.pil_img), cv2.COLOR_RGB2BGR)
+
+    def to_fill(self, color):
+        # BGR(A) 颜色转 PIL 的 RGB(A)
+        if color is None:
+            return None
+        if len(color) == 4:
+            return (color[2], color[1], color[0], color[3])
+        return (color[2], color[1], color[0])
+
+    def text(self, text, pos, font_path, font_size=16, color=None, font_path_en=None) -> float:
+        """
+        单行文字; font_path_en 不为 None 时中英文混排(中文使用 font_path, 其它使用 font_path_en)
+        返回: 文字结束的 x 坐标
+        """
+        if color is None:
+            color = (10, 10, 10)
+        fill = self.to_fill(color[:3])
+        x, y = pos
+        if font_path_en is None:
+            font = self.cls_font_cache.get_font(font_path, font_size)
+            self.draw.text((x, y), text, font=font, fill=fill)
+            return x + font.getlength(text)
+
+        for segment in self._cn_pattern.findall(text):
+            if re.search(r"[一-鿿]", segment):  # 如果是中文
+                font = self.cls_font_cache.get_font(font_path, font_size)
+            else:  # 如果是英文/符号
+                font = self.cls_font_cache.get_font(font_path_en, font_size)
+            # 绘制当前片段
+            self.draw.text((x, y), segment, font=font, fill=fill)
+            # 更新 x 位置（避免重叠）
+            x += font.getlength(segment)
+        return x
+
+    def compute_max_width(self, x, max_width=None):
+        # 文字最大行宽: None 使用图像宽度减去 x 坐标, 否则不超过图像宽度减去 x 坐标
+        if max_width is None:
+            return self.width - x
+        return min(max_width, self.width - x)
+
+    def text_wrap(self, text, position, font_path, font_size, color, line_spacing=1.5, max_width=None):
+        """
+        自动换行的文字
+        返回: (文字区域宽度, 文字区域高度)
+        """
+        x, y = position
+        font = self.cls_font_cache.get_font(font_path, font_size)
+        layout = self.cls_text_layout.measure(text, font, font_size, self.compute_max_width(x, max_width), line_spacing=line_spacing)
+        self.draw_layout(layout, (x, y), font, color)
+        return layout['width'], layout['height']
+
+    def text_multiline(self, text, position, font_path, font_size, color,
+                       line_spacing=1.5, max_width=None, paragraph_spacing=1.2):
+        """
+        支持换行符的多段文字
+        返回: (总宽度, 总高度)
+        """
+        x, y = position
+        font = self.cls_font_cache.get_font(font_path, font_size)
+        layout = self.cls_text_layout.measure_multiline(
+            text, font, font_size, self.compute_max_width(x, max_width),
+            line_spacing=line_spacing, paragraph_spacing=paragraph_spacing
+        )
+        for para_layout in layout['paragraphs']:
+            self.draw_layout(para_layout, (x, y + para_layout['y']), font, color)
+        return layout['width'], layout['height']
+
+    def draw_layout(self, layout, position, font, color):
+        # 按排版结果逐行绘制 (TextLayout.measure 的结果)
+        x, y_offset = position
+        fill = self.to_fill(color[:3])
+        for line, _ in layout['lines']:
+            self.draw.text((x, y_offset), line, font=font, fill=fill)
+            y_offset += layout['line_height']
+
+    def rectangle(self, xy, fill=None, outline=None, width=1, radius=0):
+        """
+        矩形
+        xy: (x0, y0, x1, y1); fill / outline: BGR(A) 颜色; radius > 0 为圆角矩形
+        """
+        if radius > 0:
+            self.draw.rounded_rectangle(xy, radius=radius, fill=self.to_fill(fill), outline=self.to_fill(outline), width=width)
+        else:
+            self.draw.rectangle(xy, fill=self.to_fill(fill), outline=self.to_fill(outline), width=width)
+
+    def paste(self, img_ndarray:np.ndarray, position=(0, 0)):
+        """
+        粘贴 cv2 图片, 有 alpha 通道时按 alpha 叠加; position 可以为负数或部分超出画布
+        """
+        x, y = int(position[0]), int(position[1])
+        h, w = img_ndarray.shape[:2]
+        # 裁剪到画布范围内
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.width), min(y + h, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = img_ndarray[y0 - y:y1 - y, x0 - x:x1 - x]
+
+        if roi.ndim == 3 and roi.shape[2] == 4:
+            src = Image.fromarray(cv2.cvtColor(roi, cv2.COLOR_BGRA2RGBA))
+            if self.pil_img.mode == 'RGBA':
+                self.pil_img.alpha_composite(src, dest=(x0, y0))
+            else:
+                self.pil_img.paste(src, (x0, y0), mask=src.getchannel('A'))
+        else:
+            if roi.ndim == 2:
+                roi = cv2.cvtColor(roi, cv2.COLOR_GRAY2BGR)
+            src = Image.fromarray(cv2.cvtColor(roi, cv2.COLOR_BGR2RGB))
+            self.pil_img.paste(src, (x0, y0))
@@ -5,10 +5,14 @@
 from PIL import Image, ImageDraw, ImageFont
 import os
 import subprocess
-import random
-import re
 import copy
 from vtracer import convert_image_to_svg_py         # pip install vtracer
+from .resize_handle import ResizeHandle    # 图片缩放
+from .font_cache import FontCache    # 字体缓存
+from .text_layout import TextLayout    # 文字排版
+from .img_canvas import ImgCanvas    # 图片绘制会话
+from .table_renderer import TableRenderer    # 表格绘制
+from .dir_scan_handle import DirScanHandle    # 目录扫描
 # 图片基本操作
 
 
@@ -17,8 +21,14 @@ class ImgHandle(object):
     from zwutils_methods import ImgHandle    # 图片基本操作
     # self.cls_imghandle = ImgHandle()    # 图片基本操作
     """
+    BLEND_BYTES_PER_PIXEL = 72      # blend_images 整数计算每个像素的临时内存 (uint32 中间结果)
+
     def __init__(self):
-        pass
+        self.cls_resize_handle = ResizeHandle()    # 图片缩放
+        self.cls_font_cache = FontCache()    # 字体缓存
+        self.cls_text_layout = TextLayout()    # 文字排版
+        self.cls_dir_scan = DirScanHandle()    # 目录扫描
+        self.blend_max_bytes = 64 * 1024 ** 2     # blend_images 整数计算的临时内存上限, 超过时按行分块
 
     def create_image(self, width, height, color) -> np.ndarray:
         """
@@ -97,10 +107,9 @@ def width_height(self, img:np.ndarray) -> tuple:
     
     def text_width_height(self, text, bg_ndarray, font_path, font_size=16):
         # Compute the size of a text in a PIL font
-        # 创建空白图像
-        w, h =self.width_height(bg_ndarray)
-        font = ImageFont.truetype(font_path, font_size)
-        img = Image.new("RGB", (w, h), (255, 255, 255))
+        # 文字边界框与画布尺寸无关, 使用 1x1 的图像测量
+        font = self.cls_font_cache.get_font(font_path, font_size)
+        img = Image.new("RGB", (1, 1), (255, 255, 255))
 
         # 创建绘图对象
         draw = ImageDraw.Draw(img)
@@ -114,46 +123,106 @@ def text_width_height(self, text, bg_ndarray, font_path, font_size=16):
         return text_width, text_height
     
     def check_alpha(self, img_path) -> bool:
-        # 判断图片是否有 alpha 通道; 至少有 50 个像素 alpha == 0
-        img_ndarr = self.img_to_ndarray(img_path=img_path)
-        have_alpha = img_ndarr.shape[2] == 4
-        if not have_alpha:
+        # 判断图片是否有 alpha 通道; 至少有 30 个像素 alpha == 0
+        # 先读取图片头判断是否有透明通道, 有透明通道才解码统计透明像素
+        img_info = self.probe_img(img_path)
+        if img_info is None or not img_info['has_alpha']:
             return False
-        # 分离Alpha通道
-        alpha_channel = img_ndarr[:, :, 3]
+        img_ndarr = self.img_to_ndarray(img_path=img_path)
+        if img_ndarr is not None and img_ndarr.ndim == 3 and img_ndarr.shape[2] == 4:
+            # 分离Alpha通道
+            alpha_channel = img_ndarr[:, :, 3]
+        else:
+            # 调色板透明等 cv2 不返回 alpha 的格式, 使用 Pillow 解码 alpha
+            with Image.open(img_path) as img:
+                alpha_channel = np.asarray(img.convert('RGBA').getchannel('A'))
         # 统计Alpha值为0的像素数量
-        transparent_pixels = np.sum(alpha_channel == 0)
+        transparent_pixels = np.count_nonzero(alpha_channel == 0)
         return transparent_pixels > 30      # 透明像素数量 > 30 才是有透明图层
+
+    def probe_img(self, img_path) -> dict | None:
+        """
+        只读取图片头获取图片信息, 不解码像素
+
+        参数:
+            img_path: 图片路径
+
+        返回:
+            dict: {'width', 'height', 'mode', 'channels', 'has_alpha', 'format'}; 不是图片或读取失败返回 None
+        """
+        try:
+            with Image.open(img_path) as img:
+                width, height = img.size
+                mode = img.mode
+                has_alpha = mode in ('RGBA', 'RGBa', 'LA', 'La', 'PA') or 'transparency' in img.info
+                return {
+                    'width': width,
+                    'height': height,
+                    'mode': mode,
+                    'channels': len(img.getbands()),
+                    'has_alpha': has_alpha,
+                    'format': img.format,
+                }
+        except Exception:
+            return None
     
-    def add_alpha(self, img:np.ndarray) -> np.ndarray:
+    def add_alpha(self, img:np.ndarray, out:np.ndarray=None) -> np.ndarray:
         """
-        检查 NumPy 数组是否具有 alpha 通道，如果没有，则添加一个 alpha 通道并设置为透明。
+        检查 NumPy 数组是否具有 alpha 通道，如果没有，则添加一个 alpha 通道并设置为不透明 (255)。
 
         参数:
-            ndarray: 要检查的 NumPy 数组。
+            img: 要检查的 NumPy 数组 (灰度 / BGR / BGRA)。
+            out: 预先分配的 (H, W, 4) 数组, 参考 to_bgra
 
         返回:
-            如果 ndarray 具有 alpha 通道，则返回原始 ndarray。
-            如果 ndarray 没有 alpha 通道，则返回添加了 alpha 通道的 ndarray。
+            如果 img 具有 alpha 通道且 out 为 None，则返回原始 img。
+            否则返回添加了 alpha 通道的 BGRA 数组。
         """
+        return self.to_bgra(img, out=out)
 
-        if img.shape[2] == 4:  # Already has an alpha channel
-            return img
+    def to_bgra(self, img:np.ndarray, out:np.ndarray=None) -> np.ndarray:
+        """
+        转换为 BGRA (alpha 不透明), cv2.cvtColor 直接写入目标数组, 不使用 np.concatenate 生成临时数组
 
-        else:  # Add alpha channel
-            height, width = img.shape[:2]
+        参数:
+            img: 灰度 / BGR / BGRA 图像
+            out: 预先分配的 (H, W, 4) 数组, 可以是大图中的一块区域 (如 canvas[y0:y1, x0:x1]), 方便重复使用缓冲区;
+                 None 时新建 (BGRA 输入直接返回 img, 不复制)
 
-            # Correct way to create the alpha channel with the right dtype:
-            alpha_channel = np.full((height, width, 1), 255, dtype=img.dtype)
+        返回:
+            BGRA 图像 (out 不为 None 时返回 out)
+        """
+        if img.ndim == 2 or img.shape[2] == 1:
+            code = cv2.COLOR_GRAY2BGRA
+        elif img.shape[2] == 3:
+            code = cv2.COLOR_BGR2BGRA
+        elif img.shape[2] == 4:     # Already has an alpha channel
+            if out is None:
+                return img
+            if out is not img:
+                np.copyto(out, img)
+            return out
+        else:
+            raise ValueError(f"不支持的通道数: {img.shape[2]}")
 
-            # Reshape img to have a shape of (height, width, 3) if it's grayscale
-            if img.ndim == 2:
-                img = img.reshape(height, width, 1) # Reshape to (height, width, 1)
+        if out is None:
+            return cv2.cvtColor(img, code)
+        ret = cv2.cvtColor(img, code, dst=out)
+        if ret is not out:  # dtype 不一致等情况, cv2 会新建数组
+            np.copyto(out, ret)
+        return out
+
+    def set_alpha_channel(self, img_bgra:np.ndarray, alpha) -> np.ndarray:
+        """
+        原地设置 BGRA 图像的 alpha 通道
+        参数:
+            img_bgra: BGRA 图像 (会被修改)
+            alpha: 数值 (如 255) 或 (H, W) 灰度图
+        返回: img_bgra
+        """
+        img_bgra[:, :, 3] = alpha
+        return img_bgra
 
-            # Concatenate along the last axis (axis=2). Both should have 3 dimensions now.
-            alpha_ndarray = np.concatenate((img, alpha_channel), axis=2)
-            return alpha_ndarray
-        
     def del_alpha(self, img:np.ndarray) -> np.ndarray:
         """
         从 NumPy 数组中删除 alpha 通道。
@@ -171,32 +240,24 @@ def del_alpha(self, img:np.ndarray) -> np.ndarray:
         else:
             return img  # 如果没有 alpha 通道，则直接返回
         
-    def resize_ndarray(self, target_size, img:np.ndarray) -> np.ndarray:
-        # 缩放图片 np.ndarray
-        target_width, target_height = target_size
-        if sys.platform == 'darwin':  # mac系统使用 sips 缩放图片   temp_files
-            temp_files_dir = Path(__file__).resolve().parent.parent / 'temp_files'
-            tempimg_path =  str(temp_files_dir / 'temp_xxxxxxx_mac.png')
-            tempimg_out_path = str(temp_files_dir / 'temp_xxxxxxx_mac_out.png')
-            # print('Current temp_files_dir:', temp_files_dir)
-            self.ndarray_to_img(img, write_path=tempimg_path)
-            self.mac_resize_image(input_path=tempimg_path, output_path=tempimg_out_path, width=target_width, height=target_height)
-            resized_ndarray = self.img_to_ndarray(tempimg_out_path)
-            # 删除临时文件
-            # os.remove(tempimg_path)
-            # os.remove(tempimg_out_path)
-            return resized_ndarray
-        else:  # 非mac系统
-            # Resize the image to the new dimensions 缩放图片，并使用最近邻插值（default）INTER_NEAREST
-            # interpolation: INTER_LINEAR 线性插值,INTER_CUBIC 三次样条插值,INTER_AREA 区域插值,INTER_NEAREST 最近邻插值
-            resized_img = cv2.resize(cropped_img, dsize=(target_width, target_height), interpolation=cv2.INTER_NEAREST)
-            return resized_img
-
-    def resize_ndarray_by_width(self, target_width, img:np.ndarray) -> np.ndarray:
+    def resize_ndarray(self, target_size, img:np.ndarray, interpolation=None, backend=None) -> np.ndarray:
+        """
+        缩放图片 np.ndarray (内存中完成, 不写临时文件)
+
+        参数:
+            target_size: (width, height)
+            img: 输入图片
+            interpolation: 'nearest' / 'linear' / 'cubic' / 'area' / 'lanczos';
+                           None 使用 ResizeHandle 的策略(默认缩小 area, 放大 lanczos)
+            backend: 'opencv' / 'pillow' / 'pyvips'; None 使用 ResizeHandle 的全局设置
+        """
+        return self.cls_resize_handle.resize(img, target_size, interpolation=interpolation, backend=backend)
+
+    def resize_ndarray_by_width(self, target_width, img:np.ndarray, interpolation=None) -> np.ndarray:
         # 修改图片尺寸, 改变宽度, 比例不变
 
         # Get the original height and width of the image
-        original_height, original_width, _ = img.shape
+        original_height, original_width = img.shape[:2]
 
         # Calculate the new height based on maintaining aspect ratio with a width of 750 pixels
         aspect_ratio = original_height / original_width
@@ -204,11 +265,11 @@ def resize_ndarray_by_width(self, target_width, img:np.ndarray) -> np.ndarray:
 
         # Resize the image to the new dimensions
         # resized_img = cv2.resize(img, (target_width, new_height))
-        resized_img = self.resize_ndarray(target_size=(target_width, new_height), img=img)
+        resized_img = self.resize_ndarray(target_size=(target_width, new_height), img=img, interpolation=interpolation)
 
         return resized_img
     
-    def resize_ndarray_by_height(self, target_height, img:np.ndarray) -> np.ndarray:
+    def resize_ndarray_by_height(self, target_height, img:np.ndarray, interpolation=None) -> np.ndarray:
         # 修改图片尺寸, 改变高度, 比例不变
 
         # Get the original height and width of the image
@@ -221,11 +282,11 @@ def resize_ndarray_by_height(self, target_height, img:np.ndarray) -> np.ndarray:
 
         # Resize the image to the new dimensions # Resize the image. dsize MUST be a tuple of integers.
         # resized_img = cv2.resize(img, (new_width, int(target_height)))
-        resized_img = self.resize_ndarray(target_size=(new_width, int(target_height)), img=img)
+        resized_img = self.resize_ndarray(target_size=(new_width, int(target_height)), img=img, interpolation=interpolation)
 
         return resized_img
     
-    def resize_ndarray_within_bounds(self, target_width, target_height, img:np.ndarray, mode='fit'):
+    def resize_ndarray_within_bounds(self, target_width, target_height, img:np.ndarray, mode='fit', interpolation=None):
         """
         缩放图片到目标宽高范围内，保持原始宽高比
         
@@ -234,6 +295,7 @@ def resize_ndarray_within_bounds(self, target_width, target_height, img:np.ndarr
             target_width: int, 目标宽度
             target_height: int, 目标高度
             mode: str, 缩放模式 ('fit' 或 'fill')
+            interpolation: str, 插值方式, None 使用默认策略
         返回:
             numpy.ndarray: 缩放后的图片
         """
@@ -261,7 +323,7 @@ def resize_ndarray_within_bounds(self, target_width, target_height, img:np.ndarr
         new_height = int(original_height * scale)
         
         # 缩放图片 np.ndarray
-        resized_img = self.resize_ndarray(target_size=(new_width, new_height), img=img)
+        resized_img = self.resize_ndarray(target_size=(new_width, new_height), img=img, interpolation=interpolation)
 
         if mode == 'fill':
             # 占满目标尺寸, 多出部分居中裁剪
@@ -293,7 +355,7 @@ def text_to_image(self, text, font_path, font_size, text_color=(0,0,0),
         spacing: 多行间距
         stroke_width: 如需描边，设置描边宽度
         """
-        font = ImageFont.truetype(font_path, font_size)
+        font = self.cls_font_cache.get_font(font_path, font_size)
 
         # 用临时 draw 计算精确边界框（支持多行）
         tmp = Image.new('RGBA', (1, 1), (0, 0, 0, 0))
@@ -319,39 +381,20 @@ def text_to_image(self, text, font_path, font_size, text_color=(0,0,0),
 
         return self.pil_to_cv2(image)
 
-    def ndarray_write_text(self, cv2_ndarray, text, pos, font_path, font_size=16, color=None, font_path_en=None):
+    def create_canvas(self, cv2_ndarray) -> ImgCanvas:
         """
-        cv2 ndarray 写入文字
-        """
-        pil_img = self.cv2_to_pil(cv2_ndarray)
-        # 创建一个 ImageDraw 对象来绘制
-        draw = ImageDraw.Draw(pil_img)
-
-        if font_path_en is not None:
-            # 中英文混排
-            # 正则匹配非中文（英文、数字、符号等）和中文
-            start_pos = copy.deepcopy(pos)
-            pattern = re.compile(r"([^\u4e00-\u9fff]+|[\u4e00-\u9fff]+)")
-            segments = pattern.findall(text)
-            x = start_pos[0]
-            for segment in segments:
-                if re.search(r"[\u4e00-\u9fff]", segment):  # 如果是中文
-                    font = ImageFont.truetype(font_path, font_size)
-                else:  # 如果是英文/符号
-                    font = ImageFont.truetype(font_path_en, font_size)
-                
-                # 绘制当前片段
-                draw.text((x, start_pos[1]), segment, font=font, fill=self.convert_color(color))
-                # 更新 x 位置（避免重叠）
-                x += font.getlength(segment)
-        else:
-            font = ImageFont.truetype(font_path, font_size)
-            if color is None:
-                color = (10, 10, 10)
+        创建绘制会话: 多次绘制文字/粘贴/矩形只转换一次 PIL, 最后 canvas.commit() 返回 cv2 图像
+        """
+        return ImgCanvas(cv2_ndarray)
 
-            draw.text(pos, text, font=font, fill=self.convert_color(color))
-        image = self.pil_to_cv2(pil_img)
-        return image
+    def ndarray_write_text(self, cv2_ndarray, text, pos, font_path, font_size=16, color=None, font_path_en=None):
+        """
+        cv2 ndarray 写入文字; font_path_en 不为 None 时中英文混排
+        (同一张图多次绘制时使用 create_canvas, 只转换一次 PIL)
+        """
+        canvas = ImgCanvas(cv2_ndarray)
+        canvas.text(text, pos, font_path, font_size=font_size, color=color, font_path_en=font_path_en)
+        return canvas.commit()
     
     def put_text_multiline(self, image, text, position, font_path, font_size, color,
                      line_spacing=1.5, max_width=None, paragraph_spacing=1.2):
@@ -368,34 +411,25 @@ def put_text_multiline(self, image, text, position, font_path, font_size, color,
         返回:
             tuple: (修改后的图像, 总宽度, 总高度)
         """
-        x, y = position
-        paragraphs = text.split('\n')
-        total_height = 0
-        max_width_actual = 0
-        
-        current_img = image.copy()
-        
-        for para in paragraphs:
-            if not para:  # 空行处理
-                _, _, h = self.put_text_word_wrap(
-                    current_img, " ", (x, y), font_path, font_size, color,
-                    line_spacing, max_width
-                )
-                total_height += h * paragraph_spacing
-                y += int(h * paragraph_spacing)
-                continue
-                
-            img_with_text, w, h = self.put_text_word_wrap(
-                current_img, para, (x, y), font_path, font_size, color,
-                line_spacing, max_width
-            )
-            
-            max_width_actual = max(max_width_actual, w)
-            total_height += h * (paragraph_spacing if para != paragraphs[-1] else 1)
-            y += int(h * paragraph_spacing)
-            current_img = img_with_text
-        
-        return current_img, max_width_actual, total_height
+        canvas = ImgCanvas(image)
+        total_width, total_height = canvas.text_multiline(
+            text, position, font_path, font_size, color,
+            line_spacing=line_spacing, max_width=max_width, paragraph_spacing=paragraph_spacing
+        )
+        return canvas.commit(), total_width, total_height
+
+    def measure_text_multiline(self, text, font_path, font_size, max_width,
+                     line_spacing=1.5, paragraph_spacing=1.2) -> dict:
+        """
+        计算多段文字的排版尺寸, 不绘制 (参数同 put_text_multiline)
+
+        返回:
+            dict: {'paragraphs': [...], 'width': 总宽度, 'height': 总高度}, 参考 TextLayout.measure_multiline
+        """
+        font = self.cls_font_cache.get_font(font_path, font_size)
+        return self.cls_text_layout.measure_multiline(
+            text, font, font_size, max_width, line_spacing=line_spacing, paragraph_spacing=paragraph_spacing
+        )
     
     def put_text_word_wrap(self, image, text, position, font_path, font_size, color, line_spacing=1.5, max_width=None):
         """
@@ -408,81 +442,19 @@ def put_text_word_wrap(self, image, text, position, font_path, font_size, color,
             font_path: 中文字体文件路径 (如 "simsun.ttc")
             font_size: 字体大小
             color: 文字颜色 (BGR格式)
-            thickness: 文字粗细 (仅保留参数，实际使用字体大小控制)
             line_spacing: 行间距倍数 (默认1.5)
             max_width: 最大行宽度 (像素)，如果为None则使用图像宽度减去x坐标
             
         返回:
             tuple: (修改后的图像, 文字区域宽度, 文字区域高度)
         """
-        # 将OpenCV图像转换为PIL格式（RGB）
-        # pil_cv2_convert_method = cv2.COLOR_BGRA2RGBA if image.shape[2] == 4 else cv2.COLOR_BGR2RGB
-        # img_pil = Image.fromarray(cv2.cvtColor(image, pil_cv2_convert_method))
-        img_pil = self.cv2_to_pil(image)
-        # print('image.shape[2]:', image.shape[2])
-        draw = ImageDraw.Draw(img_pil)
-
-        x, y = position
-        if max_width is None:
-            max_width = image.shape[1] - x
-        else:
-            max_width = min(max_width, image.shape[1] - x)
-        
-        # 加载中文字体
-        font = ImageFont.truetype(font_path, font_size)
-        
-        # 分割文本为字符（处理中文）
-        chars = list(text)
-        lines = []
-        current_line = []
-        current_line_width = 0
-        
-        # 计算空格宽度（用于英文）
-        space_width = font.getlength(' ')
-        
-        for char in chars:
-            if char == ' ':
-                char_width = space_width
-            else:
-                char_width = font.getlength(char)
-            
-            # 检查是否超出最大宽度
-            if current_line_width + char_width <= max_width:
-                current_line.append(char)
-                current_line_width += char_width
-            else:
-                lines.append(''.join(current_line))
-                current_line = [char]
-                current_line_width = char_width
-        
-        # 添加最后一行
-        if current_line:
-            lines.append(''.join(current_line))
-        
-        # 计算总高度
-        line_height = int(font_size * line_spacing)
-        total_height = len(lines) * line_height
-        
-        # 计算总宽度
-        total_width = 0
-        for line in lines:
-            line_width = int(font.getlength(line))
-            if line_width > total_width:
-                total_width = line_width
-        
-        # 绘制每一行文本
-        y_offset = y
-        for line in lines:
-            draw.text((x, y_offset), line, font=font, fill=(color[2], color[1], color[0]))  # BGR转RGB
-            y_offset += line_height
-        
-        # 将PIL图像转回OpenCV格式
-        # result_img = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
-        result_img = self.pil_to_cv2(img_pil)
-        
-        return result_img, total_width, total_height
+        canvas = ImgCanvas(image)
+        total_width, total_height = canvas.text_wrap(
+            text, position, font_path, font_size, color, line_spacing=line_spacing, max_width=max_width
+        )
+        return canvas.commit(), total_width, total_height
     
-    def combine_ndarray(self, a_array, b_array, position=(0, 0)):
+    def combine_ndarray(self, a_array, b_array, position=(0, 0), mode='threshold', alpha_threshold=50):
         """
         将图片 img_b 放在图片 img_a 的位置
         
@@ -490,70 +462,114 @@ def combine_ndarray(self, a_array, b_array, position=(0, 0)):
             img_a: 图片 a, 格式为 cv2.imread(img_a_path) numpy 数组
             img_b: 图片 b, 格式为 cv2.imread(img_b_path) numpy 数组
             position: (x, y)
-                x: 放置的左上角坐标中的 x 坐标
-                y: 放置的左上角坐标中的 y 坐标
+                x: 放置的左上角坐标中的 x 坐标 (可以为负数, 超出部分自动裁剪)
+                y: 放置的左上角坐标中的 y 坐标 (可以为负数, 超出部分自动裁剪)
+            mode: 'threshold' img_b alpha > alpha_threshold 的像素直接替换(默认);
+                  'over' 按 alpha 真实叠加, 与 blend_images 计算方式一致
+            alpha_threshold: mode == 'threshold' 时的 alpha 阈值
             
         返回:
             结果图片，格式与 img_a 一致(numpy 数组)
         """
-        x, y = position[0], position[1]
-
-        # 获取img_a和img_b的尺寸
-        a_height, a_width = a_array.shape[:2]
-        b_height, b_width = b_array.shape[:2]
+        return self.composite_ndarray(a_array, b_array, position=position, mode=mode, alpha_threshold=alpha_threshold)
 
-        b_x_end = min(b_width, a_width-x)
-        b_y_end = min(b_height, a_height-y)
-        cropped_b_array = b_array[:b_y_end, :b_x_end, :]
-
-        # 检查位置是否在img_a范围内
-        if x < 0 or y < 0 or x > a_width or y > a_height:
-            print('position not in image A...')
-            return a_array  # 不在范围内，直接返回a_array
-        # 初始化 result变量为 a_array 的副本
-        result = a_array.copy()
+    def composite_ndarray(self, a_array, b_array, position=(0, 0), mode='threshold', alpha_threshold=50, inplace=False):
+        """
+        图片合成(向量化), 一次计算 img_b 与 img_a 的重叠区域并合成
         
-        # 判断是否有Alpha通道
-        has_alpha_a = len(a_array.shape) == 3 and a_array.shape[2] == 4
-        has_alpha_b = len(b_array.shape) == 3 and b_array.shape[2] == 4
-
-        y1 = y + b_y_end
-        x1 = x + b_x_end
+        参数:
+            a_array: 底图 (H×W×3 或 H×W×4)
+            b_array: 顶图 (H×W×3 或 H×W×4)
+            position: (x, y) img_b 左上角在 img_a 中的坐标, 可以为负数或部分超出 img_a
+            mode: 'threshold' / 'over'
+            alpha_threshold: mode == 'threshold' 时, img_b alpha > alpha_threshold 的像素才替换
+            inplace: True 直接修改 a_array, 否则修改 a_array 的副本
+            
+        返回:
+            合成后的图片，格式与 a_array 一致
+        """
+        if mode not in ('threshold', 'over'):
+            raise ValueError(f"mode 必须是 'threshold' 或 'over' ({mode})")
+        result = a_array if inplace else a_array.copy()
+
+        # 计算重叠区域, 超出 img_a 的部分裁剪掉
+        roi = self.compute_overlap_roi(a_array.shape[:2], b_array.shape[:2], position)
+        if roi is None:
+            return result   # 没有重叠区域
+        (a_y0, a_y1, a_x0, a_x1), (b_y0, b_y1, b_x0, b_x1) = roi
+        a_roi = result[a_y0:a_y1, a_x0:a_x1]
+        b_roi = b_array[b_y0:b_y1, b_x0:b_x1]
 
-        if not has_alpha_a:
-            # img_a 没有Alpha通道
-            if has_alpha_b:
-                result = self.replace_pixels(img_a=a_array, img_b=cropped_b_array, start_position=position)
+        # 判断是否有Alpha通道
+        has_alpha_a = a_roi.ndim == 3 and a_roi.shape[2] == 4
+        has_alpha_b = b_roi.ndim == 3 and b_roi.shape[2] == 4
+
+        if not has_alpha_b:
+            # img_b 没有Alpha通道，直接替换; img_a 有 alpha 时设置为 255
+            a_roi[..., :3] = b_roi[..., :3]
+            if has_alpha_a:
+                a_roi[..., 3] = 255
+        elif mode == 'threshold':
+            # alpha > alpha_threshold 的像素替换, 替换后 alpha 为 255
+            mask = b_roi[..., 3] > alpha_threshold
+            np.copyto(a_roi[..., :3], b_roi[..., :3], where=mask[..., np.newaxis])
+            if has_alpha_a:
+                a_roi[..., 3][mask] = 255
+        elif a_roi.dtype == np.uint8 and b_roi.dtype == np.uint8:
+            # 真实 alpha 叠加 (over), uint8 与 blend_images 相同使用整数定点计算
+            if has_alpha_a:
+                bottom_alpha = a_roi[..., 3]
             else:
-                # img_b 没有Alpha通道，直接替换
-                result[y:y1, x:x1] = cropped_b_array
+                bottom_alpha = np.full(a_roi.shape[:2], 255, dtype=np.uint8)
+            rgb_out, alpha_out = self._blend_over_uint32(a_roi[..., :3], bottom_alpha, b_roi[..., :3], b_roi[..., 3])
+            a_roi[..., :3] = rgb_out
+            if has_alpha_a:
+                a_roi[..., 3] = alpha_out
         else:
-            # img_a 带有Alpha通道
-            if not has_alpha_b:
-                # img_b 没有Alpha通道，将img_b的像素替换到img_a上，并设置alpha为255
-                rgba_image = np.zeros((b_y_end, b_x_end, 4), dtype=np.uint8)
-                rgba_image[:, :, :3] = cropped_b_array
-                rgba_image[:, :, 3] = 255
-                result[y:y1, x:x1] = rgba_image
+            # 真实 alpha 叠加 (over), 其它数据类型使用浮点计算
+            if np.issubdtype(a_roi.dtype, np.integer):
+                scale = float(np.iinfo(a_roi.dtype).max)
             else:
-                result = self.replace_pixels(img_a=a_array, img_b=cropped_b_array, start_position=position)
-
+                scale = 1.0
+            bottom = a_roi.astype(np.float32) / scale
+            top = b_roi.astype(np.float32) / scale
+            bottom_alpha = bottom[..., 3] if has_alpha_a else np.ones(bottom.shape[:2], dtype=np.float32)
+            rgb_out, alpha_out = self._blend_over_float(bottom[..., :3], bottom_alpha, top[..., :3], top[..., 3])
+            if scale != 1.0:
+                a_roi[..., :3] = (rgb_out * scale).clip(0, scale)
+                if has_alpha_a:
+                    a_roi[..., 3] = (alpha_out * scale).clip(0, scale)
+            else:
+                a_roi[..., :3] = rgb_out
+                if has_alpha_a:
+                    a_roi[..., 3] = alpha_out
         return result
-    
-    def replace_pixels(self, img_a, img_b, start_position):
-        # 循环替换 img_a 的像素
-        img_a_have_alpha = img_a.shape[2] == 4
-        height, width = img_b.shape[:2]
-        for i in range(height):
-            for j in range(width):
-                # 获取当前像素值
-                pixel = img_b[i, j]
-                if len(pixel) == 4 and pixel[-1] > 50:
-                    img_a_replace_piexl_pos = self.compute_img_a_pixel_position(start_position, (j, i))
-                    # 计算替换的像素
-                    replace_pixel = [*pixel[:3], 255] if img_a_have_alpha else pixel[:3]
-                    img_a[img_a_replace_piexl_pos[1], img_a_replace_piexl_pos[0]] = replace_pixel
-        return img_a
+
+    def compute_overlap_roi(self, a_shape, b_shape, position):
+        """
+        计算 img_b 放在 img_a 的 position 位置时的重叠区域
+        
+        参数:
+            a_shape: img_a 的 (height, width)
+            b_shape: img_b 的 (height, width)
+            position: (x, y) img_b 左上角在 img_a 中的坐标
+            
+        返回:
+            ((a_y0, a_y1, a_x0, a_x1), (b_y0, b_y1, b_x0, b_x1)); 没有重叠区域返回 None
+        """
+        x, y = int(position[0]), int(position[1])
+        a_height, a_width = a_shape[:2]
+        b_height, b_width = b_shape[:2]
+
+        a_x0, a_y0 = max(x, 0), max(y, 0)
+        a_x1, a_y1 = min(x + b_width, a_width), min(y + b_height, a_height)
+        if a_x0 >= a_x1 or a_y0 >= a_y1:
+            return None
+        return (a_y0, a_y1, a_x0, a_x1), (a_y0 - y, a_y1 - y, a_x0 - x, a_x1 - x)
+
+    def replace_pixels(self, img_a, img_b, start_position, alpha_threshold=50):
+        # 替换 img_a 的像素 (img_b alpha > alpha_threshold 的像素), 直接修改 img_a
+        return self.composite_ndarray(img_a, img_b, position=start_position, mode='threshold', alpha_threshold=alpha_threshold, inplace=True)
     
     def compute_img_a_pixel_position(self, start_position, img_b_pixel_position):
         # 计算对应 img_a 的像素坐标
@@ -604,9 +620,6 @@ def concatenate_imgs(self, ndarray_a, ndarray_b):
         w_a, h_a = self.width_height(ndarray_a)
         w_b, h_b = self.width_height(ndarray_b)
 
-        ndarray_a_with_alpha = self.add_alpha(ndarray_a)
-        ndarray_b_with_alpha = self.add_alpha(ndarray_b)
-
         ret_ndarray_w = max(w_a, w_b)
         ret_ndarray_h = h_a + h_b
 
@@ -617,29 +630,39 @@ def concatenate_imgs(self, ndarray_a, ndarray_b):
 
         # 创建空白图片, 带alpha通道
         ret_ndarray = np.zeros((ret_ndarray_h, ret_ndarray_w, 4), dtype='uint8')
-        # 拼接两张图片
-        ret_ndarray = self.combine_ndarray(ret_ndarray, ndarray_a_with_alpha, pos_a)
-        ret_ndarray = self.combine_ndarray(ret_ndarray, ndarray_b_with_alpha, pos_b)
+        # 拼接两张图片: 没有 alpha 通道的图片直接转换写入画布区域, 有 alpha 通道的按阈值合成
+        for ndarray, (pos_x, pos_y), (w, h) in ((ndarray_a, pos_a, (w_a, h_a)), (ndarray_b, pos_b, (w_b, h_b))):
+            if ndarray.ndim == 3 and ndarray.shape[2] == 4:
+                self.composite_ndarray(ret_ndarray, ndarray, (pos_x, pos_y), inplace=True)
+            else:
+                self.to_bgra(ndarray, out=ret_ndarray[pos_y:pos_y + h, pos_x:pos_x + w])
 
         return ret_ndarray
 
-    def concatenate_imgs_in_dir(self, dir_path, prefix=None, output_path:str=None) -> np.ndarray | None:
+    def concatenate_imgs_in_dir(self, dir_path, prefix=None, output_path:str=None, tile_height:int=None) -> np.ndarray | list | None:
         '''
         将指定目录下的图片拼接成一张大图
         :param dir_path: 图片所在的目录
+        :param tile_height: 分块保存的高度, 参考 concatenate_imgs_paths
         :return: ndarray
         '''
         # 获取目录下的所有图片文件
         imgs_paths = self.get_imgs_paths_in_dir(dir_path, prefix=prefix)
-        return self.concatenate_imgs_paths(imgs_paths=imgs_paths, output_path=output_path)
+        return self.concatenate_imgs_paths(imgs_paths=imgs_paths, output_path=output_path, tile_height=tile_height)
     
-    def concatenate_imgs_paths(self, imgs_paths:list, output_path:str=None) -> np.ndarray | None:
+    def concatenate_imgs_paths(self, imgs_paths:list, output_path:str=None, tile_height:int=None) -> np.ndarray | list | None:
         '''
-        将指定目录下的图片拼接成一张大图
-        :param dir_path: 图片所在的目录
-        :return: ndarray
+        将图片路径列表中的图片竖向拼接成一张大图 (图片水平居中, 背景透明)
+        只读取图片头计算画布尺寸, 画布只创建一次, 图片逐张解码后直接写入对应区域
+        :param imgs_paths: 图片路径列表
+        :param output_path: 保存路径, None 不保存
+        :param tile_height: 不为 None 时按高度分块保存 (output_path 必须指定), 大图不会整体加载到内存;
+                            返回分块图片路径列表
+        :return: ndarray (tile_height 不为 None 时返回 list)
         '''
-        # 获取目录下的所有图片文件
+        if tile_height is not None:
+            return self.concatenate_imgs_paths_to_tiles(imgs_paths=imgs_paths, output_path=output_path, tile_height=tile_height)
+
         if len(imgs_paths) == 0:
             return None
         elif len(imgs_paths) == 1:
@@ -648,85 +671,117 @@ def concatenate_imgs_paths(self, imgs_paths:list, output_path:str=None) -> np.nd
                 self.ndarray_to_img(ret_ndarr, output_path)     # 保存图片
             return ret_ndarr
 
-        # 初始化拼接图片的宽高
-        con_img_w, con_img_h = 0, 0
-        # 获取所有图片的宽高
-        for img_path in imgs_paths:
-            img = self.img_to_ndarray(img_path)
-            img_w, img_h = self.width_height(img)
-            con_img_h += img_h
-            con_img_w = max(con_img_w, img_w)
-
-        con_img = self.img_to_ndarray(imgs_paths[0])
-        for i in range(len(imgs_paths)):
-            if i == 0:
-                continue
-            current_ndarray = self.img_to_ndarray(imgs_paths[i])
-            con_img = self.concatenate_imgs(con_img, current_ndarray)
+        layout, con_img_w, con_img_h = self.compute_concatenate_layout(imgs_paths)
+        if len(layout) == 0:
+            return None
+
+        # 创建空白图片, 带alpha通道
+        con_img = np.zeros((con_img_h, con_img_w, 4), dtype=np.uint8)
+        for img_path, pos in layout:
+            self._concatenate_paste(con_img, img_path, pos)
         if  output_path is not None:
             self.ndarray_to_img(con_img, output_path)     # 保存图片
         return con_img
-    
+
+    def concatenate_imgs_paths_to_tiles(self, imgs_paths:list, output_path:str, tile_height:int) -> list:
+        '''
+        竖向拼接图片, 按 tile_height 分块保存, 内存中只保留一个分块和当前图片
+        分块文件名: {output_path 文件名}_001{后缀}, {output_path 文件名}_002{后缀} ...
+        :return: 分块图片路径列表
+        '''
+        if output_path is None:
+            raise ValueError("分块保存必须指定 output_path")
+        if tile_height <= 0:
+            raise ValueError(f"tile_height 必须大于 0 ({tile_height})")
+
+        layout, con_img_w, con_img_h = self.compute_concatenate_layout(imgs_paths)
+        if len(layout) == 0:
+            return []
+
+        output_path_obj = Path(output_path)
+        tiles_paths = []
+        cached_path, cached_img = None, None    # 跨分块的图片只解码一次
+        for tile_idx, tile_top in enumerate(range(0, con_img_h, tile_height)):
+            tile_bottom = min(tile_top + tile_height, con_img_h)
+            tile = np.zeros((tile_bottom - tile_top, con_img_w, 4), dtype=np.uint8)
+            for img_path, (pos_x, pos_y, img_h) in layout:
+                if pos_y >= tile_bottom or pos_y + img_h <= tile_top:
+                    continue    # 不在当前分块
+                if img_path != cached_path:
+                    cached_path, cached_img = img_path, self._concatenate_decode(img_path)
+                if cached_img is not None:
+                    self.composite_ndarray(tile, cached_img, position=(pos_x, pos_y - tile_top), inplace=True)
+            tile_path = str(output_path_obj.parent / f'{output_path_obj.stem}_{tile_idx + 1:03d}{output_path_obj.suffix}')
+            self.ndarray_to_img(tile, tile_path)
+            tiles_paths.append(tile_path)
+        return tiles_paths
+
+    def compute_concatenate_layout(self, imgs_paths:list):
+        '''
+        只读取图片头, 计算竖向拼接的布局
+        :return: (layout, width, height); layout: [(img_path, (pos_x, pos_y, img_h)), ...]
+        '''
+        sizes = []
+        for img_path in imgs_paths:
+            img_info = self.probe_img(img_path)
+            if img_info is None:
+                print(f"无法读取图片：{img_path}")
+                continue
+            sizes.append((img_path, (img_info['width'], img_info['height'])))
+
+        con_img_w = max([w for _, (w, _) in sizes], default=0)
+        layout = []
+        pos_y = 0
+        for img_path, (img_w, img_h) in sizes:
+            pos_x = int(con_img_w / 2 - img_w / 2)
+            layout.append((img_path, (pos_x, pos_y, img_h)))
+            pos_y += img_h
+        return layout, con_img_w, pos_y
+
+    def _concatenate_decode(self, img_path):
+        # 解码拼接用的图片, 统一为 uint8 的 BGR / BGRA
+        img = self.img_to_ndarray(img_path)
+        if img is None:
+            return None
+        if img.dtype != np.uint8:
+            img = (img // 257).astype(np.uint8) if img.dtype == np.uint16 else cv2.convertScaleAbs(img)
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        return img
+
+    def _concatenate_paste(self, con_img, img_path, pos):
+        # 解码图片并直接写入画布对应区域
+        img = self._concatenate_decode(img_path)
+        if img is not None:
+            pos_x, pos_y, _ = pos
+            self.composite_ndarray(con_img, img, position=(pos_x, pos_y), inplace=True)
+
     def check_img(self, img_path) -> bool:
-        # 验证是否是图片
+        # 验证是否是图片 (只读取图片头, 不解码像素)
         try:
             if not Path(img_path).is_file():   # 不是文件直接返回False
                 return False
-            
-            # Load the file into memory (assuming it's in BMP, JPEG, PNG, etc. format)
-            img = cv2.imread(img_path)
 
-            if img is None:
+            img_info = self.probe_img(img_path)
+            if img_info is None:
                 # print("Error: Unable to load the file.")
                 return False
-            else:
-                # If the image was loaded, verify its structure and contents
-                if len(img.shape) == 3 or (len(img.shape) == 2 and img.dtype == 'uint8'):
-                    # Check for valid image dimensions and data type
-                    height, width = img.shape[:2]
-                    channels = img.shape[2] if len(img.shape) > 2 else None
-
-                    # print(f"Image loaded successfully: {height}x{width}, {channels} channels")
-                    return True
-                else:
-                    print("Error: The file appears to be an image, but its structure is invalid.")
-                    return False
+            if img_info['width'] <= 0 or img_info['height'] <= 0:
+                print("Error: The file appears to be an image, but its structure is invalid.")
+                return False
+            return True
         except Exception as e:
             print('Error:', e)
             return False
 
     def get_imgs_paths_in_dir(self, folder_path, prefix=None):
         '''
-        获取指定目录下的所有图片路径
+        获取指定目录下的所有图片路径 (jpg / jpeg / png / bmp, 已排序; 目录扫描结果按目录 mtime 缓存)
         :param dir_path: 图片所在的目录
         :param prefix: 图片名称前缀 tuple
         :return: list
         '''
-        # 检查文件夹是否存在且是一个目录
-        if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-            raise FileNotFoundError(f"The specified folder does not exist. ({folder_path})")
-        
-        image_paths = []
-        
-        # 遍历文件夹中的每一个文件和子目录
-        for filename in os.listdir(folder_path):
-            if prefix is not None and not filename.startswith(prefix):
-                continue
-
-            file_path = os.path.join(folder_path, filename)
-            
-            # 确保处理的是文件而不是子目录
-            if os.path.isfile(file_path):
-                ext = os.path.splitext(filename)[1].lower()  # 获取扩展名并转为小写
-                
-                # 检查是否是JPG或PNG格式
-                if ext in ['.jpg', '.jpeg', '.png', '.bmp']:
-                    image_paths.append(file_path)
-        
-        # 对路径列表进行排序
-        image_paths.sort()
-        
-        return image_paths
+        return self.cls_dir_scan.list_paths(folder_path, kinds=('image', ), prefix=prefix)
     
     def resize_and_fit(self, img_path, save_path, target_size) -> str:
         # 修改图片尺寸, 不够部分修改为白底图
@@ -781,12 +836,17 @@ def resize_and_cutout(self, target_width, target_height, img_path, save_path) ->
     
     def crop_img_with_target_ratio(self, img_path, target_size:tuple) -> np.ndarray:
         # 按目标比例裁剪图片. target_size: (width, heigth)
-        target_width, target_height = target_size
         img = cv2.imread(img_path, cv2.IMREAD_UNCHANGED)
         if img is None:
             raise FileNotFoundError(f"Failed to load image from {img_path}")
         # 获取图片尺寸
         original_height, original_width = img.shape[:2]
+        x0, y0, x1, y1 = self.compute_ratio_crop_box(original_width, original_height, target_size)
+        return img[y0:y1, x0:x1]
+
+    def compute_ratio_crop_box(self, original_width, original_height, target_size:tuple) -> tuple:
+        # 按目标比例居中裁剪的区域 (x0, y0, x1, y1). target_size: (width, heigth)
+        target_width, target_height = target_size
 
         # 计算缩放比例, 取比例大的
         target_ratio = target_width / target_height
@@ -796,21 +856,18 @@ def crop_img_with_target_ratio(self, img_path, target_size:tuple) -> np.ndarray:
             # 如果原始图片更宽，高度不变，裁剪宽度
             resize_width = int(original_height * target_ratio)
             left_offset = (original_width - resize_width) // 2
-            # print(f'...original_width-{original_width};  resize_width-{resize_width};  left_offset-{left_offset};')
-            cropped_image = img[0:original_height, left_offset:left_offset + resize_width]
-            return cropped_image
+            return (left_offset, 0, left_offset + resize_width, original_height)
         elif original_height == target_ratio:
-            return img
+            return (0, 0, original_width, original_height)
         else:
             # 如果原始图片更高，宽度不变裁剪高度
             resize_height = int(original_width / target_ratio)
             top_offset = (original_height - resize_height) // 2
-            cropped_image = img[top_offset:top_offset + resize_height, 0:original_width]
-            return cropped_image
+            return (0, top_offset, original_width, top_offset + resize_height)
         
     def add_round_corner(self, cv2_ndarray, output_path=None, corner_radius=None):
-        # 转换为圆角图 (.png)
-        image_with_alpha = self.add_alpha(cv2_ndarray)
+        # 转换为圆角图 (.png); 输入已经是 BGRA 时原地修改 alpha 通道
+        image_with_alpha = self.to_bgra(cv2_ndarray)
         # 获取图像的高度和宽度
         height, width = image_with_alpha.shape[:2]
 
@@ -843,7 +900,7 @@ def add_round_corner(self, cv2_ndarray, output_path=None, corner_radius=None):
 
         # 使用圆角蒙版与原始图像相乘
         # result = cv2.bitwise_and(cv2_ndarray, cv2_ndarray, mask=mask)
-        image_with_alpha[:, :, 3] = mask  # 将mask作为alpha通道
+        self.set_alpha_channel(image_with_alpha, mask)  # 将mask作为alpha通道
 
         if output_path is not None:
             cv2.imwrite(output_path, image_with_alpha)
@@ -902,34 +959,86 @@ def mac_resize_image(self, input_path, output_path, width=None, height=None):
 
         # print(f"图片已缩放并保存到 {output_path}")
 
-    def apply_glass_effect(self, img:np.ndarray, radius=5):
+    def apply_glass_effect(self, img:np.ndarray, radius=5, seed=None):
         """
         为图像添加毛玻璃效果
         
         参数:
             img: 输入图像 (BGR格式)
             radius: 毛玻璃效果的半径大小，值越大效果越模糊
+            seed: 随机种子 (int 或 np.random.Generator), 相同 seed 结果相同; None 每次随机
             
         返回:
             处理后的带有毛玻璃效果的图像
         """
-        # 获取图像尺寸
         h, w = img.shape[:2]
+        rng = np.random.default_rng(seed)
+        map_x, map_y = self.glass_displacement_maps(w, h, radius=radius, rng=rng)
+        return cv2.remap(img, map_x, map_y, interpolation=cv2.INTER_NEAREST, borderMode=cv2.BORDER_REPLICATE)
+
+    def apply_glass_effect_batch(self, frames, radius=5, seed=None, shared_map=False):
+        """
+        批量添加毛玻璃效果 (视频背景帧)
         
-        # 创建输出图像
-        result = np.zeros_like(img)
-        
-        # 遍历每个像素
-        for y in range(h):
-            for x in range(w):
-                # 随机选择邻域内的一个像素
-                rand_y = random.randint(max(0, y - radius), min(h - 1, y + radius))
-                rand_x = random.randint(max(0, x - radius), min(w - 1, x + radius))
-                
-                # 将随机选择的像素颜色赋给当前像素
-                result[y, x] = img[rand_y, rand_x]
+        参数:
+            frames: 帧列表 list[np.ndarray] 或 (N, H, W, C) ndarray, 所有帧尺寸相同
+            radius: 毛玻璃效果的半径大小
+            seed: 随机种子, 相同 seed 整批结果相同
+            shared_map: True 所有帧使用同一张随机位移图(更快, 颗粒不会闪烁); False 每帧重新生成
+            
+        返回:
+            与输入类型一致的帧列表或 ndarray
+        """
+        if len(frames) == 0:
+            return frames
+        h, w = frames[0].shape[:2]
+        rng = np.random.default_rng(seed)
+        maps = self.glass_displacement_maps(w, h, radius=radius, rng=rng) if shared_map else None
+
+        results = np.empty_like(frames) if isinstance(frames, np.ndarray) else []
+        for idx, frame in enumerate(frames):
+            map_x, map_y = maps if shared_map else self.glass_displacement_maps(w, h, radius=radius, rng=rng)
+            if isinstance(results, np.ndarray):
+                cv2.remap(frame, map_x, map_y, interpolation=cv2.INTER_NEAREST, dst=results[idx], borderMode=cv2.BORDER_REPLICATE)
+            else:
+                results.append(cv2.remap(frame, map_x, map_y, interpolation=cv2.INTER_NEAREST, borderMode=cv2.BORDER_REPLICATE))
+        return results
+
+    def glass_displacement_maps(self, width, height, radius=5, rng=None):
+        """
+        生成毛玻璃效果的随机位移图 (cv2.remap 使用)
+        每个像素在 [x - radius, x + radius] × [y - radius, y + radius] 邻域内(限制在图片内)均匀随机取一个像素
         
-        return result
+        参数:
+            width, height: 图片宽高
+            radius: 邻域半径
+            rng: np.random.Generator, None 使用新的随机生成器
+            
+        返回:
+            (map_x, map_y): float32 (height×width)
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        xs = np.arange(width, dtype=np.float32)
+        ys = np.arange(height, dtype=np.float32)
+        # 每行/每列的取值范围 [low, high], 与边界裁剪
+        x_low = np.maximum(xs - radius, 0)
+        x_span = np.minimum(xs + radius, width - 1) - x_low + 1
+        y_low = np.maximum(ys - radius, 0)
+        y_span = np.minimum(ys + radius, height - 1) - y_low + 1
+
+        map_x = rng.random((height, width), dtype=np.float32)
+        map_x *= x_span[np.newaxis, :]
+        np.floor(map_x, out=map_x)
+        map_x += x_low[np.newaxis, :]
+        map_y = rng.random((height, width), dtype=np.float32)
+        map_y *= y_span[:, np.newaxis]
+        np.floor(map_y, out=map_y)
+        map_y += y_low[:, np.newaxis]
+        # float32 精度下 random() 可能取到 1.0, 限制在范围内
+        np.minimum(map_x, (x_low + x_span - 1)[np.newaxis, :], out=map_x)
+        np.minimum(map_y, (y_low + y_span - 1)[:, np.newaxis], out=map_y)
+        return map_x, map_y
 
     def improved_glass_effect(self, img, radius=5, noise_intensity=20):
         # 先高斯模糊
@@ -941,22 +1050,37 @@ def improved_glass_effect(self, img, radius=5, noise_intensity=20):
         
         return result
 
-    def blend_images(self, img1, img2):
+    def blend_images(self, img1, img2, out=None, max_bytes=None):
         """
         将两张带有Alpha通道的图片叠加，返回叠加后的ndarray数据。
         参数：
             img1: numpy数组，底层图像，形状为(H, W, 4)，数据类型可以是uint8或float。
             img2: numpy数组，顶层图像，形状与img1相同。
+            out: 预先分配的结果数组 (形状和数据类型与 img1 相同), 可以是 img1 本身 (原地修改)
+            max_bytes: uint8 整数计算的临时内存上限, 超过时按行分块计算; None 使用 self.blend_max_bytes
         返回：
             numpy数组，叠加后的图像，形状和数据类型与输入相同。
         """
-        # img1_uint8 = img1.astype(np.uint8)
-        # img2_uint8 = img2.astype(np.uint8)
-        # blended_uint8 = blend_images(img1_uint8, img2_uint8)
-
         # 检查形状和通道数
         assert img1.shape == img2.shape, "Images must have the same shape"
         assert img1.shape[2] == 4 and img2.shape[2] == 4, "Images must have 4 channels (RGBA)"
+
+        if img1.dtype == np.uint8 and img2.dtype == np.uint8:
+            # uint8 使用整数定点计算, 与浮点计算结果相差不超过 1
+            if out is None:
+                out = np.empty_like(img1)
+            if max_bytes is None:
+                max_bytes = self.blend_max_bytes
+            height, width = img1.shape[:2]
+            band_rows = max(1, min(height, max_bytes // (width * self.BLEND_BYTES_PER_PIXEL)))
+            for y0 in range(0, height, band_rows):
+                y1 = min(y0 + band_rows, height)
+                rgb, alpha = self._blend_over_uint32(
+                    img1[y0:y1, :, :3], img1[y0:y1, :, 3], img2[y0:y1, :, :3], img2[y0:y1, :, 3]
+                )
+                out[y0:y1, :, :3] = rgb
+                out[y0:y1, :, 3] = alpha
+            return out
         
         # 保存原始数据类型
         dtype = img1.dtype
@@ -975,16 +1099,7 @@ def blend_images(self, img1, img2):
         top_rgb = img2[..., :3]
         top_alpha = img2[..., 3]
         
-        # 计算合成后的Alpha
-        alpha_out = top_alpha + bottom_alpha * (1 - top_alpha)
-        
-        # 计算分子部分
-        numerator = top_rgb * top_alpha[..., np.newaxis] + bottom_rgb * bottom_alpha[..., np.newaxis] * (1 - top_alpha[..., np.newaxis])
-        
-        # 计算合成后的RGB，处理除以零的情况
-        rgb_out = np.zeros_like(numerator)
-        valid = alpha_out > 0
-        rgb_out[valid] = numerator[valid] / alpha_out[valid][:, np.newaxis]
+        rgb_out, alpha_out = self._blend_over_float(bottom_rgb, bottom_alpha, top_rgb, top_alpha)
         
         # 合并通道
         result = np.zeros_like(img1)
@@ -997,8 +1112,59 @@ def blend_images(self, img1, img2):
         else:
             result = result.astype(dtype)
         
+        if out is not None:
+            np.copyto(out, result)
+            return out
         return result
     
+    def _blend_over_uint32(self, bottom_rgb, bottom_alpha, top_rgb, top_alpha):
+        """
+        alpha 叠加 (over) 的整数定点计算 (预乘 alpha, 不超过 uint32), blend_images / composite_ndarray(mode='over') / overlay_gradient_color 共用 (uint8)
+            A = a_t * 255 + a_b * (255 - a_t)
+            rgb = (top * a_t * 255 + bottom * a_b * (255 - a_t)) / A, alpha = A / 255 (四舍五入)
+
+        参数:
+            bottom_rgb / top_rgb: uint8 / uint16 (H×W×3), 可以广播 (如单个颜色)
+            bottom_alpha / top_alpha: uint8 / uint16 (H×W), 0-255, 可以广播
+        返回:
+            (rgb_out uint32 (H×W×3), alpha_out uint32 (H×W))
+        """
+        top_alpha = np.asarray(top_alpha, dtype=np.uint32)
+        top_weight = top_alpha * 255
+        bottom_weight = bottom_alpha.astype(np.uint32) * (255 - top_alpha)
+        total = top_weight + bottom_weight
+        numerator = bottom_rgb.astype(np.uint32) * bottom_weight[..., np.newaxis]
+        numerator += np.asarray(top_rgb, dtype=np.uint32) * top_weight[..., np.newaxis]
+        total_3 = np.broadcast_to(total[..., np.newaxis], numerator.shape)
+        rgb_out = np.zeros_like(numerator)
+        numerator += total_3 // 2
+        np.floor_divide(numerator, total_3, out=rgb_out, where=total_3 > 0)
+        total += 127
+        total //= 255
+        return rgb_out, total
+
+    def _blend_over_float(self, bottom_rgb, bottom_alpha, top_rgb, top_alpha):
+        """
+        alpha 叠加 (over) 的浮点计算, blend_images 和 composite_ndarray(mode='over') 共用
+        
+        参数:
+            bottom_rgb / top_rgb: float32 (H×W×3), 0-1 范围
+            bottom_alpha / top_alpha: float32 (H×W), 0-1 范围
+        返回:
+            (rgb_out, alpha_out)
+        """
+        # 计算合成后的Alpha
+        alpha_out = top_alpha + bottom_alpha * (1 - top_alpha)
+        
+        # 计算分子部分
+        numerator = top_rgb * top_alpha[..., np.newaxis] + bottom_rgb * bottom_alpha[..., np.newaxis] * (1 - top_alpha[..., np.newaxis])
+        
+        # 计算合成后的RGB，处理除以零的情况
+        rgb_out = np.zeros_like(numerator)
+        valid = alpha_out > 0
+        rgb_out[valid] = numerator[valid] / alpha_out[valid][:, np.newaxis]
+        return rgb_out, alpha_out
+    
     def create_gradient_gray_image(self, width, height, start_x=0, start_y=0, direction='vertical'):
         """
         创建一张从左到右 或从上到下 颜色逐渐变深的灰度图
@@ -1037,13 +1203,14 @@ def create_gradient_gray_image(self, width, height, start_x=0, start_y=0, direct
         else:
             return self.pil_to_cv2(img)
         
-    def apply_gray_as_alpha_cv2(self, bgr_image, gray_image):
+    def apply_gray_as_alpha_cv2(self, bgr_image, gray_image, out=None):
         """
         将灰度图的像素值作为 BGR(A) 图像的 alpha 通道（OpenCV 版本）
         
         参数:
             bgr_image (numpy.ndarray): BGR 或 BGRA 格式的图像（H×W×3 或 H×W×4）
             gray_image (numpy.ndarray): 单通道灰度图像（H×W）
+            out (numpy.ndarray): 预先分配的 (H×W×4) 数组, 可以是 bgr_image 本身 (BGRA 输入时原地修改 alpha 通道)
         
         返回:
             numpy.ndarray: BGRA 格式的图像（H×W×4）
@@ -1056,21 +1223,15 @@ def apply_gray_as_alpha_cv2(self, bgr_image, gray_image):
         # 确保灰度图是单通道 uint8
         if gray_image.ndim == 3:
             gray_image = cv2.cvtColor(gray_image, cv2.COLOR_BGR2GRAY)
-        gray_image = gray_image.astype(np.uint8)
+        gray_image = gray_image.astype(np.uint8, copy=False)
         
-        # 处理 BGR / BGRA 输入
-        if bgr_image.ndim == 2:  # 如果是灰度图，转 BGR
-            bgr_image = cv2.cvtColor(bgr_image, cv2.COLOR_GRAY2BGR)
-        elif bgr_image.shape[2] == 4:  # 如果是 BGRA，提取 BGR
-            bgr_image = bgr_image[:, :, :3]
-        elif bgr_image.shape[2] != 3:  # 如果不是 3 通道，报错
+        if bgr_image.ndim == 3 and bgr_image.shape[2] not in (1, 3, 4):  # 如果不是 BGR / BGRA，报错
             raise ValueError("输入必须是 BGR 或 BGRA 格式")
-        
-        # 合并 BGR + Alpha 通道
-        b, g, r = cv2.split(bgr_image)
-        bgra_image = cv2.merge([b, g, r, gray_image])
-        
-        return bgra_image
+        if out is None and bgr_image.ndim == 3 and bgr_image.shape[2] == 4:
+            out = bgr_image.copy()      # BGRA 输入不修改原图
+        # BGR(A) 直接写入目标数组, 再设置 alpha 通道 (不需要 split / merge)
+        bgra_image = self.to_bgra(bgr_image, out=out)
+        return self.set_alpha_channel(bgra_image, gray_image)
     
     def dataframe_to_cv2_image(self, df, font_size=14, font_path=None, cell_padding=10, 
                           text_color=(10, 10, 10), bg_color=(240, 240, 240), 
@@ -1091,93 +1252,43 @@ def dataframe_to_cv2_image(self, df, font_size=14, font_path=None, cell_padding=
         返回:
             numpy.ndarray - OpenCV格式的图像 (BGR)
         """
-        # 确保数据是字符串格式
-        df = df.astype(str)
-        
-        # 尝试加载中文字体 (如果指定)
+        return self.dataframe_to_cv2_images(
+            df, max_height=None, font_size=font_size, font_path=font_path, cell_padding=cell_padding,
+            text_color=text_color, bg_color=bg_color, header_color=header_color, grid_color=grid_color
+        )[0]
+
+    def dataframe_to_cv2_images(self, df, max_height=4000, font_size=14, font_path=None, cell_padding=10,
+                          text_color=(10, 10, 10), bg_color=(240, 240, 240),
+                          header_color=(220, 220, 220), grid_color=(180, 180, 180)) -> list:
+        """
+        将 pandas.DataFrame 转换为 cv2 格式的图像, 超过 max_height 时分页 (每页重复表头)
+
+        参数:
+            max_height: int - 每张图片的最大高度 (None 不分页)
+            其他参数同 dataframe_to_cv2_image
+
+        返回:
+            list: [numpy.ndarray (BGR), ...]
+        """
+        renderer = TableRenderer(
+            self.load_table_font(font_path, font_size), cell_padding=cell_padding, text_color=text_color,
+            bg_color=bg_color, header_color=header_color, grid_color=grid_color
+        )
+        return renderer.render(df, max_height=max_height)
+
+    def load_table_font(self, font_path, font_size):
+        # 表格字体: 指定字体 > 默认中文字体 (Windows) > PIL 默认字体
         try:
             if font_path:
-                font = ImageFont.truetype(font_path, font_size)
-            else:
-                # 尝试加载默认中文字体 (Windows)
-                try:
-                    font = ImageFont.truetype("simhei.ttf", font_size)
-                except:
-                    # 如果失败，使用默认字体
-                    font = ImageFont.load_default()
+                return self.cls_font_cache.get_font(font_path, font_size)
+            # 尝试加载默认中文字体 (Windows)
+            try:
+                return self.cls_font_cache.get_font("simhei.ttf", font_size)
+            except:
+                # 如果失败，使用默认字体
+                return ImageFont.load_default()
         except:
-            font = ImageFont.load_default()
-
-         # 计算每个单元格的宽度和高度
-        col_widths = []
-        for col in df.columns:
-            max_len = max([self.get_text_size(font, str(x))[0] for x in df[col]] + [self.get_text_size(font, col)[0]])
-            col_widths.append(max_len + 2 * cell_padding)
-        
-        row_heights = []
-        for _, row in df.iterrows():
-            max_height = max([self.get_text_size(font, str(x))[1] for x in row])
-            row_heights.append(max_height + 2 * cell_padding)
-        
-        # 添加表头高度
-        header_height = max([self.get_text_size(font, col)[1] for col in df.columns]) + 2 * cell_padding
-        row_heights.insert(0, header_height)
-        
-        # 计算图像总尺寸
-        total_width = sum(col_widths)
-        total_height = sum(row_heights)
-        
-        # 创建PIL图像
-        pil_img = Image.new("RGB", (total_width, total_height), bg_color)
-        draw = ImageDraw.Draw(pil_img)
-        
-        # 绘制表格内容
-        y = 0
-        # 绘制表头
-        x = 0
-        for i, col in enumerate(df.columns):
-            # 绘制表头背景
-            draw.rectangle([x, y, x + col_widths[i], y + row_heights[0]], fill=header_color)
-            # 绘制表头文本 (居中)
-            text_width, text_height = self.get_text_size(font, col)
-            draw.text((x + (col_widths[i] - text_width) // 2, y + (row_heights[0] - text_height) // 2), 
-                    col, font=font, fill=text_color)
-            x += col_widths[i]
-        
-        y += row_heights[0]
-        
-        # 绘制数据行
-        for _, row in df.iterrows():
-            x = 0
-            for i, value in enumerate(row):
-                # 绘制单元格背景
-                draw.rectangle([x, y, x + col_widths[i], y + row_heights[1]], fill=bg_color)
-                # 绘制单元格文本 (居中)
-                text_width, text_height = self.get_text_size(font, value)
-                draw.text((x + (col_widths[i] - text_width) // 2, y + (row_heights[1] - text_height) // 2), 
-                        value, font=font, fill=text_color)
-                x += col_widths[i]
-            y += row_heights[1]
-        
-        # 绘制网格线
-        # 水平线
-        y = 0
-        for h in row_heights:
-            draw.line([0, y, total_width, y], fill=grid_color)
-            y += h
-        draw.line([0, y, total_width, y], fill=grid_color)  # 最后一条线
-        
-        # 垂直线
-        x = 0
-        draw.line([x, 0, x, total_height], fill=grid_color)
-        for w in col_widths:
-            x += w
-            draw.line([x, 0, x, total_height], fill=grid_color)
-        
-        # 转换为OpenCV格式 (BGR)
-        cv2_img = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-        
-        return cv2_img
+            return ImageFont.load_default()
 
     
     def get_text_size(self, font, text):
@@ -1196,22 +1307,83 @@ def ndarray_cover_alpha_color(self, cover_color, img_ndarray, direction='vertica
         参数:
             cover_color: BGR
             img_ndarray: cv2 图像数据
-            direction:  horizontal(横) / vertical(竖)
+            direction:  horizontal(横) / vertical(竖) / 角度数值, 参考 overlay_gradient_color
         返回:
             numpy.ndarray: BGRA 格式的图像（H×W×4）
         """
-        img_add_alpha = self.add_alpha(img_ndarray)     # 增加透明层
-        width, height = self.width_height(img_add_alpha)
-        # 创建 cover_color 图片
-        color_alpha = self.create_image(width=width, height=height, color=(*cover_color, 255))
-        # print('......color_alpha:', color_alpha)
-        # 创建 创建一张从左到右 或从上到下 颜色逐渐变深的灰度图
-        gradient_gray_image = self.create_gradient_gray_image(width=width, height=height, start_x=0, start_y=0, direction=direction)
-        # gradient_gray_image 作为 color_alpha alpha 值
-        gray_as_alpha_cv2 = self.apply_gray_as_alpha_cv2(bgr_image=color_alpha, gray_image=gradient_gray_image)
-
-        ret_ndarray = self.blend_images(img1=img_add_alpha, img2=gray_as_alpha_cv2)
-        return ret_ndarray
+        return self.overlay_gradient_color(img_ndarray, cover_color, direction=direction)
+
+    def overlay_gradient_color(self, img_ndarray, cover_color, direction='vertical', alpha_start=255, alpha_end=0,
+                               out=None, band_rows=256) -> np.ndarray:
+        """
+        图片上叠加线性渐变透明的颜色 (融合计算): 渐变只用一维向量广播, 按行分块用 uint16 定点数计算,
+        不创建整图大小的颜色图/渐变图/浮点临时数组; 结果与 blend_images 叠加相差不超过 1
+
+        参数:
+            img_ndarray: 灰度 / BGR / BGRA 图像 (底图)
+            cover_color: BGR 颜色
+            direction: 'vertical' 从上到下 / 'horizontal' 从左到右 / 角度数值 (度, 0 同 horizontal, 90 同 vertical)
+            alpha_start / alpha_end: 渐变起点 / 终点的颜色 alpha 值 (0-255)
+            out: 预先分配的 (H×W×4) uint8 数组, 可以是 img_ndarray 本身 (原地修改)
+            band_rows: 每次计算的行数
+
+        返回:
+            numpy.ndarray: BGRA 格式的图像（H×W×4）
+        """
+        height, width = img_ndarray.shape[:2]
+        has_alpha = img_ndarray.ndim == 3 and img_ndarray.shape[2] == 4
+        if out is None:
+            out = np.empty((height, width, 4), dtype=np.uint8)
+        self.to_bgra(img_ndarray, out=out)
+        color = np.array(cover_color[:3], dtype=np.uint16)
+
+        for y0 in range(0, height, band_rows):
+            y1 = min(y0 + band_rows, height)
+            gradient = self.gradient_alpha_band(width, height, y0, y1, direction, alpha_start, alpha_end)
+            band = out[y0:y1]
+            if not has_alpha or (band[..., 3] == 255).all():
+                # 底图不透明: rgb = (color * g + bottom * (255 - g)) / 255, 最大 255 * 255, uint16 不溢出
+                rgb = band[..., :3].astype(np.uint16)
+                rgb *= (255 - gradient)[..., np.newaxis]
+                rgb += color * gradient[..., np.newaxis]
+                band[..., :3] = self._div255_uint16(rgb)
+                band[..., 3] = 255
+            else:
+                self._overlay_band_with_alpha(band, color, gradient)
+        return out
+
+    def gradient_alpha_band(self, width, height, y0, y1, direction='vertical', alpha_start=255, alpha_end=0) -> np.ndarray:
+        """
+        计算渐变 alpha 第 y0 到 y1 行 (uint16)
+        返回: vertical (y1-y0, 1) / horizontal (1, width) / 角度 (y1-y0, width), 可以与 (y1-y0, width) 广播
+        """
+        if direction == 'horizontal':
+            return np.linspace(alpha_start, alpha_end, width).astype(np.uint8).astype(np.uint16)[np.newaxis, :]
+        if not isinstance(direction, (int, float)):     # vertical 及其它
+            return np.linspace(alpha_start, alpha_end, height).astype(np.uint8).astype(np.uint16)[y0:y1, np.newaxis]
+
+        # 任意角度: 像素在渐变方向上的投影, 归一化到 0-1
+        radian = np.deg2rad(direction)
+        cos_a, sin_a = np.cos(radian), np.sin(radian)
+        xs = np.arange(width, dtype=np.float32) * cos_a
+        ys = np.arange(y0, y1, dtype=np.float32) * sin_a
+        corners = [x * cos_a + y * sin_a for x in (0, width - 1) for y in (0, height - 1)]
+        t_min, t_max = min(corners), max(corners)
+        t = (ys[:, np.newaxis] + xs[np.newaxis, :] - t_min) / max(t_max - t_min, 1e-6)
+        return (alpha_start + (alpha_end - alpha_start) * t).astype(np.uint8).astype(np.uint16)
+
+    def _div255_uint16(self, values:np.ndarray) -> np.ndarray:
+        # uint16 除以 255 (四舍五入), values <= 255 * 255
+        values += 128
+        values += values >> 8
+        values >>= 8
+        return values
+
+    def _overlay_band_with_alpha(self, band, color, gradient):
+        # 底图有透明像素时的叠加 (uint32 定点数), 原地修改 band
+        rgb, alpha = self._blend_over_uint32(band[..., :3], band[..., 3], color, gradient)
+        band[..., :3] = rgb
+        band[..., 3] = alpha
 
     def get_average_color(self, x, y, width, height, img_ndarray):
         """获取图片指定区域的 BGR 平均颜色
@@ -0,0 +1,161 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+
+class MediaProbeHandle(object):
+    """
+    ffprobe 元数据缓存: 一次 ffprobe -show_streams -show_format 得到全部流和格式信息,
+    按 (路径, 大小, 修改时间) 缓存在内存和磁盘 (cache_dir 下每个文件一个 json), 文件改变后自动重新读取
+    from zwutils_methods import MediaProbeHandle    # 音视频元数据
+    # self.cls_media_probe = MediaProbeHandle()    # 音视频元数据
+    """
+    _lock = threading.Lock()
+    _memory = {}    # 绝对路径 -> 缓存数据 {'size', 'mtime_ns', 'info', 'error', 'extra'}
+
+    def __init__(self, cache_dir=None, ffprobe_path='ffprobe'):
+        """
+        cache_dir: 磁盘缓存文件夹, None 使用系统临时文件夹下的 zw_media_probe, False 不使用磁盘缓存
+        """
+        if cache_dir is None:
+            cache_dir = Path(tempfile.gettempdir()) / 'zw_media_probe'
+        self.cache_dir = None
+        if cache_dir is not False:
+            self.cache_dir = Path(cache_dir)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ffprobe_path = ffprobe_path
+
+    def probe(self, media_path) -> dict | None:
+        """
+        读取音视频元数据 (有缓存)
+
+        返回:
+            dict: ffprobe json {'streams': [...], 'format': {...}}; 文件不存在或不是音视频文件返回 None
+        """
+        entry = self._get_entry(media_path)
+        if entry is None:
+            return None
+        return entry['info']
+
+    def _get_entry(self, media_path):
+        media_path = os.path.abspath(media_path)
+        try:
+            stat = os.stat(media_path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._memory.get(media_path)
+        if not self._is_valid(entry, stat):
+            entry = self._read_disk(media_path)
+            if not self._is_valid(entry, stat):
+                entry = self._run_ffprobe(media_path, stat)
+                self._write_disk(media_path, entry)
+            with self._lock:
+                self._memory[media_path] = entry
+        return entry
+
+    def _is_valid(self, entry, stat) -> bool:
+        return entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns
+
+    def _run_ffprobe(self, media_path, stat) -> dict:
+        command = [
+            self.ffprobe_path,
+            '-v', 'error',
+            '-show_streams',
+            '-show_format',
+            '-of', 'json',
+            media_path,
+        ]
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'info': None, 'error': None, 'extra': {}}
+        try:
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
+            entry['info'] = json.loads(result.stdout)
+        except FileNotFoundError:
+            raise Exception("ffprobe not found. Please ensure FFmpeg is installed and in your PATH.")
+        except subprocess.CalledProcessError as e:
+            # 不是音视频文件, 同样缓存, 避免重复调用 ffprobe
+            entry['error'] = e.stderr.strip()
+        except ValueError as e:
+            entry['error'] = f'ffprobe 输出解析失败: {e}'
+        return entry
+
+    def _disk_path(self, media_path) -> Path:
+        return self.cache_dir / f"{hashlib.sha1(media_path.encode('utf-8')).hexdigest()}.json"
+
+    def _read_disk(self, media_path):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_path(media_path), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('path') != media_path:
+            return None
+        return entry
+
+    def _write_disk(self, media_path, entry):
+        if self.cache_dir is None:
+            return
+        disk_path = self._disk_path(media_path)
+        tmp_path = disk_path.with_name(f'{disk_path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'path': media_path, **entry}, f, ensure_ascii=False)
+            os.replace(tmp_path, disk_path)
+        except OSError as e:
+            print(f'Error write probe cache failed: {e}')
+
+    def get_extra(self, media_path, key):
+        # 读取缓存的附加信息 (如统计的帧数), 文件改变后失效
+        entry = self._get_entry(media_path)
+        if entry is None:
+            return None
+        return entry['extra'].get(key)
+
+    def set_extra(self, media_path, key, value):
+        # 保存附加信息到缓存 (内存和磁盘)
+        entry = self._get_entry(media_path)
+        if entry is None:
+            return
+        with self._lock:
+            entry['extra'][key] = value
+        self._write_disk(os.path.abspath(media_path), entry)
+
+    def first_stream(self, media_path, codec_type='video') -> dict | None:
+        # 第一个指定类型的流 (video / audio)
+        info = self.probe(media_path)
+        if info is None:
+            return None
+        for stream in info.get('streams', []):
+            if stream.get('codec_type') == codec_type:
+                return stream
+        return None
+
+    def get_dimensions(self, media_path) -> tuple:
+        # 视频宽高 (width, height), 失败返回 (None, None)
+        stream = self.first_stream(media_path, 'video')
+        if stream is None:
+            return None, None
+        return stream.get('width'), stream.get('height')
+
+    def get_duration_ms(self, media_path) -> int | None:
+        # 时长 (毫秒), 失败返回 None
+        info = self.probe(media_path)
+        if info is None:
+            return None
+        duration = info.get('format', {}).get('duration')
+        if duration is None:
+            return None
+        return int(float(duration) * 1000)
+
+    @classmethod
+    def clear_memory(cls):
+        # 清空内存缓存 (磁盘缓存按文件大小和修改时间校验, 不需要清除)
+        with cls._lock:
+            cls._memory.clear()
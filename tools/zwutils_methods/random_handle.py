@@ -1,5 +1,5 @@
-import os
 import random
+from .dir_scan_handle import DirScanHandle    # 目录扫描
 
 
 class RandomHandle(object):
@@ -8,7 +8,7 @@ class RandomHandle(object):
     # self.cls_randomhandle = RandomHandle()    # 随机选择类 
     """
     def __init__(self):
-        pass
+        self.cls_dir_scan = DirScanHandle()    # 目录扫描
 
     def select_random_files(self, folder_path, prefix, choose_num, shuffle_results=True):
         """
@@ -22,10 +22,7 @@ def select_random_files(self, folder_path, prefix, choose_num, shuffle_results=T
             包含两个随机选择的文件路径的列表，如果符合条件的文件少于两个，则返回 None。
         """
 
-        matching_files = []
-        for filename in os.listdir(folder_path):
-            if filename.startswith(prefix):
-                matching_files.append(os.path.join(folder_path, filename))
+        matching_files = self.cls_dir_scan.list_paths(folder_path, prefix=prefix)
 
         if len(matching_files) < choose_num:
             return matching_files  # 符合条件的文件少于两个
@@ -0,0 +1,151 @@
+import threading
+import cv2      # pip install opencv-python
+import numpy as np
+from PIL import Image     # pip install pillow (兼容 pillow-simd)
+try:
+    import pyvips       # pip install pyvips (可选)
+except ImportError:
+    pyvips = None
+
+
+class ResizeHandle(object):
+    """
+    图片缩放(内存中完成, 不写临时文件), 支持 opencv / pillow / pyvips 后端
+    from zwutils_methods import ResizeHandle    # 图片缩放
+    # self.cls_resize_handle = ResizeHandle()    # 图片缩放
+
+    # 全局设置(所有实例共用):
+    # ResizeHandle.set_default_policy(backend='opencv', downscale='area', upscale='lanczos')
+    """
+    BACKENDS = ('opencv', 'pillow', 'pyvips')
+    INTERPOLATIONS = ('nearest', 'linear', 'cubic', 'area', 'lanczos')
+
+    _lock = threading.Lock()
+    _default_policy = {
+        'backend': 'opencv',
+        'downscale': 'area',       # 缩小: 区域插值, 不产生摩尔纹
+        'upscale': 'lanczos',      # 放大: lanczos, 边缘更锐利
+    }
+
+    _opencv_flags = {
+        'nearest': cv2.INTER_NEAREST,
+        'linear': cv2.INTER_LINEAR,
+        'cubic': cv2.INTER_CUBIC,
+        'area': cv2.INTER_AREA,
+        'lanczos': cv2.INTER_LANCZOS4,
+    }
+    _pillow_flags = {
+        'nearest': Image.Resampling.NEAREST,
+        'linear': Image.Resampling.BILINEAR,
+        'cubic': Image.Resampling.BICUBIC,
+        'area': Image.Resampling.BOX,
+        'lanczos': Image.Resampling.LANCZOS,
+    }
+    _pyvips_kernels = {
+        'nearest': 'nearest',
+        'linear': 'linear',
+        'cubic': 'cubic',
+        'area': 'linear',       # pyvips 缩小时自动 shrink(区域平均) 再插值
+        'lanczos': 'lanczos3',
+    }
+
+    def __init__(self, backend=None, downscale=None, upscale=None):
+        # 实例级别设置, None 使用全局设置
+        self.backend = backend
+        self.downscale = downscale
+        self.upscale = upscale
+
+    @classmethod
+    def set_default_policy(cls, backend=None, downscale=None, upscale=None):
+        """设置全局缩放后端和插值策略, None 保持不变"""
+        with cls._lock:
+            for key, value in (('backend', backend), ('downscale', downscale), ('upscale', upscale)):
+                if value is not None:
+                    cls._check_option(key, value)
+                    cls._default_policy[key] = value
+
+    @classmethod
+    def get_default_policy(cls) -> dict:
+        with cls._lock:
+            return dict(cls._default_policy)
+
+    @classmethod
+    def available_backends(cls) -> list:
+        # 当前环境可用的后端
+        return [b for b in cls.BACKENDS if b != 'pyvips' or pyvips is not None]
+
+    @classmethod
+    def _check_option(cls, key, value):
+        if key == 'backend':
+            if value not in cls.BACKENDS:
+                raise ValueError(f"backend 必须是 {cls.BACKENDS} 之一 ({value})")
+            if value == 'pyvips' and pyvips is None:
+                raise ImportError("pyvips 未安装: pip install pyvips")
+        elif value not in cls.INTERPOLATIONS:
+            raise ValueError(f"{key} 必须是 {cls.INTERPOLATIONS} 之一 ({value})")
+
+    def compute_interpolation(self, source_size, target_size, interpolation=None) -> str:
+        # 计算插值方式: 指定 interpolation 优先, 否则按缩小/放大策略选择
+        if interpolation is not None:
+            self._check_option('interpolation', interpolation)
+            return interpolation
+        policy = self.get_default_policy()
+        source_width, source_height = source_size
+        target_width, target_height = target_size
+        if target_width * target_height < source_width * source_height:
+            return self.downscale or policy['downscale']
+        return self.upscale or policy['upscale']
+
+    def resize(self, img:np.ndarray, target_size, interpolation=None, backend=None) -> np.ndarray:
+        """
+        缩放图片 np.ndarray
+
+        参数:
+            img: 输入图片 (H×W, H×W×3 或 H×W×4, uint8)
+            target_size: (width, height)
+            interpolation: 'nearest' / 'linear' / 'cubic' / 'area' / 'lanczos'; None 使用策略(缩小 area, 放大 lanczos)
+            backend: 'opencv' / 'pillow' / 'pyvips'; None 使用实例或全局设置
+
+        返回:
+            np.ndarray: 缩放后的图片, 通道数与输入一致
+        """
+        target_width, target_height = int(target_size[0]), int(target_size[1])
+        if target_width <= 0 or target_height <= 0:
+            raise ValueError(f"目标尺寸无效: {target_size}")
+        source_height, source_width = img.shape[:2]
+        if (source_width, source_height) == (target_width, target_height):
+            return img.copy()
+
+        backend = backend or self.backend or self.get_default_policy()['backend']
+        self._check_option('backend', backend)
+        interpolation = self.compute_interpolation((source_width, source_height), (target_width, target_height), interpolation)
+
+        if backend == 'pillow':
+            return self._resize_pillow(img, target_width, target_height, interpolation)
+        elif backend == 'pyvips':
+            return self._resize_pyvips(img, target_width, target_height, interpolation)
+        return cv2.resize(img, dsize=(target_width, target_height), interpolation=self._opencv_flags[interpolation])
+
+    def _resize_pillow(self, img, target_width, target_height, interpolation):
+        # Pillow 缩放与通道顺序无关, BGR(A) 直接按 RGB(A) 处理, 不需要颜色转换
+        if img.ndim == 2 or img.shape[2] in (3, 4):
+            pil_img = Image.fromarray(img)
+            resized = pil_img.resize((target_width, target_height), resample=self._pillow_flags[interpolation])
+            return np.array(resized)    # np.asarray 得到只读数组, 其它方法原地修改时报错
+        # 其它通道数逐通道缩放
+        channels = [self._resize_pillow(np.ascontiguousarray(img[:, :, i]), target_width, target_height, interpolation) for i in range(img.shape[2])]
+        return np.dstack(channels)
+
+    def _resize_pyvips(self, img, target_width, target_height, interpolation):
+        source_height, source_width = img.shape[:2]
+        vips_img = pyvips.Image.new_from_array(img)
+        resized = vips_img.resize(target_width / source_width, vscale=target_height / source_height, kernel=self._pyvips_kernels[interpolation])
+        ret = resized.numpy()
+        # pyvips 取整可能差 1 像素, 裁剪/补齐到目标尺寸
+        if ret.shape[:2] != (target_height, target_width):
+            ret = cv2.resize(ret, dsize=(target_width, target_height), interpolation=cv2.INTER_NEAREST)
+        if img.ndim == 3 and ret.ndim == 2:
+            ret = ret[:, :, np.newaxis]
+        if not ret.flags.writeable:
+            ret = ret.copy()    # 与 OpenCV 后端一致, 返回可写数组
+        return ret
@@ -0,0 +1,180 @@
+import cv2      # pip install opencv-python
+import numpy as np
+import pandas as pd
+from PIL import Image, ImageDraw
+
+
+class TableRenderer(object):
+    """
+    pandas.DataFrame 表格绘制: 相同文字只测量一次, 列宽/行高用 numpy 向量计算, 按行分块绘制
+    超长表格可以按最大高度分页 (每页重复表头)
+    颜色参数直接传给 PIL (与 dataframe_to_cv2_image 原有行为一致), 输出为 cv2 BGR 图像
+    from zwutils_methods import TableRenderer    # 表格绘制
+    # self.cls_table_renderer = TableRenderer(font)    # 表格绘制
+    """
+    def __init__(self, font, cell_padding=10, text_color=(10, 10, 10), bg_color=(240, 240, 240),
+                 header_color=(220, 220, 220), grid_color=(180, 180, 180), tile_rows=256):
+        self.font = font
+        self.cell_padding = cell_padding
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.header_color = header_color
+        self.grid_color = grid_color
+        self.tile_rows = tile_rows      # 每次绘制的行数 (分块绘制)
+
+    def measure_texts(self, texts) -> tuple:
+        """
+        测量文字尺寸, 相同文字只测量一次
+        参数: texts: 字符串 ndarray (任意形状)
+        返回: (宽度 ndarray, 高度 ndarray), 形状与 texts 相同
+        """
+        texts = np.asarray(texts, dtype=object)
+        codes, uniques = pd.factorize(texts.ravel())
+        sizes = np.zeros((len(uniques), 2), dtype=np.int64)
+        draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+        for idx, text in enumerate(uniques):
+            bbox = draw.textbbox((0, 0), text, font=self.font)     # 支持含换行符的文字
+            sizes[idx] = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+        if len(codes) == 0:
+            return np.zeros(texts.shape, dtype=np.int64), np.zeros(texts.shape, dtype=np.int64)
+        return sizes[codes, 0].reshape(texts.shape), sizes[codes, 1].reshape(texts.shape)
+
+    def layout(self, df) -> dict:
+        """
+        计算表格排版
+
+        返回:
+            dict: {
+                'columns': 表头文字 list,
+                'texts': 单元格文字 ndarray (rows, cols),
+                'col_widths': 列宽 ndarray,
+                'header_height': 表头高度,
+                'row_heights': 数据行高度 ndarray,
+                'header_sizes': 表头文字 (宽度, 高度) ndarray,
+                'text_sizes': 单元格文字 (宽度, 高度) ndarray,
+            }
+        """
+        columns = [str(col) for col in df.columns]
+        texts = df.astype(str).to_numpy(dtype=object)
+        cell_w, cell_h = self.measure_texts(texts)
+        header_w, header_h = self.measure_texts(np.array(columns, dtype=object))
+
+        padding = 2 * self.cell_padding
+        col_widths = np.maximum(cell_w.max(axis=0, initial=0), header_w) + padding
+        row_heights = cell_h.max(axis=1, initial=0) + padding
+        header_height = int(header_h.max(initial=0)) + padding
+        return {
+            'columns': columns,
+            'texts': texts,
+            'col_widths': col_widths,
+            'header_height': header_height,
+            'row_heights': row_heights,
+            'header_sizes': (header_w, header_h),
+            'text_sizes': (cell_w, cell_h),
+        }
+
+    def paginate(self, row_heights, header_height, max_height=None) -> list:
+        """
+        按最大高度分页, 每页至少一行
+        返回: [(起始行, 结束行), ...]
+        """
+        n_rows = len(row_heights)
+        if max_height is None or n_rows == 0:
+            return [(0, n_rows)]
+        pages = []
+        start = 0
+        page_height = header_height
+        for idx, h in enumerate(row_heights):
+            if idx > start and page_height + h > max_height:
+                pages.append((start, idx))
+                start = idx
+                page_height = header_height
+            page_height += h
+        pages.append((start, n_rows))
+        return pages
+
+    def render(self, df, max_height=None) -> list:
+        """
+        绘制表格
+
+        参数:
+            df: pandas.DataFrame
+            max_height: int - 每张图片的最大高度 (None 不分页)
+
+        返回:
+            list: [numpy.ndarray (BGR), ...] 每页一张图片
+        """
+        layout = self.layout(df)
+        text_masks = {}     # 文字 -> (遮罩, x 偏移, y 偏移), 相同文字只渲染一次
+        return [
+            self.render_page(layout, start, end, text_masks)
+            for start, end in self.paginate(layout['row_heights'], layout['header_height'], max_height)
+        ]
+
+    def render_page(self, layout, start, end, text_masks=None) -> np.ndarray:
+        # 绘制一页 (表头 + 第 start 到 end 行)
+        if text_masks is None:
+            text_masks = {}
+        col_widths = layout['col_widths']
+        header_height = layout['header_height']
+        row_heights = layout['row_heights'][start:end]
+        col_x = np.concatenate(([0], np.cumsum(col_widths)))
+        row_y = header_height + np.concatenate(([0], np.cumsum(row_heights)))
+        total_width, total_height = int(col_x[-1]), int(row_y[-1])
+
+        page = np.empty((total_height, total_width, 3), dtype=np.uint8)
+        page[:] = self.bg_color
+        page[:header_height] = self.header_color
+        color = np.array(self.text_color[:3], dtype=np.uint16)
+
+        # 表头
+        header_w, header_h = layout['header_sizes']
+        self._draw_cells(page, np.array([0]), np.array([header_height]), np.array([layout['columns']], dtype=object),
+                         header_w[None], header_h[None], col_x, color, text_masks)
+
+        # 数据行 (按行分块)
+        cell_w, cell_h = layout['text_sizes']
+        for tile_start in range(start, end, self.tile_rows):
+            tile_end = min(tile_start + self.tile_rows, end)
+            self._draw_cells(page, row_y[tile_start - start:tile_end - start], row_heights[tile_start - start:tile_end - start],
+                             layout['texts'][tile_start:tile_end], cell_w[tile_start:tile_end], cell_h[tile_start:tile_end],
+                             col_x, color, text_masks)
+
+        # 网格线 (横线包括表格顶部 y=0, 表头与数据行的分隔线为 row_y[0])
+        line_y = np.concatenate(([0], row_y))
+        page[line_y[line_y < total_height]] = self.grid_color
+        page[:, col_x[col_x < total_width]] = self.grid_color
+
+        return cv2.cvtColor(page, cv2.COLOR_RGB2BGR)
+
+    def text_mask(self, text, text_masks) -> tuple:
+        # 渲染文字遮罩 (缓存), 返回 (遮罩 uint8, x 偏移, y 偏移); 偏移相对于 draw.text 的坐标
+        cached = text_masks.get(text)
+        if cached is not None:
+            return cached
+        draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+        left, top, right, bottom = draw.textbbox((0, 0), text, font=self.font)
+        left, top = min(left, 0), min(top, 0)
+        mask_img = Image.new('L', (max(right - left, 1), max(bottom - top, 1)), 0)
+        ImageDraw.Draw(mask_img).text((-left, -top), text, font=self.font, fill=255)
+        cached = (np.asarray(mask_img), left, top)
+        text_masks[text] = cached
+        return cached
+
+    def _draw_cells(self, page, rows_y, rows_h, texts, text_w, text_h, col_x, color, text_masks):
+        # 绘制一块行的文字 (单元格内居中): 整块的文字坐标一次算出, 用缓存的文字遮罩混合颜色
+        xs = col_x[:-1] + (np.diff(col_x) - text_w) // 2
+        ys = rows_y[:, None] + (rows_h[:, None] - text_h) // 2
+        page_h, page_w = page.shape[:2]
+        for x, y, text in zip(xs.ravel(), ys.ravel(), texts.ravel()):
+            mask, off_x, off_y = self.text_mask(text, text_masks)
+            x0, y0 = int(x) + off_x, int(y) + off_y
+            # 裁剪到页面范围内
+            mx0, my0 = max(-x0, 0), max(-y0, 0)
+            x1, y1 = min(x0 + mask.shape[1], page_w), min(y0 + mask.shape[0], page_h)
+            x0, y0 = max(x0, 0), max(y0, 0)
+            if x0 >= x1 or y0 >= y1:
+                continue
+            alpha = mask[my0:my0 + y1 - y0, mx0:mx0 + x1 - x0, None].astype(np.uint16)
+            roi = page[y0:y1, x0:x1]
+            roi[:] = (roi * (255 - alpha) + color * alpha + 127) // 255
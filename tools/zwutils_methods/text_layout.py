@@ -0,0 +1,153 @@
+import re
+import threading
+import weakref
+
+
+class TextLayout(object):
+    """
+    文字排版 (只计算, 不绘制): 缓存每个字体的字符宽度, 一次遍历完成自动换行
+    中文按字换行, 英文单词不拆开 (单词比行宽还长时才按字母拆开), 标点不放在行首
+    from zwutils_methods import TextLayout    # 文字排版
+    # self.cls_text_layout = TextLayout()    # 文字排版
+    """
+    # 英文单词/数字 (不拆开), 其它字符单独处理
+    _token_pattern = re.compile(r"[A-Za-z0-9À-ɏ'’\-_.]+|\s|.", re.S)
+    # 不能放在行首的标点
+    NO_LINE_START = set('，。、；：？！）》」』】〕〉”’,.;:?!)]}%…·-')
+
+    _lock = threading.Lock()
+    _advances = weakref.WeakKeyDictionary()     # font -> {char: 宽度}
+
+    def char_advance(self, font, char) -> float:
+        # 单个字符宽度 (缓存)
+        font_advances = self._advances.get(font)
+        if font_advances is None:
+            with self._lock:
+                font_advances = self._advances.setdefault(font, {})
+        advance = font_advances.get(char)
+        if advance is None:
+            advance = font.getlength(char)
+            font_advances[char] = advance
+        return advance
+
+    def text_advance(self, font, text) -> float:
+        # 文字宽度 (字符宽度之和)
+        return sum(self.char_advance(font, char) for char in text)
+
+    def break_lines(self, text, font, max_width) -> list:
+        """
+        自动换行
+
+        参数:
+            text: 单段文字 (不含换行符)
+            font: ImageFont.FreeTypeFont
+            max_width: 最大行宽 (像素)
+
+        返回:
+            list: [(行文字, 行宽度), ...]
+        """
+        lines = []
+        current_line = []
+        current_width = 0.0
+
+        def new_line():
+            nonlocal current_line, current_width
+            # 行尾空格不计入行宽
+            while current_line and current_line[-1].isspace():
+                current_width -= self.text_advance(font, current_line.pop())
+            lines.append((''.join(current_line), current_width))
+            current_line, current_width = [], 0.0
+
+        for token in self._token_pattern.findall(text):
+            token_width = self.text_advance(font, token)
+            if current_width + token_width <= max_width:
+                current_line.append(token)
+                current_width += token_width
+                continue
+
+            if not current_line:
+                pass    # 空行放不下, 下面按字符拆开
+            elif token.isspace():
+                new_line()      # 行尾空格不换到下一行行首
+                continue
+            elif token in self.NO_LINE_START:
+                current_line.append(token)      # 标点不放行首, 允许超出行宽
+                current_width += token_width
+                continue
+            else:
+                new_line()
+                if token_width <= max_width:
+                    current_line.append(token)
+                    current_width = token_width
+                    continue
+
+            # 单词比一行还长, 按字符拆开
+            for char in token:
+                char_width = self.char_advance(font, char)
+                if current_line and current_width + char_width > max_width:
+                    new_line()
+                current_line.append(char)
+                current_width += char_width
+
+        if current_line:
+            new_line()
+        return lines
+
+    def measure(self, text, font, font_size, max_width, line_spacing=1.5) -> dict:
+        """
+        计算单段文字的排版
+
+        返回:
+            dict: {
+                'lines': [(行文字, 行宽度), ...],
+                'line_height': 行高,
+                'width': 最宽行的宽度,
+                'height': 总高度,
+            }
+        """
+        lines = self.break_lines(text, font, max_width)
+        line_height = int(font_size * line_spacing)
+        return {
+            'lines': lines,
+            'line_height': line_height,
+            'width': int(max([w for _, w in lines], default=0)),
+            'height': len(lines) * line_height,
+        }
+
+    def measure_multiline(self, text, font, font_size, max_width, line_spacing=1.5, paragraph_spacing=1.2) -> dict:
+        """
+        计算多段文字 (换行符分段) 的排版
+
+        返回:
+            dict: {
+                'paragraphs': [{'y': 段落相对起点的 y 偏移, 'lines': [...], 'line_height', 'width', 'height'}, ...],
+                'width': 最宽行的宽度,
+                'height': 总高度,
+            }
+        """
+        paragraphs = text.split('\n')
+        line_height = int(font_size * line_spacing)
+        ret_paragraphs = []
+        total_height = 0
+        max_width_actual = 0
+        y = 0
+        for idx, para in enumerate(paragraphs):
+            if not para:    # 空行处理: 只占一行高度, 不需要排版
+                total_height += line_height * paragraph_spacing
+                y += int(line_height * paragraph_spacing)
+                continue
+
+            para_layout = self.measure(para, font, font_size, max_width, line_spacing=line_spacing)
+            para_layout['y'] = y
+            ret_paragraphs.append(para_layout)
+
+            h = para_layout['height']
+            max_width_actual = max(max_width_actual, para_layout['width'])
+            total_height += h * (paragraph_spacing if idx != len(paragraphs) - 1 else 1)
+            y += int(h * paragraph_spacing)
+
+        return {
+            'paragraphs': ret_paragraphs,
+            'width': max_width_actual,
+            'height': total_height,
+        }
@@ -0,0 +1,236 @@
+import os
+import shutil
+import tempfile
+import subprocess
+import numpy as np
+from .media_probe_handle import MediaProbeHandle    # 音视频元数据
+from .encoder_presets import EncoderPresets    # 视频编码预设
+
+
+class VideoFrameReader(object):
+    """
+    视频帧读取 (不写临时图片): ffmpeg 解码为 bgr24 原始数据输出到 stdout, 读入可重复使用的 ndarray 缓冲区
+    内存占用固定为一帧, 每一帧可以直接用 ImgHandle 的方法处理 (BGR, 同 cv2.imread)
+    from zwutils_methods import VideoFrameReader    # 视频帧读取
+    # with VideoFrameReader(video_path, fps=10) as reader:
+    #     for frame in reader:    # 默认每次返回同一个缓冲区, 需要保留时 frame.copy() 或 copy=True
+    #         ...
+    """
+    def __init__(self, video_path, fps=None, size=None, start_ms=None, end_ms=None, copy=False, ffmpeg_path='ffmpeg', cls_media_probe=None):
+        """
+        fps: 输出帧率, None 使用原视频帧率
+        size: 输出尺寸 (width, height), None 使用原视频尺寸
+        start_ms, end_ms: 读取的时间范围 (毫秒), None 不限制
+        copy: True 每帧返回新数组; False 返回同一个缓冲区 (下一次迭代时被覆盖)
+        """
+        self.video_path = video_path
+        self.fps = fps
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.copy = copy
+        self.ffmpeg_path = ffmpeg_path
+        self.cls_media_probe = cls_media_probe or MediaProbeHandle()    # 音视频元数据
+        self.width, self.height = size if size is not None else self.compute_source_size()
+        self.frame_index = 0        # 已读取的帧数
+        self.returncode = None      # ffmpeg 退出码 (提前结束读取时为 0)
+        self.process = None
+        self._stderr = None
+        self._buffer = np.empty((self.height, self.width, 3), dtype=np.uint8)
+
+    def compute_source_size(self) -> tuple:
+        # 原视频显示尺寸 (ffmpeg 默认按旋转信息自动旋转, 90/270 度时宽高互换)
+        stream = self.cls_media_probe.first_stream(self.video_path, 'video')
+        if stream is None or not stream.get('width') or not stream.get('height'):
+            raise ValueError(f'无法读取视频尺寸: {self.video_path}')
+        width, height = stream['width'], stream['height']
+        rotation = stream.get('tags', {}).get('rotate')
+        for side_data in stream.get('side_data_list', []):
+            rotation = side_data.get('rotation', rotation)
+        if rotation is not None and abs(int(float(rotation))) % 180 == 90:
+            width, height = height, width
+        return width, height
+
+    def build_command(self) -> list:
+        cmd = [self.ffmpeg_path, '-v', 'error', '-nostdin']
+        if self.start_ms is not None:
+            cmd += ['-ss', f'{self.start_ms / 1000.0:.3f}']
+        cmd += ['-i', self.video_path]
+        if self.end_ms is not None:
+            cmd += ['-t', f'{(self.end_ms - (self.start_ms or 0)) / 1000.0:.3f}']
+        filters = []
+        if self.fps is not None:
+            filters.append(f'fps={self.fps}')
+        filters.append(f'scale={self.width}:{self.height}')     # 尺寸与缓冲区一致 (原尺寸时不缩放)
+        cmd += ['-map', '0:v:0', '-vf', ','.join(filters), '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1']
+        return cmd
+
+    def open(self):
+        if self.process is not None:
+            return self
+        if not shutil.which(self.ffmpeg_path):
+            raise FileNotFoundError(f"FFmpeg executable '{self.ffmpeg_path}' not found")
+        self._stderr = tempfile.TemporaryFile()     # stderr 写文件, 避免管道写满阻塞
+        self.process = subprocess.Popen(self.build_command(), stdout=subprocess.PIPE, stderr=self._stderr, bufsize=0)
+        self.frame_index = 0
+        self.returncode = None
+        return self
+
+    def read(self) -> np.ndarray | None:
+        """
+        读取下一帧
+
+        返回:
+            np.ndarray: BGR 帧 (height, width, 3); 读取完毕返回 None
+        """
+        if self.process is None:
+            self.open()
+        view = memoryview(self._buffer).cast('B')
+        filled = 0
+        while filled < len(view):
+            count = self.process.stdout.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        if filled < len(view):
+            self._finish(at_eof=True)
+            return None
+        self.frame_index += 1
+        return self._buffer.copy() if self.copy else self._buffer
+
+    def __iter__(self):
+        while True:
+            frame = self.read()
+            if frame is None:
+                return
+            yield frame
+
+    def close(self) -> bool:
+        # 结束读取 (没有读完时终止 ffmpeg 进程); 返回是否正常结束, 读取完毕后再调用返回同样的结果
+        if self.process is not None:
+            self._finish(at_eof=False)
+        return self.returncode in (None, 0)
+
+    def _finish(self, at_eof):
+        # at_eof: 输出已读完, 等待 ffmpeg 退出并记录退出码; 否则是调用者提前结束, 终止进程
+        process, self.process = self.process, None
+        if at_eof:
+            returncode = process.wait()
+        elif process.poll() is None:
+            process.kill()
+            process.wait()
+            returncode = 0
+        else:
+            returncode = process.returncode
+        process.stdout.close()
+        self._stderr.seek(0)
+        error = self._stderr.read().decode('utf-8', errors='replace').strip()
+        self._stderr.close()
+        self.returncode = returncode
+        if returncode != 0:
+            print(f'Error ffmpeg 读取视频帧失败 (退出码 {returncode}): {self.video_path}\n{error}')
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class VideoFrameWriter(object):
+    """
+    视频帧写入 (不写临时图片): ndarray 帧 (BGR, uint8) 通过 stdin 以 bgr24 原始数据传给 ffmpeg 编码
+    from zwutils_methods import VideoFrameWriter    # 视频帧写入
+    # with VideoFrameWriter(output_path, width, height, fps=30, audio_path=video_path) as writer:
+    #     writer.write(frame)
+    """
+    def __init__(self, output_path, width, height, fps=30, preset=None, audio_path=None, ffmpeg_path='ffmpeg'):
+        """
+        fps: 帧率, 可以是分数字符串 (如 '30000/1001')
+        preset: 编码预设名称 (EncoderPresets), None 使用默认预设
+        audio_path: 音频来源 (音频文件或视频文件的第一个音轨), None 不加音频
+        """
+        self.output_path = output_path
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.preset = preset
+        self.audio_path = audio_path
+        self.ffmpeg_path = ffmpeg_path
+        self.cls_encoder_presets = EncoderPresets()    # 视频编码预设
+        self.frame_index = 0        # 已写入的帧数
+        self.process = None
+        self._stderr = None
+
+    def build_command(self) -> list:
+        cmd = [self.ffmpeg_path, *self.cls_encoder_presets.global_args(self.preset), '-y', '-v', 'error',
+               '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', f'{self.width}x{self.height}', '-r', str(self.fps),
+               '-i', 'pipe:0']
+        if self.audio_path is not None:
+            cmd += ['-i', self.audio_path, '-map', '0:v:0', '-map', '1:a:0?', '-c:a', 'aac', '-shortest']
+        cmd += self.cls_encoder_presets.video_args(self.preset, pix_fmt='yuv420p')
+        return cmd + [self.output_path]
+
+    def open(self):
+        if self.process is not None:
+            return self
+        if not shutil.which(self.ffmpeg_path):
+            raise FileNotFoundError(f"FFmpeg executable '{self.ffmpeg_path}' not found")
+        output_dir = os.path.dirname(self.output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self._stderr = tempfile.TemporaryFile()     # stderr 写文件, 避免管道写满阻塞
+        self.process = subprocess.Popen(self.build_command(), stdin=subprocess.PIPE, stderr=self._stderr)
+        self.frame_index = 0
+        return self
+
+    def write(self, frame) -> bool:
+        """
+        写入一帧
+
+        参数:
+            frame: np.ndarray (height, width, 3) BGR uint8; 4 通道 (BGRA) 时忽略 alpha
+
+        返回:
+            bool: 是否成功 (ffmpeg 已退出时返回 False)
+        """
+        if frame.ndim != 3 or frame.shape[2] not in (3, 4):
+            raise ValueError(f'帧必须是 (height, width, 3/4) 的 BGR/BGRA 数组, 实际 shape {frame.shape}')
+        if frame.dtype != np.uint8:
+            raise ValueError(f'帧必须是 uint8, 实际 {frame.dtype} (请先转换, 避免数值溢出)')
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            raise ValueError(f'帧尺寸 {frame.shape[1]}x{frame.shape[0]} 与输出尺寸 {self.width}x{self.height} 不一致')
+        if self.process is None:
+            self.open()
+        if frame.shape[2] == 4:
+            frame = frame[:, :, :3]
+        frame = np.ascontiguousarray(frame)    # 连续数组不复制
+        try:
+            self.process.stdin.write(memoryview(frame).cast('B'))
+        except (BrokenPipeError, OSError):
+            return False
+        self.frame_index += 1
+        return True
+
+    def close(self) -> bool:
+        # 结束输入并等待编码完成; 返回是否成功
+        if self.process is None:
+            return True
+        process, self.process = self.process, None
+        try:
+            process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        returncode = process.wait()
+        self._stderr.seek(0)
+        error = self._stderr.read().decode('utf-8', errors='replace').strip()
+        self._stderr.close()
+        if returncode != 0:
+            print(f'Error ffmpeg 写入视频失败: {self.output_path}\n{error}')
+            return False
+        return True
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -6,8 +6,15 @@
 import copy
 import subprocess
 import tempfile
-import json
+import asyncio
 import random
+from .dir_scan_handle import DirScanHandle    # 目录扫描
+from .media_probe_handle import MediaProbeHandle    # 音视频元数据
+from .audio_library_index import AudioLibraryIndex    # 音频库索引
+from .video_job import VideoJob    # 视频处理任务
+from .ffmpeg_async_executor import FfmpegAsyncExecutor    # ffmpeg 异步执行器
+from .encoder_presets import EncoderPresets    # 视频编码预设
+from .video_frame_stream import VideoFrameReader, VideoFrameWriter    # 视频帧读取/写入 (管道, 不写临时图片)
 # 图片基本操作
 
 
@@ -16,8 +23,14 @@ class VideoHandle(object):
     from zwutils_methods import VideoHandle    # 图片基本操作
     # self.cls_videohandle = VideoHandle()    # 视频基本操作
     """
+    SMART_TRIM_ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}    # smart 截取支持的编码 -> 重新编码开头/结尾使用的编码器
+
     def __init__(self):
-        pass
+        self.cls_dir_scan = DirScanHandle()    # 目录扫描
+        self.cls_media_probe = MediaProbeHandle()    # 音视频元数据 (ffprobe 缓存)
+        self._audio_libraries = {}    # 音频文件夹 -> AudioLibraryIndex
+        self.cls_ffmpeg_executor = FfmpegAsyncExecutor()    # ffmpeg 异步执行器 (*_async 方法使用)
+        self.cls_encoder_presets = EncoderPresets()    # 视频编码预设 (所有编码路径使用)
     
     def remove_video_metadata(self, input_file, output_file=None):
         """
@@ -25,54 +38,78 @@ def remove_video_metadata(self, input_file, output_file=None):
         :param input_file: 输入视频文件路径
         :param output_file: 输出视频文件路径
         """
+        temp_file = self._compute_remove_metadata_temp_file(input_file, output_file)
+        subprocess.run(self._build_remove_metadata_cmd(input_file, temp_file), check=True)
+
+        if output_file is None:
+            os.remove(input_file)
+            shutil.move(temp_file, input_file)
+        return output_file if output_file is not None else input_file
+
+    async def remove_video_metadata_async(self, input_file, output_file=None, timeout=None):
+        # remove_video_metadata 的异步版本 (FfmpegAsyncExecutor 执行); 失败或超时返回 None
+        temp_file = self._compute_remove_metadata_temp_file(input_file, output_file)
+        result = await self.cls_ffmpeg_executor.run(self._build_remove_metadata_cmd(input_file, temp_file), job_id=input_file, timeout=timeout)
+        if not result['ok']:
+            return None
+
+        if output_file is None:
+            os.remove(input_file)
+            shutil.move(temp_file, input_file)
+        return output_file if output_file is not None else input_file
+
+    def _compute_remove_metadata_temp_file(self, input_file, output_file):
         if output_file is None:
             input_file_name = Path(input_file).name
             dir_of_file = Path(input_file).resolve().parent
-            temp_file = str(dir_of_file / f'tempxxxxx_file_{input_file_name}')
-        else:
-            temp_file = copy.deepcopy(output_file)
+            return str(dir_of_file / f'tempxxxxx_file_{input_file_name}')
+        return copy.deepcopy(output_file)
 
-        command = [
+    def _build_remove_metadata_cmd(self, input_file, output_file) -> list:
+        return [
             'ffmpeg',
             '-i', input_file,
             '-map_metadata', '-1',  # 删除所有元数据
             '-c:v', 'copy',         # 复制视频流，不重新编码
             '-c:a', 'copy',         # 复制音频流，不重新编码
-            temp_file
+            output_file
         ]
-        subprocess.run(command, check=True)
-
-        if output_file is None:
-            os.remove(input_file)
-            shutil.move(temp_file, input_file)
-        return output_file if output_file is not None else input_file
     
-    def get_videos_paths_in_dir(self, folder_path):
+    def create_video_job(self, input_path, ffmpeg_path='ffmpeg') -> VideoJob:
+        # 视频处理任务: 裁剪/缩放/截取/删除元数据/替换音频 一次 ffmpeg 调用完成, 可以同时输出多个尺寸
+        return VideoJob(input_path, ffmpeg_path=ffmpeg_path)
+
+    def run_video_jobs(self, video_jobs, timeout=None) -> list:
+        """
+        并发执行多个 VideoJob (FfmpegAsyncExecutor, 同时运行的进程数受 max_concurrency 限制)
+
+        返回:
+            list: 每个任务是否成功 (顺序与 video_jobs 一致)
+        """
+        jobs = [
+            {'cmd': job.build_command(), 'job_id': job.input_path, 'timeout': timeout,
+             'duration_ms': self._compute_job_duration_ms(job)}
+            for job in video_jobs
+        ]
+        return [result['ok'] for result in self.cls_ffmpeg_executor.run_batch(jobs)]
+
+    def _compute_job_duration_ms(self, video_job):
+        # VideoJob 的输出时长 (截取的长度或原视频时长), 用于进度百分比
+        if video_job.trim_range is not None:
+            return video_job.trim_range[1] - video_job.trim_range[0]
+        return self._probe_duration_ms(video_job.input_path)
+
+    def get_videos_paths_in_dir(self, folder_path, verify=True):
         '''
-        获取指定目录下的所有图片路径
-        :param dir_path: 图片所在的目录
+        获取指定目录下的所有视频路径 (按后缀筛选, 已排序; 目录扫描结果按目录 mtime 缓存)
+        :param dir_path: 视频所在的目录
+        :param verify: True 时再用 ffprobe 确认每个文件包含视频流, 排除损坏的文件 (元数据有缓存, 文件未改变时不重复调用 ffprobe);
+                       False 只按后缀筛选
         :return: list
         '''
-        # 检查文件夹是否存在且是一个目录
-        if not os.path.exists(folder_path) or not os.path.isdir(folder_path):
-            raise FileNotFoundError("The specified folder does not exist.")
-        
-        video_paths = []
-        
-        # 遍历文件夹中的每一个文件和子目录
-        for filename in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, filename)
-            
-            # 确保处理的是文件而不是子目录
-            if os.path.isfile(file_path):
-                
-                # 检查是否是视频
-                if self.is_video_file(file_path):
-                    video_paths.append(file_path)
-        
-        # 对路径列表进行排序
-        video_paths.sort()
-        
+        video_paths = self.cls_dir_scan.list_paths(folder_path, kinds=('video', ))
+        if verify:
+            video_paths = [video_path for video_path in video_paths if self.is_video_file(video_path)]
         return video_paths
     
     def is_video_file(self, file_path):
@@ -92,40 +129,12 @@ def is_video_file(self, file_path):
         if not file_path.is_file():
             return False
         
-        VIDEO_EXTENSIONS = {
-            '.mp4','.mov','.avi','.mkv','.flv','.wmv','.webm','.mpg','.mpeg','.m4v'
-        }
-        
         ext = os.path.splitext(file_path)[1].lower()
-        if ext not in VIDEO_EXTENSIONS:
+        if ext not in DirScanHandle.VIDEO_EXTENSIONS:
             return False
         
-        # 使用ffprobe(FFmpeg的一部分)来检测文件是否是视频
-        try:
-            cmd = [
-                'ffprobe',
-                '-v', 'error',
-                '-select_streams', 'v:0',
-                '-show_entries', 'stream=codec_type',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(file_path)
-            ]
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            
-            # 如果输出中包含'video'，则认为是视频文件
-            return result.stdout.strip() == 'video'
-            
-        except subprocess.CalledProcessError:
-            # ffprobe执行失败，可能不是视频文件
-            return False
-        except FileNotFoundError:
-            raise Exception("ffprobe not found. Please ensure FFmpeg is installed and in your PATH.")
+        # 使用ffprobe(FFmpeg的一部分)来检测文件是否是视频 (元数据有缓存)
+        return self.cls_media_probe.first_stream(str(file_path), 'video') is not None
 
     def get_video_dimensions(self, video_path):
         """
@@ -143,20 +152,7 @@ def get_video_dimensions(self, video_path):
             return None, None
     
         try:
-            command = [
-                "ffprobe",
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=width,height",
-                "-of", "json",
-                video_path,
-            ]
-            result = subprocess.run(command, capture_output=True, text=True, check=True)
-            info = json.loads(result.stdout)
-            stream = info.get("streams", [{}])[0]
-            width = stream.get("width")
-            height = stream.get("height")
-
+            width, height = self.cls_media_probe.get_dimensions(video_path)
             if width is None or height is None:
                 print("未能解析出 width/height")
                 return None, None
@@ -179,7 +175,7 @@ def compute_output_video_path(self, input_video_path, crop_width_or_start_second
         
     def scale_video(self, input_path, output_path, width=None, height=None, 
                 keep_aspect_ratio=True, scale_algorithm='bicubic', 
-                overwrite=True, ffmpeg_path='ffmpeg'):
+                overwrite=True, ffmpeg_path='ffmpeg', preset='archive'):
         """
         使用FFmpeg缩放视频
         
@@ -195,16 +191,42 @@ def scale_video(self, input_path, output_path, width=None, height=None,
                                     'lanczos', 'spline'
             overwrite (bool): 是否覆盖已存在的输出文件(默认True)
             ffmpeg_path (str): FFmpeg可执行文件路径(默认'ffmpeg')
+            preset (str): 编码预设名称 (EncoderPresets, 默认'archive': libx264 slow crf 18)
         
         返回:
             bool: 操作是否成功
         """
+        cmd = self._build_scale_cmd(input_path, output_path, width, height, keep_aspect_ratio, scale_algorithm, overwrite, ffmpeg_path, preset)
+        
+        try:
+            # 运行FFmpeg命令
+            subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"FFmpeg command failed with error: {e.stderr.decode('utf-8')}")
+            return False
+        except Exception as e:
+            print(f"An error occurred: {str(e)}")
+            return False
+
+    async def scale_video_async(self, input_path, output_path, width=None, height=None, 
+                keep_aspect_ratio=True, scale_algorithm='bicubic', 
+                overwrite=True, ffmpeg_path='ffmpeg', preset='archive', timeout=None) -> bool:
+        # scale_video 的异步版本 (FfmpegAsyncExecutor 执行, 受并发数限制, 报告进度)
+        cmd = self._build_scale_cmd(input_path, output_path, width, height, keep_aspect_ratio, scale_algorithm, overwrite, ffmpeg_path, preset)
+        duration_ms = await asyncio.to_thread(self._probe_duration_ms, input_path)     # ffprobe 阻塞, 不在事件循环中执行
+        result = await self.cls_ffmpeg_executor.run(cmd, job_id=output_path, duration_ms=duration_ms, timeout=timeout)
+        return result['ok']
+
+    def _build_scale_cmd(self, input_path, output_path, width=None, height=None, 
+                keep_aspect_ratio=True, scale_algorithm='bicubic', 
+                overwrite=True, ffmpeg_path='ffmpeg', preset='archive') -> list:
         # 检查FFmpeg是否可用
         if not shutil.which(ffmpeg_path):
             raise FileNotFoundError(f"FFmpeg executable '{ffmpeg_path}' not found")
         
         # 构建基本命令
-        cmd = [ffmpeg_path, '-i', input_path]
+        cmd = [ffmpeg_path] + self.cls_encoder_presets.global_args(preset) + ['-i', input_path]
         
         # 添加覆盖选项
         if overwrite:
@@ -229,64 +251,39 @@ def scale_video(self, input_path, output_path, width=None, height=None,
         else:
             raise ValueError("Either width or height must be specified")
         
-        # 添加缩放算法
+        # 添加缩放算法 (加在 scale 上, 不是 pad)
         if scale_algorithm:
-            scale_filter[-1] += f':flags={scale_algorithm}'
+            scale_filter[0] += f':flags={scale_algorithm}'
         
         # 添加视频过滤器选项
         cmd.extend(['-vf', ','.join(scale_filter)])
         
         # 保持原始编码质量
         cmd.extend(['-c:a', 'copy'])  # 保持音频不变
-        cmd.extend(['-c:v', 'libx264', '-preset', 'slow', '-crf', '18'])  # 高质量H.264编码
+        cmd.extend(self.cls_encoder_presets.video_args(preset))  # 编码预设 (默认高质量H.264编码)
         
         # 添加输出路径
         cmd.append(output_path)
-        
+        return cmd
+
+    def _probe_duration_ms(self, media_path):
+        # 时长 (毫秒, 元数据缓存), 用于异步任务的进度百分比; 失败返回 None
         try:
-            # 运行FFmpeg命令
-            subprocess.run(cmd, check=True, stderr=subprocess.PIPE, stdout=subprocess.PIPE)
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"FFmpeg command failed with error: {e.stderr.decode('utf-8')}")
-            return False
-        except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            return False
+            return self.cls_media_probe.get_duration_ms(media_path)
+        except Exception:
+            return None
         
-    def crop_video(self, input_video_path, crop_width, crop_height, start_x = None, start_y = None, output_video_path = None):
-        # 裁剪视频
+    def crop_video(self, input_video_path, crop_width, crop_height, start_x = None, start_y = None, output_video_path = None, preset=None):
+        # 裁剪视频; preset: 编码预设名称 (EncoderPresets), None 使用默认预设
         output_video = self.compute_output_video_path(input_video_path, crop_width, crop_height, output_video_path)
 
         try:
             # with VideoFileClip(mp4_path) as video:
             #     # 获取原始视频的尺寸
             #     original_width, original_height = video.size
-            original_width, original_height = self.get_video_dimensions(input_video_path)     # 获取原始视频的尺寸
-            if original_width is None or original_height is None:
-                print('ErrorCompute video original size(width, height):', original_width, original_height)
-                return
-            if original_width >= crop_width and original_height >= crop_height:
-                # 计算裁剪区域的左上角坐标，使其居中
-                offset_x = (original_width - crop_width) // 2
-                offset_y = (original_height - crop_height) // 2
-                # 制定开始裁剪位置
-                if start_x is not None and start_y is not None:
-                    offset_x = start_x
-                    offset_y = start_y
-                # x2 = x1 + crop_width
-                # y2 = y1 + crop_height
-
-                ffmpeg_command = [
-                    "ffmpeg",
-                    "-y", "-i", input_video_path,
-                    "-vf", f"crop={crop_width}:{crop_height}:{offset_x}:{offset_y}",
-                    output_video
-                ]
-
+            ffmpeg_command = self._build_crop_cmd(input_video_path, crop_width, crop_height, start_x, start_y, output_video, preset)
+            if ffmpeg_command is not None:
                 subprocess.run(ffmpeg_command, check=True)
-            else:
-                print(f'Error_CropSize invalid width_height(source_mp4_width_height:[{original_width}, {original_height}], target_width_height:[{crop_width}, {crop_height}])......')
 
         except FileNotFoundError:
             print(f"crop_video.错误: 文件 {input_video_path} 未找到。")
@@ -296,6 +293,42 @@ def crop_video(self, input_video_path, crop_width, crop_height, start_x = None,
             print(f"crop_video.发生错误: {e}")
         finally:
             return output_video
+
+    async def crop_video_async(self, input_video_path, crop_width, crop_height, start_x = None, start_y = None, output_video_path = None, preset=None, timeout=None):
+        # crop_video 的异步版本 (FfmpegAsyncExecutor 执行); 失败返回 None
+        output_video = self.compute_output_video_path(input_video_path, crop_width, crop_height, output_video_path)
+        # 获取原始尺寸和时长都要调用 ffprobe (阻塞), 在线程中执行
+        ffmpeg_command = await asyncio.to_thread(self._build_crop_cmd, input_video_path, crop_width, crop_height, start_x, start_y, output_video, preset)
+        if ffmpeg_command is None:
+            return None
+        duration_ms = await asyncio.to_thread(self._probe_duration_ms, input_video_path)
+        result = await self.cls_ffmpeg_executor.run(ffmpeg_command, job_id=output_video, duration_ms=duration_ms, timeout=timeout)
+        return output_video if result['ok'] else None
+
+    def _build_crop_cmd(self, input_video_path, crop_width, crop_height, start_x, start_y, output_video, preset=None) -> list | None:
+        # 裁剪命令; 原始尺寸无法获取或小于裁剪尺寸时返回 None
+        original_width, original_height = self.get_video_dimensions(input_video_path)     # 获取原始视频的尺寸
+        if original_width is None or original_height is None:
+            print('ErrorCompute video original size(width, height):', original_width, original_height)
+            return None
+        if original_width < crop_width or original_height < crop_height:
+            print(f'Error_CropSize invalid width_height(source_mp4_width_height:[{original_width}, {original_height}], target_width_height:[{crop_width}, {crop_height}])......')
+            return None
+        # 计算裁剪区域的左上角坐标，使其居中
+        offset_x = (original_width - crop_width) // 2
+        offset_y = (original_height - crop_height) // 2
+        # 制定开始裁剪位置
+        if start_x is not None and start_y is not None:
+            offset_x = start_x
+            offset_y = start_y
+
+        return [
+            "ffmpeg", *self.cls_encoder_presets.global_args(preset),
+            "-y", "-i", input_video_path,
+            "-vf", f"crop={crop_width}:{crop_height}:{offset_x}:{offset_y}",
+            *self.cls_encoder_presets.video_args(preset),
+            output_video
+        ]
         
     def extract_last_frame(self, video_path, output_image_path):
         """
@@ -307,15 +340,7 @@ def extract_last_frame(self, video_path, output_image_path):
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"视频文件不存在: {video_path}")
 
-        # ffmpeg 命令：先查视频时长，再取最后一帧
-        cmd = [
-            "ffmpeg",
-            "-sseof", "-1",          # 从倒数第1秒开始读取
-            "-i", video_path,        # 输入文件
-            "-vframes", "1",         # 只截取1帧
-            output_image_path,       # 输出图片路径
-            "-y"                     # 覆盖输出
-        ]
+        cmd = self._build_extract_last_frame_cmd(video_path, output_image_path)
 
         try:
             subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -325,6 +350,25 @@ def extract_last_frame(self, video_path, output_image_path):
             # raise RuntimeError(f"ffmpeg 运行失败: {e}")
             print(f"ffmpeg 运行失败: {e}")
             return False
+
+    async def extract_last_frame_async(self, video_path, output_image_path, timeout=None) -> bool:
+        # extract_last_frame 的异步版本 (FfmpegAsyncExecutor 执行)
+        if not os.path.exists(video_path):
+            raise FileNotFoundError(f"视频文件不存在: {video_path}")
+        cmd = self._build_extract_last_frame_cmd(video_path, output_image_path)
+        result = await self.cls_ffmpeg_executor.run(cmd, job_id=output_image_path, timeout=timeout)
+        return result['ok']
+
+    def _build_extract_last_frame_cmd(self, video_path, output_image_path) -> list:
+        # ffmpeg 命令：从倒数第1秒开始读取，取1帧
+        return [
+            "ffmpeg",
+            "-sseof", "-1",          # 从倒数第1秒开始读取
+            "-i", video_path,        # 输入文件
+            "-vframes", "1",         # 只截取1帧
+            "-y",                    # 覆盖输出
+            output_image_path,       # 输出图片路径
+        ]
         
     def extract_first_frame(self, video_path, output_image_path):
         """
@@ -344,15 +388,7 @@ def extract_first_frame(self, video_path, output_image_path):
         # 确保输出目录存在
         os.makedirs(os.path.dirname(output_image_path), exist_ok=True)
 
-        # ffmpeg 命令：提取第一帧
-        command = [
-            "ffmpeg",
-            "-y",                  # 覆盖输出文件
-            "-i", video_path,
-            "-frames:v", "1",      # 只提取一帧
-            "-q:v", "2",           # 输出质量（对 JPEG 有效，1 是最好，31 是最差）
-            output_image_path
-        ]
+        command = self._build_extract_first_frame_cmd(video_path, output_image_path)
 
         try:
             subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -361,6 +397,27 @@ def extract_first_frame(self, video_path, output_image_path):
         except subprocess.CalledProcessError as e:
             print(f"提取第一帧失败: {e.stderr.decode().strip()}")
             return False
+
+    async def extract_first_frame_async(self, video_path, output_image_path, timeout=None) -> bool:
+        # extract_first_frame 的异步版本 (FfmpegAsyncExecutor 执行)
+        if not os.path.isfile(video_path):
+            print(f"错误：视频文件不存在 -> {video_path}")
+            return False
+        os.makedirs(os.path.dirname(output_image_path), exist_ok=True)
+        command = self._build_extract_first_frame_cmd(video_path, output_image_path)
+        result = await self.cls_ffmpeg_executor.run(command, job_id=output_image_path, timeout=timeout)
+        return result['ok']
+
+    def _build_extract_first_frame_cmd(self, video_path, output_image_path) -> list:
+        # ffmpeg 命令：提取第一帧
+        return [
+            "ffmpeg",
+            "-y",                  # 覆盖输出文件
+            "-i", video_path,
+            "-frames:v", "1",      # 只提取一帧
+            "-q:v", "2",           # 输出质量（对 JPEG 有效，1 是最好，31 是最差）
+            output_image_path
+        ]
         
     def concat_videos_in_folder(self, folder_path, output_path, video_extensions=('.mp4', '.mov', '.mkv')):
         """
@@ -370,7 +427,30 @@ def concat_videos_in_folder(self, folder_path, output_path, video_extensions=('.
         :param output_path: 输出拼接后的视频文件路径（如 output.mp4）
         :param video_extensions: 要拼接的视频扩展名元组，默认包含常见格式
         """
-        # 获取视频文件（排序以确保顺序一致）
+        list_file_path = self._make_concat_list_file(folder_path, video_extensions)
+        cmd = self._build_concat_cmd(list_file_path, output_path)
+
+        try:
+            subprocess.run(cmd, check=True)
+            print(f"成功拼接视频到: {output_path}")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg 拼接失败: {e}")
+        finally:
+            os.remove(list_file_path)
+
+    async def concat_videos_in_folder_async(self, folder_path, output_path, video_extensions=('.mp4', '.mov', '.mkv'), timeout=None):
+        # concat_videos_in_folder 的异步版本 (FfmpegAsyncExecutor 执行); 失败时同样抛出 RuntimeError
+        list_file_path = self._make_concat_list_file(folder_path, video_extensions)
+        try:
+            result = await self.cls_ffmpeg_executor.run(self._build_concat_cmd(list_file_path, output_path), job_id=output_path, timeout=timeout)
+        finally:
+            os.remove(list_file_path)
+        if not result['ok']:
+            raise RuntimeError(f"ffmpeg 拼接失败: {'超时' if result['timed_out'] else result['stderr'][-1000:]}")
+        print(f"成功拼接视频到: {output_path}")
+
+    def _make_concat_list_file(self, folder_path, video_extensions) -> str:
+        # 获取视频文件（排序以确保顺序一致）, 写入 ffmpeg 需要的 concat list 文件, 返回文件路径 (使用后删除)
         video_files = sorted([
             os.path.join(folder_path, f)
             for f in os.listdir(folder_path)
@@ -380,33 +460,25 @@ def concat_videos_in_folder(self, folder_path, output_path, video_extensions=('.
         if not video_files:
             raise ValueError("文件夹中未找到可拼接的视频文件")
 
-        # 创建 ffmpeg 需要的 concat list 文件
         with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=".txt") as list_file:
             for path in video_files:
                 # ffmpeg concat 要求使用 file '路径'
                 list_file.write(f"file '{os.path.abspath(path)}'\n")
-            list_file_path = list_file.name
+            return list_file.name
 
+    def _build_concat_cmd(self, list_file_path, output_path) -> list:
         # 使用 ffmpeg concat 模式拼接
-        cmd = [
+        return [
             "ffmpeg",
             "-f", "concat",
             "-safe", "0",
             "-i", list_file_path,
             "-c", "copy",
-            output_path,
-            "-y"  # 覆盖输出文件
+            "-y",  # 覆盖输出文件
+            output_path
         ]
 
-        try:
-            subprocess.run(cmd, check=True)
-            print(f"成功拼接视频到: {output_path}")
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"ffmpeg 拼接失败: {e}")
-        finally:
-            os.remove(list_file_path)
-
-    def resize_video(self, input_path, output_path, target_width, target_height):
+    def resize_video(self, input_path, output_path, target_width, target_height, preset=None):
         """
         使用 ffmpeg 缩放视频为指定尺寸，保持比例并居中裁剪（不会变形）
 
@@ -415,29 +487,41 @@ def resize_video(self, input_path, output_path, target_width, target_height):
             output_path (str): 输出视频路径
             target_width (int): 目标宽度（如 1080）
             target_height (int): 目标高度（如 720）
+            preset (str): 编码预设名称 (EncoderPresets), None 使用默认预设
         """
+        command = self._build_resize_cmd(input_path, output_path, target_width, target_height, preset)
+
+        try:
+            subprocess.run(command, check=True)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ 视频处理失败: {e}")
+            return False
+
+    async def resize_video_async(self, input_path, output_path, target_width, target_height, preset=None, timeout=None) -> bool:
+        # resize_video 的异步版本 (FfmpegAsyncExecutor 执行)
+        command = self._build_resize_cmd(input_path, output_path, target_width, target_height, preset)
+        duration_ms = await asyncio.to_thread(self._probe_duration_ms, input_path)     # ffprobe 阻塞, 不在事件循环中执行
+        result = await self.cls_ffmpeg_executor.run(command, job_id=output_path, duration_ms=duration_ms, timeout=timeout)
+        return result['ok']
+
+    def _build_resize_cmd(self, input_path, output_path, target_width, target_height, preset=None) -> list:
         filter_str = (
             f"scale='if(gt(a,{target_width}/{target_height}),{target_height}*a,{target_width})':"
             f"'if(gt(a,{target_width}/{target_height}),{target_height},{target_width}/a)',"
             f"crop={target_width}:{target_height}"
         )
 
-        command = [
-            'ffmpeg', '-y',
+        return [
+            'ffmpeg', *self.cls_encoder_presets.global_args(preset), '-y',
             '-i', input_path,
             '-vf', filter_str,
             '-c:a', 'copy',
+            *self.cls_encoder_presets.video_args(preset),
             output_path
         ]
 
-        try:
-            subprocess.run(command, check=True)
-            return True
-        except subprocess.CalledProcessError as e:
-            print(f"❌ 视频处理失败: {e}")
-            return False
-
-    def trim_media_by_ms(self, input_path, output_path, start_ms, end_ms):
+    def trim_media_by_ms(self, input_path, output_path, start_ms, end_ms, mode='copy', preset='archive'):
         """
         使用 ffmpeg 截取视频或音频片段（单位：毫秒）
 
@@ -446,6 +530,10 @@ def trim_media_by_ms(self, input_path, output_path, start_ms, end_ms):
             output_path (str): 输出文件路径
             start_ms (int): 开始时间（毫秒）
             end_ms (int): 结束时间（毫秒）
+            mode (str): 'copy' 不重新编码（快，开始位置对齐到关键帧，误差最多一个 GOP）
+                        'accurate' 全部重新编码（精确到帧，慢）
+                        'smart' 只重新编码开头和结尾不完整的 GOP，中间直接复制后拼接（精确到帧，接近复制的速度）
+            preset (str): 重新编码使用的编码预设 (EncoderPresets)
 
         返回：
             bool: 是否成功截取
@@ -458,6 +546,67 @@ def trim_media_by_ms(self, input_path, output_path, start_ms, end_ms):
             print("错误：开始时间和结束时间无效")
             return False
 
+        tmp_dir = self._make_trim_tmp_dir(output_path, mode)
+        try:
+            for cmd in self._build_trim_cmds(input_path, output_path, start_ms, end_ms, mode, preset, tmp_dir):
+                subprocess.run(cmd, check=True)
+            return True
+        except subprocess.CalledProcessError as e:
+            print("ffmpeg 执行失败:", e)
+            return False
+        finally:
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    async def trim_media_by_ms_async(self, input_path, output_path, start_ms, end_ms, mode='copy', preset='archive', timeout=None) -> bool:
+        # trim_media_by_ms 的异步版本 (FfmpegAsyncExecutor 执行; smart 模式的各段依次执行)
+        if not os.path.isfile(input_path):
+            print("错误：找不到输入文件")
+            return False
+
+        if start_ms < 0 or end_ms <= start_ms:
+            print("错误：开始时间和结束时间无效")
+            return False
+
+        tmp_dir = self._make_trim_tmp_dir(output_path, mode)
+        try:
+            # smart 模式要用 ffprobe 读取关键帧 (阻塞), 在线程中执行
+            cmds = await asyncio.to_thread(self._build_trim_cmds, input_path, output_path, start_ms, end_ms, mode, preset, tmp_dir)
+            duration_ms = end_ms - start_ms if len(cmds) == 1 else None
+            for cmd in cmds:
+                result = await self.cls_ffmpeg_executor.run(cmd, job_id=output_path, duration_ms=duration_ms, timeout=timeout)
+                if not result['ok']:
+                    return False
+            return True
+        finally:
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _make_trim_tmp_dir(self, output_path, mode):
+        # smart 模式的分段文件夹, 放在输出文件夹 (与输出同一磁盘), 完成后删除; 其它模式不需要
+        if mode != 'smart':
+            return None
+        return tempfile.mkdtemp(prefix='tmp_trim_', dir=os.path.dirname(os.path.abspath(output_path)))
+
+    def _build_trim_cmds(self, input_path, output_path, start_ms, end_ms, mode, preset, tmp_dir) -> list:
+        # 截取命令 (依次执行); smart 模式在 tmp_dir 中生成分段文件和拼接列表
+        if mode == 'copy':
+            return [self._build_trim_cmd(input_path, output_path, start_ms, end_ms)]
+        if mode == 'accurate':
+            return [self._build_accurate_trim_cmd(input_path, output_path, start_ms, end_ms, preset)]
+        if mode != 'smart':
+            raise ValueError(f"mode must be 'copy', 'accurate' or 'smart' ({mode})")
+
+        plan = self.compute_smart_trim_plan(input_path, start_ms, end_ms)
+        if plan is None:
+            # 没有视频流: 音频每个包都可以独立解码, 直接复制
+            return [self._build_trim_cmd(input_path, output_path, start_ms, end_ms)]
+        if plan['middle'] is None:
+            # 范围内没有完整的 GOP (或编码不支持), 全部重新编码
+            return [self._build_accurate_trim_cmd(input_path, output_path, start_ms, end_ms, preset)]
+        return self._build_smart_trim_cmds(input_path, output_path, plan, preset, tmp_dir)
+
+    def _build_trim_cmd(self, input_path, output_path, start_ms, end_ms) -> list:
         # 计算持续时间（毫秒）
         duration_ms = end_ms - start_ms
 
@@ -465,21 +614,202 @@ def trim_media_by_ms(self, input_path, output_path, start_ms, end_ms):
         start_sec = start_ms / 1000.0
         duration_sec = duration_ms / 1000.0
 
+        return [
+            "ffmpeg",
+            "-y",  # 自动覆盖输出文件
+            "-ss", f"{start_sec:.3f}",
+            "-i", input_path,
+            "-t", f"{duration_sec:.3f}",
+            "-c", "copy",  # 不重新编码，快速截取
+            output_path
+        ]
+
+    def _build_accurate_trim_cmd(self, input_path, output_path, start_ms, end_ms, preset='archive') -> list:
+        # 重新编码截取 (输入 -ss 解码后精确定位到帧)
+        cmd = ["ffmpeg", *self.cls_encoder_presets.global_args(preset), "-y",
+               "-ss", f"{start_ms / 1000.0:.3f}", "-i", input_path, "-t", f"{(end_ms - start_ms) / 1000.0:.3f}"]
+        if self.cls_media_probe.first_stream(input_path, 'video') is not None:
+            cmd += self.cls_encoder_presets.video_args(preset)
+        if self.cls_media_probe.first_stream(input_path, 'audio') is not None:
+            cmd += ["-c:a", "aac"]
+        return cmd + [output_path]
+
+    def get_keyframe_times(self, video_path) -> list:
+        """
+        视频关键帧时间 (秒, 已排序); 读取 ffprobe 包信息 (flags 含 K), 不解码; 结果保存在元数据缓存中
+
+        返回:
+            list: 关键帧时间; 失败返回 []
+        """
+        return [pts_time for pts_time, _ in self.get_keyframe_packets(video_path)]
+
+    def get_keyframe_packets(self, video_path) -> list:
+        """
+        视频关键帧的时间和包序号 (第一个视频流中按解码顺序的序号, 从 0 开始), 按时间排序; 结果保存在元数据缓存中
+        包序号用于按包截取 (复制时 -frames:v 按包计数), 不受时间精度影响
+
+        返回:
+            list: [(关键帧时间 秒, 包序号), ...]; 失败返回 []
+        """
+        keyframes = self.cls_media_probe.get_extra(video_path, 'keyframe_packets')
+        if keyframes is not None:
+            return [tuple(keyframe) for keyframe in keyframes]
+
+        command = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=print_section=0",
+            video_path
+        ]
         try:
-            cmd = [
-                "ffmpeg",
-                "-y",  # 自动覆盖输出文件
-                "-ss", f"{start_sec:.3f}",
-                "-i", input_path,
-                "-t", f"{duration_sec:.3f}",
-                "-c", "copy",  # 不重新编码，快速截取
-                output_path
-            ]
-            subprocess.run(cmd, check=True)
-            return True
+            result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
         except subprocess.CalledProcessError as e:
-            print("ffmpeg 执行失败:", e)
-            return False
+            print("ffprobe 执行出错:", e.stderr)
+            return []
+
+        keyframes = []
+        for packet_index, line in enumerate(result.stdout.splitlines()):
+            pts_time, _, flags = line.partition(',')
+            if 'K' in flags and pts_time not in ('', 'N/A'):
+                keyframes.append((float(pts_time), packet_index))
+        keyframes.sort()
+        self.cls_media_probe.set_extra(video_path, 'keyframe_packets', keyframes)
+        return keyframes
+
+    def compute_smart_trim_plan(self, input_path, start_ms, end_ms) -> dict | None:
+        """
+        计算 smart 截取的分段: 开头 [start, 第一个关键帧) 和结尾 [最后一个关键帧, end) 重新编码, 中间直接复制
+
+        返回:
+            dict: {'head', 'middle', 'tail'} 每段为 (开始秒, 结束秒) 或 None, 'stream': 视频流信息;
+                  middle 为 None 表示不能复制 (范围内不足两个关键帧, 或编码不支持);
+                  'middle_packets': 中间部分复制的包数 (从第一个关键帧的包到最后一个关键帧的包之前);
+                  没有视频流返回 None
+        """
+        stream = self.cls_media_probe.first_stream(input_path, 'video')
+        if stream is None:
+            return None
+        start_sec, end_sec = start_ms / 1000.0, end_ms / 1000.0
+        plan = {'head': None, 'middle': None, 'tail': None, 'stream': stream}
+        if stream.get('codec_name') not in self.SMART_TRIM_ENCODERS:
+            return plan
+
+        keyframes = [(t, index) for t, index in self.get_keyframe_packets(input_path) if start_sec <= t <= end_sec]
+        if len(keyframes) < 2:
+            return plan
+        (first_key, first_index), (last_key, last_index) = keyframes[0], keyframes[-1]
+        plan['head'] = (start_sec, first_key) if first_key - start_sec > 0.0005 else None
+        plan['middle'] = (first_key, last_key)
+        plan['middle_packets'] = last_index - first_index
+        plan['tail'] = (last_key, end_sec) if end_sec - last_key > 0.0005 else None
+        return plan
+
+    def _compute_smart_trim_video_args(self, stream, preset) -> list:
+        # 开头/结尾重新编码的参数: 与原视频相同的编码器/像素格式/profile/时间基, 拼接后可以直接复制
+        encoder = self.SMART_TRIM_ENCODERS[stream['codec_name']]
+        overrides = {'codec': encoder, 'pix_fmt': stream.get('pix_fmt'), 'movflags': None, 'profile': None}
+        if encoder == 'libx264':
+            profile = str(stream.get('profile', '')).lower().replace('constrained ', '')
+            overrides['profile'] = profile if profile in ('baseline', 'main', 'high') else None
+        else:
+            overrides['x264_params'] = None
+        return self.cls_encoder_presets.video_args(preset, **overrides)
+
+    def _compute_half_frame(self, stream) -> float:
+        # 半帧时长 (秒), 作为分段边界的余量: 时间参数只有微秒精度, 关键帧时间 (如 250/24 秒) 取整后可能早于或晚于真实时间
+        for key in ('avg_frame_rate', 'r_frame_rate'):
+            num, _, den = str(stream.get(key, '')).partition('/')
+            try:
+                fps = float(num) / float(den or 1)
+            except (ValueError, ZeroDivisionError):
+                continue
+            if fps > 0:
+                return 0.5 / fps
+        return 0.0005
+
+    def _build_smart_trim_middle_cmd(self, input_path, plan, middle_path, container_args) -> list:
+        """
+        中间部分直接复制: 输入 -ss 定位到第一个关键帧 (加半帧余量, 复制时定位到之前最近的关键帧, 即第一个关键帧),
+        -frames:v 按包数截取到最后一个关键帧的包之前; 只读取中间部分, 不复制整个文件
+        不能用 -t 按时间截取: 有 B 帧时会多出结尾关键帧之后显示时间较早的包, 拼接处帧重复/跳帧
+        """
+        first_key, _ = plan['middle']
+        half_frame = self._compute_half_frame(plan['stream'])
+        return [
+            "ffmpeg", "-y",
+            "-ss", f"{first_key + half_frame:.6f}", "-i", input_path,
+            "-map", "0:v:0", "-an", "-sn", "-dn",
+            "-c:v", "copy", "-frames:v", str(plan['middle_packets']),
+            "-avoid_negative_ts", "make_zero",
+            *container_args,
+            middle_path
+        ]
+
+    def _build_smart_trim_cmds(self, input_path, output_path, plan, preset, tmp_dir) -> list:
+        suffix = Path(output_path).suffix or '.mp4'
+        is_mp4 = suffix.lower() in ('.mp4', '.mov', '.m4v')
+        stream = plan['stream']
+        container_args = []
+        time_base = str(stream.get('time_base', ''))
+        if is_mp4 and time_base.startswith('1/'):
+            container_args = ['-video_track_timescale', time_base[2:]]    # 与原视频相同的时间基
+        encode_args = self._compute_smart_trim_video_args(stream, preset)
+        half_frame = self._compute_half_frame(stream)
+        # 开头/结尾保留原时间戳 (开始时间不在帧的整数倍上时, 按帧率取整的时间戳会使 -t 多截掉一帧)
+        timestamp_args = ['-fps_mode', 'passthrough', '-enc_time_base', time_base if time_base.startswith('1/') else '1/90000']
+
+        cmds, segment_paths = [], []
+        for name in ('head', 'middle', 'tail'):
+            if plan[name] is None:
+                continue
+            seg_start, seg_end = plan[name]
+            segment_path = os.path.join(tmp_dir, f'{name}{suffix}')
+            segment_paths.append(segment_path)
+            if name == 'middle':
+                cmds.append(self._build_smart_trim_middle_cmd(input_path, plan, segment_path, container_args))
+                continue
+            # 与关键帧相邻的边界留半帧余量: 开头不包含第一个关键帧, 结尾包含最后一个关键帧
+            if name == 'head':
+                seg_end -= half_frame
+            else:
+                seg_start -= half_frame
+            cmds.append([
+                "ffmpeg", "-y",
+                "-ss", f"{seg_start:.6f}", "-i", input_path, "-t", f"{seg_end - seg_start:.6f}",
+                "-map", "0:v:0", "-an", "-sn", "-dn",
+                *timestamp_args, *encode_args, *container_args,
+                segment_path
+            ])
+
+        # 音频单独截取 (解码后精确定位, 重新编码), 拼接时与视频合并
+        start_sec = plan['head'][0] if plan['head'] is not None else plan['middle'][0]
+        end_sec = plan['tail'][1] if plan['tail'] is not None else plan['middle'][1]
+        audio_path = None
+        if self.cls_media_probe.first_stream(input_path, 'audio') is not None:
+            audio_path = os.path.join(tmp_dir, 'audio.m4a')
+            cmds.append([
+                "ffmpeg", "-y",
+                "-ss", f"{start_sec:.6f}", "-i", input_path, "-t", f"{end_sec - start_sec:.6f}",
+                "-map", "0:a:0", "-vn", "-c:a", "aac",
+                audio_path
+            ])
+
+        # ffmpeg concat 要求使用 file '路径'
+        list_file_path = os.path.join(tmp_dir, 'concat.txt')
+        with open(list_file_path, 'w', encoding='utf-8') as list_file:
+            for segment_path in segment_paths:
+                list_file.write(f"file '{os.path.abspath(segment_path)}'\n")
+
+        concat_cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_file_path]
+        if audio_path is not None:
+            concat_cmd += ["-i", audio_path, "-map", "0:v:0", "-map", "1:a:0"]
+        concat_cmd += ["-c", "copy"]
+        if is_mp4:
+            concat_cmd += ["-movflags", "+faststart"]
+        cmds.append(concat_cmd + [output_path])
+        return cmds
         
     def split_video_to_frames(self, video_path, output_dir, image_format='png', fps=None):
         """
@@ -497,24 +827,97 @@ def split_video_to_frames(self, video_path, output_dir, image_format='png', fps=
             return False
         
         os.makedirs(output_dir, exist_ok=True)
+        cmd = self._build_split_frames_cmd(video_path, output_dir, image_format, fps)
+
+        try:
+            subprocess.run(cmd, check=True)
+            print(f"视频帧已保存到：{output_dir}")
+            return True
+        except subprocess.CalledProcessError as e:
+            print("ffmpeg 执行失败:", e)
+            return False
+
+    async def split_video_to_frames_async(self, video_path, output_dir, image_format='png', fps=None, timeout=None) -> bool:
+        # split_video_to_frames 的异步版本 (FfmpegAsyncExecutor 执行, 报告进度)
+        if not os.path.isfile(video_path):
+            print(f"视频文件不存在: {video_path}")
+            return False
+        os.makedirs(output_dir, exist_ok=True)
+        cmd = self._build_split_frames_cmd(video_path, output_dir, image_format, fps)
+        duration_ms = await asyncio.to_thread(self._probe_duration_ms, video_path)     # ffprobe 阻塞, 不在事件循环中执行
+        result = await self.cls_ffmpeg_executor.run(cmd, job_id=output_dir, duration_ms=duration_ms, timeout=timeout)
+        return result['ok']
 
+    def _build_split_frames_cmd(self, video_path, output_dir, image_format='png', fps=None) -> list:
         output_pattern = os.path.join(output_dir, f"frame_%05d.{image_format}")
         cmd = ["ffmpeg", "-i", video_path]
 
         if fps:
             cmd += ["-vf", f"fps={fps}"]
 
-        cmd += [output_pattern]
+        return cmd + [output_pattern]
+
+    def iter_frames(self, video_path, fps=None, size=None, start_ms=None, end_ms=None, copy=False):
+        """
+        逐帧读取视频 (生成器, ffmpeg 管道输出 bgr24, 不写临时图片, 内存占用固定为一帧)
+
+        参数:
+            fps: 输出帧率, None 使用原视频帧率
+            size: 输出尺寸 (width, height), None 使用原视频尺寸
+            start_ms, end_ms: 读取的时间范围 (毫秒), None 不限制
+            copy: False 每次返回同一个缓冲区 (下一帧时被覆盖), 需要保留帧时设为 True
 
+        返回:
+            generator: np.ndarray (height, width, 3) BGR 帧
+        """
+        reader = VideoFrameReader(video_path, fps=fps, size=size, start_ms=start_ms, end_ms=end_ms, copy=copy, cls_media_probe=self.cls_media_probe)
         try:
-            subprocess.run(cmd, check=True)
-            print(f"视频帧已保存到：{output_dir}")
-            return True
-        except subprocess.CalledProcessError as e:
-            print("ffmpeg 执行失败:", e)
+            yield from reader
+        finally:
+            reader.close()
+
+    def open_frame_writer(self, output_path, width, height, fps=30, preset=None, audio_path=None) -> VideoFrameWriter:
+        # 视频帧写入 (ndarray 帧通过管道编码, 不写临时图片); 使用 with 或调用 close() 结束
+        return VideoFrameWriter(output_path, width, height, fps=fps, preset=preset, audio_path=audio_path).open()
+
+    def map_video_frames(self, video_path, output_path, frame_func, fps=None, size=None, preset=None, keep_audio=True) -> bool:
+        """
+        逐帧处理视频 (代替 split_video_to_frames -> 处理图片 -> images_to_video, 全程在内存中)
+
+        参数:
+            frame_func: frame_func(frame) -> np.ndarray, 返回的帧尺寸需一致 (可以原地修改后返回 frame)
+            fps: 帧率, None 使用原视频帧率
+            size: 读取尺寸 (width, height), None 使用原视频尺寸
+            preset: 编码预设名称 (EncoderPresets)
+            keep_audio: 是否保留原视频的音频
+
+        返回:
+            bool: 是否成功
+        """
+        if not os.path.isfile(video_path):
+            print(f"视频文件不存在: {video_path}")
             return False
+        if fps is None:
+            stream = self.cls_media_probe.first_stream(video_path, 'video') or {}
+            fps = stream.get('avg_frame_rate') or stream.get('r_frame_rate') or 30
+            fps = 30 if fps == '0/0' else fps
 
-    def images_to_video(self, image_dir, output_video_path, fps=30, image_format='png', resolution=None):
+        reader = VideoFrameReader(video_path, fps=fps, size=size, cls_media_probe=self.cls_media_probe)
+        writer = None
+        try:
+            for frame in reader:
+                frame = frame_func(frame)
+                if writer is None:
+                    writer = self.open_frame_writer(output_path, frame.shape[1], frame.shape[0], fps=fps, preset=preset,
+                                                    audio_path=video_path if keep_audio else None)
+                if not writer.write(frame):
+                    break
+        finally:
+            read_ok = reader.close()
+            write_ok = writer.close() if writer is not None else False
+        return read_ok and write_ok
+
+    def images_to_video(self, image_dir, output_video_path, fps=30, image_format='png', resolution=None, preset=None):
         """
         使用 ffmpeg 将指定文件夹中的图片合成为视频。
 
@@ -524,17 +927,38 @@ def images_to_video(self, image_dir, output_video_path, fps=30, image_format='pn
             fps (int): 视频帧率，默认 30。
             image_format (str): 图片格式，例如 'png' 或 'jpg'。
             resolution (tuple): (宽, 高)，可选，强制输出为该分辨率。
+            preset (str): 编码预设名称 (EncoderPresets), None 使用默认预设 (yuv420p 保证兼容性)。
         """
         if not os.path.isdir(image_dir):
             # raise FileNotFoundError(f"图片文件夹不存在: {image_dir}")
             print(f"--- Error --- 图片文件夹不存在: {image_dir}")
             return False
 
+        cmd = self._build_images_to_video_cmd(image_dir, output_video_path, fps, image_format, resolution, preset)
+
+        try:
+            subprocess.run(cmd, check=True)
+            # print(f"视频生成成功: {output_video_path}")
+            return True
+        except subprocess.CalledProcessError as e:
+            print("Error ffmpeg 执行失败:", e)
+            return False
+
+    async def images_to_video_async(self, image_dir, output_video_path, fps=30, image_format='png', resolution=None, preset=None, timeout=None) -> bool:
+        # images_to_video 的异步版本 (FfmpegAsyncExecutor 执行)
+        if not os.path.isdir(image_dir):
+            print(f"--- Error --- 图片文件夹不存在: {image_dir}")
+            return False
+        cmd = self._build_images_to_video_cmd(image_dir, output_video_path, fps, image_format, resolution, preset)
+        result = await self.cls_ffmpeg_executor.run(cmd, job_id=output_video_path, timeout=timeout)
+        return result['ok']
+
+    def _build_images_to_video_cmd(self, image_dir, output_video_path, fps=30, image_format='png', resolution=None, preset=None) -> list:
         # 图片命名必须是连续序号，比如 frame_00001.png、frame_00002.png ...
         input_pattern = os.path.join(image_dir, f"frame_%05d.{image_format}")
         
         cmd = [
-            "ffmpeg", "-y",
+            "ffmpeg", *self.cls_encoder_presets.global_args(preset), "-y",
             "-framerate", str(fps),
             "-i", input_pattern,
         ]
@@ -543,19 +967,8 @@ def images_to_video(self, image_dir, output_video_path, fps=30, image_format='pn
             width, height = resolution
             cmd += ["-vf", f"scale={width}:{height}"]
 
-        cmd += [
-            "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",  # 保证兼容性
-            output_video_path
-        ]
-
-        try:
-            subprocess.run(cmd, check=True)
-            # print(f"视频生成成功: {output_video_path}")
-            return True
-        except subprocess.CalledProcessError as e:
-            print("Error ffmpeg 执行失败:", e)
-            return False
+        cmd += self.cls_encoder_presets.video_args(preset, pix_fmt='yuv420p')  # yuv420p 保证兼容性
+        return cmd + [output_video_path]
 
     def get_media_duration_ms(self, video_path):
         """
@@ -572,23 +985,11 @@ def get_media_duration_ms(self, video_path):
             return None
 
         try:
-            # 使用 ffprobe 获取时长（单位：秒）
-            result = subprocess.run(
-                [
-                    "ffprobe",
-                    "-v", "error",
-                    "-show_entries", "format=duration",
-                    "-of", "json",
-                    video_path
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-
-            info = json.loads(result.stdout)
-            duration_sec = float(info["format"]["duration"])
-            return int(duration_sec * 1000)  # 转换为毫秒
+            # 使用 ffprobe 获取时长 (元数据有缓存)
+            duration_ms = self.cls_media_probe.get_duration_ms(video_path)
+            if duration_ms is None:
+                print("获取视频长度失败：", video_path)
+            return duration_ms
 
         except Exception as e:
             print("获取视频长度失败：", e)
@@ -631,18 +1032,7 @@ def replace_video_audio(self, video_path, audio_path, output_path, ffmpeg_path='
             bool: 操作是否成功
         """
         try:
-            # 构建FFmpeg命令
-            command = [
-                ffmpeg_path,
-                '-y',  # 自动覆盖输出文件
-                '-i', video_path,
-                '-i', audio_path,
-                '-c:v', 'copy',  # 复制视频流，不重新编码
-                '-map', '0:v:0',  # 选择第一个输入的视频流
-                '-map', '1:a:0',  # 选择第二个输入的音频流
-                '-shortest',  # 以最短的输入流为准
-                output_path
-            ]
+            command = self._build_replace_audio_cmd(video_path, audio_path, output_path, ffmpeg_path)
             
             # 运行FFmpeg命令
             subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
@@ -654,6 +1044,27 @@ def replace_video_audio(self, video_path, audio_path, output_path, ffmpeg_path='
         except Exception as e:
             print(f"发生错误: {e}")
             return False
+
+    async def replace_video_audio_async(self, video_path, audio_path, output_path, ffmpeg_path='ffmpeg', timeout=None) -> bool:
+        # replace_video_audio 的异步版本 (FfmpegAsyncExecutor 执行, 报告进度)
+        command = self._build_replace_audio_cmd(video_path, audio_path, output_path, ffmpeg_path)
+        duration_ms = await asyncio.to_thread(self._probe_duration_ms, video_path)     # ffprobe 阻塞, 不在事件循环中执行
+        result = await self.cls_ffmpeg_executor.run(command, job_id=output_path, duration_ms=duration_ms, timeout=timeout)
+        return result['ok']
+
+    def _build_replace_audio_cmd(self, video_path, audio_path, output_path, ffmpeg_path='ffmpeg') -> list:
+        # 构建FFmpeg命令
+        return [
+            ffmpeg_path,
+            '-y',  # 自动覆盖输出文件
+            '-i', video_path,
+            '-i', audio_path,
+            '-c:v', 'copy',  # 复制视频流，不重新编码
+            '-map', '0:v:0',  # 选择第一个输入的视频流
+            '-map', '1:a:0',  # 选择第二个输入的音频流
+            '-shortest',  # 以最短的输入流为准
+            output_path
+        ]
     
     def add_audio_to_video(self, video_path, audio_path, output_path) -> bool:
         """
@@ -675,52 +1086,108 @@ def add_audio_to_video(self, video_path, audio_path, output_path) -> bool:
             return False
 
         try:
-            cmd = [
-                "ffmpeg",
-                "-y",  # 覆盖输出
-                "-i", video_path,
-                "-i", audio_path,
-                "-c:v", "copy",     # 保留视频流
-                "-c:a", "aac",      # 音频编码为 AAC（兼容性好）
-                "-map", "0:v:0",    # 选取第一个视频流
-                "-map", "1:a:0",    # 选取音频文件中的第一个音轨
-                "-shortest",        # 输出文件时长 = 较短的那一个
-                output_path
-            ]
+            cmd = self._build_add_audio_cmd(video_path, audio_path, output_path)
             subprocess.run(cmd, check=True)
             return True
         except subprocess.CalledProcessError as e:
             print("ffmpeg 执行失败:", e)
             return False
+
+    async def add_audio_to_video_async(self, video_path, audio_path, output_path, timeout=None) -> bool:
+        # add_audio_to_video 的异步版本 (FfmpegAsyncExecutor 执行)
+        if not os.path.isfile(video_path):
+            print("错误：视频文件不存在")
+            return False
+        if not os.path.isfile(audio_path):
+            print("错误：音频文件不存在")
+            return False
+
+        cmd = self._build_add_audio_cmd(video_path, audio_path, output_path)
+        duration_ms = await asyncio.to_thread(self._probe_duration_ms, video_path)     # ffprobe 阻塞, 不在事件循环中执行
+        result = await self.cls_ffmpeg_executor.run(cmd, job_id=output_path, duration_ms=duration_ms, timeout=timeout)
+        return result['ok']
+
+    def _build_add_audio_cmd(self, video_path, audio_path, output_path) -> list:
+        return [
+            "ffmpeg",
+            "-y",  # 覆盖输出
+            "-i", video_path,
+            "-i", audio_path,
+            "-c:v", "copy",     # 保留视频流
+            "-c:a", "aac",      # 音频编码为 AAC（兼容性好）
+            "-map", "0:v:0",    # 选取第一个视频流
+            "-map", "1:a:0",    # 选取音频文件中的第一个音轨
+            "-shortest",        # 输出文件时长 = 较短的那一个
+            output_path
+        ]
         
-    def get_video_frame_count(self, video_path):
+    def get_video_frame_count(self, video_path, exact=False, with_method=False):
         """
-        获取视频的总帧数
+        获取视频的总帧数 (分级统计, 默认不解码视频)
+        1. 元数据缓存中解码统计的帧数 ('decode')
+        2. 容器记录的帧数 nb_frames ('nb_frames', 元数据缓存, 不需要额外调用 ffprobe)
+        3. 统计视频包数 -count_packets ('packets', 只读取包, 不解码)
+        4. exact=True 时解码统计 -count_frames ('decode', 耗时与转码相当)
 
         参数:
             video_path (str): 视频文件路径
+            exact (bool): True 时解码统计精确帧数
+            with_method (bool): True 时返回 (帧数, 统计方法)
 
         返回:
-            int: 视频总帧数，获取失败时返回 None
+            int: 视频总帧数，获取失败时返回 None; with_method=True 时返回 (帧数, 'decode' | 'nb_frames' | 'packets' | None)
         """
+        frame_count, method = self._compute_video_frame_count(video_path, exact)
+        if with_method:
+            return frame_count, method
+        return frame_count
+
+    def _compute_video_frame_count(self, video_path, exact):
         if not os.path.isfile(video_path):
             print("错误：找不到视频文件")
-            return None
+            return None, None
 
+        # 统计的帧数保存在元数据缓存中, 文件不变时不重复统计
+        frame_count = self.cls_media_probe.get_extra(video_path, 'frame_count')
+        if frame_count is not None:
+            return frame_count, 'decode'
+        if exact:
+            frame_count = self._ffprobe_count_stream(video_path, '-count_frames', 'nb_read_frames')
+            if frame_count is not None:
+                self.cls_media_probe.set_extra(video_path, 'frame_count', frame_count)
+            return frame_count, 'decode' if frame_count is not None else None
+
+        stream = self.cls_media_probe.first_stream(video_path, 'video')
+        if stream is None:
+            print("错误：不是视频文件或没有视频流")
+            return None, None
+        nb_frames = stream.get('nb_frames')
+        if nb_frames is not None and str(nb_frames).isdigit() and int(nb_frames) > 0:
+            return int(nb_frames), 'nb_frames'
+
+        frame_count = self.cls_media_probe.get_extra(video_path, 'packet_count')
+        if frame_count is None:
+            frame_count = self._ffprobe_count_stream(video_path, '-count_packets', 'nb_read_packets')
+            if frame_count is None:
+                return None, None
+            self.cls_media_probe.set_extra(video_path, 'packet_count', frame_count)
+        return frame_count, 'packets'
+
+    def _ffprobe_count_stream(self, video_path, count_flag, entry):
+        # ffprobe 统计第一个视频流的帧数 / 包数 (count_flag: -count_frames / -count_packets)
         command = [
             "ffprobe",
             "-v", "error",
             "-select_streams", "v:0",
-            "-count_frames",
-            "-show_entries", "stream=nb_read_frames",
+            count_flag,
+            "-show_entries", f"stream={entry}",
             "-of", "default=nokey=1:noprint_wrappers=1",
             video_path
         ]
 
         try:
             result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-            frame_count = int(result.stdout.strip())
-            return frame_count
+            return int(result.stdout.strip())
         except subprocess.CalledProcessError as e:
             print("ffprobe 执行出错:", e.stderr)
             return None
@@ -729,17 +1196,11 @@ def get_video_frame_count(self, video_path):
             return None
         
     def random_get_bg_music(self, audios_dir_path, tmp_dir_path, video_path):
-        # 随机获取背景音乐
+        # 随机获取背景音乐 (时长不短于视频的音频中均匀随机选择)
         video_length = self.get_media_duration_ms(video_path)
-        audio_path = None
-        loop_count = 0
-        while audio_path is None and loop_count < 2000:
-            audios_files_list = self.get_all_audio_files(audios_dir_path, extensions=None)
-            current_audio_path = random.choice(audios_files_list)
-            current_audio_length = self.get_media_duration_ms(current_audio_path)
-            if current_audio_length >= video_length:
-                audio_path = current_audio_path
-            loop_count += 1
+        if video_length is None:
+            return None
+        audio_path = self.get_audio_library(audios_dir_path).select(video_length)
 
         if audio_path is None:
             print('Error: No valid audio file...')
@@ -747,6 +1208,15 @@ def random_get_bg_music(self, audios_dir_path, tmp_dir_path, video_path):
         # 截取背景音乐
         trim_audio = self._random_trim_bg_music(tmp_dir_path, audio_path, video_length)
         return trim_audio
+
+    def get_audio_library(self, audios_dir_path) -> AudioLibraryIndex:
+        # 音频库索引 (每个文件夹一个, 每次获取时增量刷新)
+        audio_library = self._audio_libraries.get(audios_dir_path)
+        if audio_library is None:
+            audio_library = AudioLibraryIndex(audios_dir_path, cls_media_probe=self.cls_media_probe)
+            self._audio_libraries[audios_dir_path] = audio_library
+        audio_library.refresh()
+        return audio_library
     
     def _random_trim_bg_music(self, tmp_dir_path, audio_path, video_length):
          # 随机截取背景音乐
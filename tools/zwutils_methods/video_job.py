@@ -0,0 +1,220 @@
+import os
+import shutil
+import subprocess
+from .encoder_presets import EncoderPresets    # 视频编码预设
+
+
+class VideoJob(object):
+    """
+    视频处理任务: 裁剪/缩放/填充/截取/删除元数据/替换音频 合并为一个滤镜图, 一次 ffmpeg 调用完成;
+    多个输出 (不同尺寸/编码) 用 split 共享一次解码, 代替 crop_video -> scale_video -> remove_video_metadata -> add_audio_to_video 多次解码编码
+    from zwutils_methods import VideoJob    # 视频处理任务
+    # job = VideoJob(video_path).trim(0, 15000).crop(1080, 1080).strip_metadata().replace_audio(audio_path)
+    # job.add_output(output_path, preset='archive').add_output(preview_path, width=360, preset='preview').run()
+    """
+    def __init__(self, input_path, ffmpeg_path='ffmpeg'):
+        self.input_path = input_path
+        self.ffmpeg_path = ffmpeg_path
+        self.filters = []       # 所有输出共用的视频滤镜 (按添加顺序)
+        self.trim_range = None  # (start_ms, end_ms)
+        self.audio_path = None  # 替换的音频文件, None 使用原视频的音频
+        self.audio_codec = 'aac'
+        self.metadata_removed = False
+        self.outputs = []       # [{'path', 'filters', 'preset', 'video_args', 'audio_args'}, ...]
+        self.cls_encoder_presets = EncoderPresets()    # 视频编码预设
+
+    def __repr__(self):
+        return f"VideoJob({self.input_path}: {','.join(self.filters) or 'copy'} -> {len(self.outputs)} outputs)"
+
+    # ---------- 共用操作 ----------
+    def trim(self, start_ms, end_ms):
+        # 截取片段 (毫秒); 作为输入参数 -ss/-t, 重新编码时精确到帧
+        if start_ms < 0 or end_ms <= start_ms:
+            raise ValueError(f'开始时间和结束时间无效: {start_ms}, {end_ms}')
+        self.trim_range = (start_ms, end_ms)
+        return self
+
+    def crop(self, crop_width, crop_height, start_x=None, start_y=None):
+        # 裁剪, 同 VideoHandle.crop_video; start_x, start_y 为 None 时居中
+        if start_x is not None and start_y is not None:
+            self.filters.append(f'crop={crop_width}:{crop_height}:{start_x}:{start_y}')
+        else:
+            self.filters.append(f'crop={crop_width}:{crop_height}')
+        return self
+
+    def scale(self, width=None, height=None, keep_aspect_ratio=True, scale_algorithm='bicubic'):
+        # 缩放, 同 VideoHandle.scale_video (宽高都指定且保持比例时缩小到范围内并居中填充)
+        self.filters.extend(self.compute_scale_filters(width, height, keep_aspect_ratio, scale_algorithm))
+        return self
+
+    def resize_cover(self, target_width, target_height):
+        # 保持比例缩放并居中裁剪到指定尺寸 (不变形), 同 VideoHandle.resize_video
+        self.filters.append(self.compute_cover_filter(target_width, target_height))
+        return self
+
+    def pad(self, width, height, x=None, y=None, color='black'):
+        # 填充到指定尺寸; x, y 为 None 时居中
+        x = '(ow-iw)/2' if x is None else x
+        y = '(oh-ih)/2' if y is None else y
+        self.filters.append(f'pad={width}:{height}:{x}:{y}:color={color}')
+        return self
+
+    def video_filter(self, filter_str):
+        # 自定义 ffmpeg 视频滤镜 (如 'fps=30', 'hflip')
+        self.filters.append(filter_str)
+        return self
+
+    def strip_metadata(self):
+        # 删除所有元数据, 同 VideoHandle.remove_video_metadata
+        self.metadata_removed = True
+        return self
+
+    def replace_audio(self, audio_path, audio_codec='aac'):
+        # 替换音频 (输出时长 = 较短的那一个), 同 VideoHandle.add_audio_to_video
+        self.audio_path = audio_path
+        self.audio_codec = audio_codec
+        return self
+
+    # ---------- 输出 ----------
+    def add_output(self, output_path, width=None, height=None, keep_aspect_ratio=True, scale_algorithm='bicubic',
+                   filters=None, preset=None, video_args=None, audio_args=None):
+        """
+        增加一个输出 (共用同一次解码)
+
+        参数:
+            width, height: 该输出单独缩放, 同 scale; 都为 None 不缩放
+            filters: 该输出单独的视频滤镜 list (在缩放之后)
+            preset: 编码预设名称 (EncoderPresets, 如 'archive' / 'marketplace-upload' / 'preview'), None 使用默认预设
+            video_args: 视频编码参数 list, 如 ['-c:v', 'libx264', '-crf', '18']; 不为 None 时代替预设
+            audio_args: 音频编码参数 list; None 自动 (替换音频或截取时用 audio_codec 编码, 否则复制)
+        """
+        output_filters = []
+        if width or height:
+            output_filters.extend(self.compute_scale_filters(width, height, keep_aspect_ratio, scale_algorithm))
+        output_filters.extend(filters or [])
+        self.outputs.append({
+            'path': output_path,
+            'filters': output_filters,
+            'preset': preset,
+            'video_args': list(video_args) if video_args is not None else None,
+            'audio_args': list(audio_args) if audio_args is not None else None,
+        })
+        return self
+
+    def compute_scale_filters(self, width, height, keep_aspect_ratio=True, scale_algorithm='bicubic') -> list:
+        # 缩放滤镜 (同 VideoHandle.scale_video)
+        if width and height:
+            if keep_aspect_ratio:
+                scale_filters = [f'scale=w={width}:h={height}:force_original_aspect_ratio=decrease',
+                                 f'pad={width}:{height}:(ow-iw)/2:(oh-ih)/2']
+            else:
+                scale_filters = [f'scale={width}:{height}']
+        elif width:
+            scale_filters = [f'scale={width}:-2']
+        elif height:
+            scale_filters = [f'scale=-2:{height}']
+        else:
+            raise ValueError("Either width or height must be specified")
+        if scale_algorithm:
+            # 缩放算法加在 scale 上 (有 pad 时是倒数第二个)
+            scale_idx = 0 if len(scale_filters) == 2 else -1
+            scale_filters[scale_idx] += f':flags={scale_algorithm}'
+        return scale_filters
+
+    def compute_cover_filter(self, target_width, target_height) -> str:
+        # 保持比例缩放并居中裁剪的滤镜 (同 VideoHandle.resize_video)
+        return (
+            f"scale='if(gt(a,{target_width}/{target_height}),{target_height}*a,{target_width})':"
+            f"'if(gt(a,{target_width}/{target_height}),{target_height},{target_width}/a)',"
+            f"crop={target_width}:{target_height}"
+        )
+
+    def compute_filter_graph(self) -> tuple:
+        """
+        生成滤镜图
+
+        返回:
+            tuple: (filter_complex 字符串, 每个输出的视频标签 list)
+        """
+        count = len(self.outputs)
+        graph = []
+        shared = ','.join(self.filters) or 'null'
+        if count == 1:
+            shared_labels = ['[vs0]']
+            graph.append(f'[0:v:0]{shared}[vs0]')
+        else:
+            shared_labels = [f'[vs{i}]' for i in range(count)]
+            graph.append(f"[0:v:0]{shared},split={count}{''.join(shared_labels)}")
+
+        out_labels = []
+        for i, output in enumerate(self.outputs):
+            if output['filters']:
+                graph.append(f"{shared_labels[i]}{','.join(output['filters'])}[vo{i}]")
+                out_labels.append(f'[vo{i}]')
+            else:
+                out_labels.append(shared_labels[i])
+        return ';'.join(graph), out_labels
+
+    def build_command(self, overwrite=True) -> list:
+        # 生成 ffmpeg 命令 (一次解码, 每个输出一次编码)
+        if not self.outputs:
+            raise ValueError('VideoJob 没有输出, 请先调用 add_output')
+        cmd = [self.ffmpeg_path] + self.cls_encoder_presets.global_args(self.outputs[0]['preset'])
+        cmd.append('-y' if overwrite else '-n')
+        if self.trim_range is not None:
+            start_ms, end_ms = self.trim_range
+            cmd += ['-ss', f'{start_ms / 1000.0:.3f}', '-t', f'{(end_ms - start_ms) / 1000.0:.3f}']
+        cmd += ['-i', self.input_path]
+        if self.audio_path is not None:
+            cmd += ['-i', self.audio_path]
+
+        filter_graph, out_labels = self.compute_filter_graph()
+        cmd += ['-filter_complex', filter_graph]
+
+        for output, out_label in zip(self.outputs, out_labels):
+            cmd += ['-map', out_label]
+            if self.audio_path is not None:
+                cmd += ['-map', '1:a:0', '-shortest']
+            else:
+                cmd += ['-map', '0:a?']     # 原视频没有音频时忽略
+            if output['video_args'] is not None:
+                cmd += output['video_args']
+            else:
+                cmd += self.cls_encoder_presets.video_args(output['preset'])
+            if output['audio_args'] is not None:
+                cmd += output['audio_args']
+            elif self.audio_path is not None or self.trim_range is not None:
+                cmd += ['-c:a', self.audio_codec]
+            else:
+                cmd += ['-c:a', 'copy']
+            if self.metadata_removed:
+                cmd += ['-map_metadata', '-1']
+            cmd.append(output['path'])
+        return cmd
+
+    def run(self, overwrite=True) -> bool:
+        """
+        执行任务 (一次 ffmpeg 调用)
+
+        返回:
+            bool: 是否成功
+        """
+        if not os.path.isfile(self.input_path):
+            print(f"错误：视频文件不存在 -> {self.input_path}")
+            return False
+        if self.audio_path is not None and not os.path.isfile(self.audio_path):
+            print(f"错误：音频文件不存在 -> {self.audio_path}")
+            return False
+        if not shutil.which(self.ffmpeg_path):
+            raise FileNotFoundError(f"FFmpeg executable '{self.ffmpeg_path}' not found")
+
+        for output in self.outputs:
+            output_dir = os.path.dirname(output['path'])
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+        try:
+            subprocess.run(self.build_command(overwrite), check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"FFmpeg command failed with error: {e.stderr.decode('utf-8', errors='replace')}")
+            return False